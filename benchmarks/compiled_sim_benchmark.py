@@ -0,0 +1,72 @@
+"""
+Benchmark: compiled bit-parallel simulation vs event-driven simulation.
+
+Run from the repository root:
+    python benchmarks/compiled_sim_benchmark.py [--bits 8 16 32 48] [--vectors 1048576]
+
+Uses the array multipliers of ``event_sim_benchmark``. The compiled circuit
+is checked against Python's ``*`` on random operands. It is then timed on
+``--vectors`` random vectors, and the event-driven simulator on
+``--event-vectors``. Both rates are given in vectors per second.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_sim_benchmark import multiplier_bench
+
+from dld.compiled_sim import BLOCK_WORDS, WORD_BITS, CompiledCircuit, throughput
+from dld.event_sim import simulate
+from dld.netlist import parse_netlist
+
+
+def check(circuit, bits, rng, count=256):
+    a = [rng.getrandbits(bits) for _ in range(count)]
+    b = [rng.getrandbits(bits) for _ in range(count)]
+    index = {name: i for i, name in enumerate(circuit.inputs)}
+    patterns = np.zeros((count, len(circuit.inputs)), dtype=np.uint8)
+    for k in range(count):
+        for i in range(bits):
+            patterns[k, index[f"a{i}"]] = (a[k] >> i) & 1
+            patterns[k, index[f"b{i}"]] = (b[k] >> i) & 1
+    outputs = circuit.run(patterns)
+    for k in range(count):
+        got = sum(int(outputs[k, circuit.outputs.index(f"p{i}")]) << i for i in range(2 * bits))
+        assert got == a[k] * b[k], (a[k], b[k], got)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bits", type=int, nargs="+", default=[8, 16, 32, 48])
+    parser.add_argument("--vectors", type=int, default=1 << 20)
+    parser.add_argument("--event-vectors", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    passes = max(1, args.vectors // (BLOCK_WORDS * WORD_BITS))
+    print(f"{'bits':>4} {'gates':>7} {'compile (s)':>12} {'compiled (vec/s)':>17} "
+          f"{'event-driven (vec/s)':>21} {'speedup':>9}")
+    for bits in args.bits:
+        netlist = parse_netlist(multiplier_bench(bits))
+        start = time.perf_counter()
+        circuit = CompiledCircuit(netlist)
+        compile_time = time.perf_counter() - start
+        check(circuit, bits, rng)
+
+        fast = throughput(circuit, passes=passes, seed=args.seed)
+        vectors = [{name: rng.randint(0, 1) for name in circuit.inputs} for _ in range(args.event_vectors)]
+        stats = simulate(netlist, vectors, watch=[]).stats
+        slow = args.event_vectors / stats["seconds"]
+        print(f"{bits:>4} {netlist.gate_count:>7} {compile_time:>12.3f} {fast:>17,.0f} "
+              f"{slow:>21,.0f} {fast / slow:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
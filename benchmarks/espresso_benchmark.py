@@ -0,0 +1,70 @@
+"""
+Benchmark: Espresso heuristic vs exact Quine–McCluskey on PLA-style functions.
+
+Run from the repository root:
+    python benchmarks/espresso_benchmark.py [--min-vars 8] [--max-vars 20]
+
+Each function is the union of ``--cubes`` random product terms, expanded to a
+minterm list exactly as the K-Map page passes it. Quine–McCluskey is only run
+up to ``--exact-limit`` inputs.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dld import espresso, qm
+
+
+def pla_function(num_vars, cubes, rng):
+    """Minterms of ``cubes`` random product terms with 60–80% of the literals."""
+    points = set()
+    for _ in range(cubes):
+        literals = rng.sample(range(num_vars), rng.randint(num_vars * 6 // 10, num_vars * 8 // 10))
+        mask = (1 << num_vars) - 1
+        value = 0
+        for b in literals:
+            mask &= ~(1 << b)
+            if rng.random() < 0.5:
+                value |= 1 << b
+        sub = mask
+        while True:
+            points.add(value | sub)
+            if sub == 0:
+                break
+            sub = (sub - 1) & mask
+    return sorted(points)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--min-vars", type=int, default=8)
+    parser.add_argument("--max-vars", type=int, default=20)
+    parser.add_argument("--cubes", type=int, default=30)
+    parser.add_argument("--exact-limit", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'vars':>4} {'minterms':>9} {'espresso terms':>15} {'time (s)':>9} {'exact terms':>12} {'time (s)':>9}")
+    for n in range(args.min_vars, args.max_vars + 1):
+        on = pla_function(n, args.cubes, rng)
+
+        start = time.perf_counter()
+        heuristic = espresso.minimize(n, on)
+        fast = time.perf_counter() - start
+
+        exact_terms, exact_time = "-", "-"
+        if n <= args.exact_limit:
+            start = time.perf_counter()
+            exact_terms = qm.minimize(n, on).stats["terms"]
+            exact_time = f"{time.perf_counter() - start:.4f}"
+
+        print(f"{n:>4} {len(on):>9} {heuristic.stats['terms']:>15} {fast:>9.4f} {exact_terms:>12} {exact_time:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: event-driven simulation throughput on large gate-level netlists.
+
+Run from the repository root:
+    python benchmarks/event_sim_benchmark.py [--bits 16 24 32 48] [--vectors 50]
+
+Each circuit is an N×N array multiplier (N² AND gates plus a grid of
+full adders, about 6N² gates) written as ``.bench`` text, parsed, and driven
+with random operand pairs. Full adders use a delay of 2 for the XORs, so
+glitches propagate as in a real array multiplier. Reports events (net value
+changes) and gate evaluations per second.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dld.event_sim import simulate
+from dld.netlist import parse_netlist
+
+
+def multiplier_bench(bits):
+    """``.bench`` text of a carry-save array multiplier with outputs p0..p(2N-1)."""
+    lines = [f"INPUT(a{i})" for i in range(bits)] + [f"INPUT(b{i})" for i in range(bits)]
+    lines += [f"OUTPUT(p{i})" for i in range(2 * bits)]
+    lines += ["zero = CONST0()"]
+    for i in range(bits):
+        for j in range(bits):
+            lines.append(f"pp{i}_{j} = AND(a{j}, b{i})")
+
+    def full_adder(name, x, y, z):
+        lines.extend([
+            f"{name}_t = XOR({x}, {y}) @2",
+            f"{name}_s = XOR({name}_t, {z}) @2",
+            f"{name}_c1 = AND({x}, {y})",
+            f"{name}_c2 = AND({name}_t, {z})",
+            f"{name}_c = OR({name}_c1, {name}_c2)",
+        ])
+        return f"{name}_s", f"{name}_c"
+
+    # Row i adds partial products of b_i to the running sum (sum bits shifted)
+    sums = [f"pp0_{j}" for j in range(bits)] + ["zero"]
+    lines.append("p0 = BUF(pp0_0)")
+    for i in range(1, bits):
+        carry = "zero"
+        row = []
+        for j in range(bits):
+            s, carry = full_adder(f"fa{i}_{j}", f"pp{i}_{j}", sums[j + 1], carry)
+            row.append(s)
+        sums = row + [carry]
+        lines.append(f"p{i} = BUF({sums[0]})")
+    for j in range(1, bits + 1):
+        lines.append(f"p{bits - 1 + j} = BUF({sums[j]})")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bits", type=int, nargs="+", default=[16, 24, 32, 48])
+    parser.add_argument("--vectors", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'bits':>4} {'gates':>7} {'parse (s)':>10} {'events':>10} {'evals':>10} "
+          f"{'sim (s)':>8} {'events/s':>10} {'evals/s':>10}")
+    for bits in args.bits:
+        start = time.perf_counter()
+        netlist = parse_netlist(multiplier_bench(bits))
+        parse_time = time.perf_counter() - start
+
+        vectors, expected = [], []
+        for _ in range(args.vectors):
+            a, b = rng.getrandbits(bits), rng.getrandbits(bits)
+            vector = {f"a{i}": (a >> i) & 1 for i in range(bits)}
+            vector.update({f"b{i}": (b >> i) & 1 for i in range(bits)})
+            vectors.append(vector)
+            expected.append(a * b)
+
+        result = simulate(netlist, vectors, watch=[])
+        for sample, product in zip(result.samples, expected):
+            got = sum(sample[f"p{i}"] << i for i in range(2 * bits))
+            assert got == product, (got, product)
+
+        stats = result.stats
+        print(f"{bits:>4} {stats['gates']:>7} {parse_time:>10.3f} {stats['events']:>10} "
+              f"{stats['evaluations']:>10} {stats['seconds']:>8.3f} {stats['events_per_second']:>10.0f} "
+              f"{stats['evaluations'] / stats['seconds']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: stuck-at fault simulation (PPSFP with fault dropping) vs serial fault simulation.
+
+Run from the repository root:
+    python benchmarks/fault_sim_benchmark.py [--bits 4 8 16 24] [--vectors 4096]
+
+Uses the array multipliers of ``event_sim_benchmark``. Every fault is
+simulated on ``--vectors`` random vectors (exhaustive when the inputs allow),
+and the compacted test set is reported. The baseline simulates
+``--serial-faults`` faults one vector at a time, evaluating every gate of the
+faulty circuit, and compares the output with the fault-free one. The faults
+it detects are checked against ``FaultSimulator`` on the same vectors. Both
+rates are given in fault × vector pairs per second; the PPSFP rate counts
+the pairs that fault dropping skips, so it grows with the number of vectors.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_sim_benchmark import multiplier_bench
+
+from dld.fault_sim import FaultSimulator
+from dld.netlist import evaluate_gate, parse_netlist
+
+
+def serial_rate(sim, faults, vectors, rng):
+    """Fault × vector pairs per second of plain one-fault, one-vector simulation."""
+    netlist = sim.netlist
+    observed = sorted(sim.observed)
+
+    def run(bits, fault):
+        values = [0] * len(netlist.names)
+        for net, bit in zip(sim.inputs, bits):
+            values[net] = bit
+        if fault is not None and fault.net in sim.inputs:
+            values[fault.net] = fault.value
+        for g in sim.order:
+            gate = netlist.gates[g]
+            values[gate.output] = evaluate_gate(gate.op, [values[n] for n in gate.inputs])
+            if fault is not None and gate.output == fault.net:
+                values[gate.output] = fault.value
+        return [values[n] for n in observed]
+
+    sample = rng.sample(sim.faults, min(faults, len(sim.faults)))
+    patterns = [[rng.randint(0, 1) for _ in sim.inputs] for _ in range(vectors)]
+    detected = set()
+    start = time.perf_counter()
+    for bits in patterns:
+        good = run(bits, None)
+        for fault in sample:
+            if run(bits, fault) != good:
+                detected.add(fault)
+    seconds = time.perf_counter() - start
+
+    # Cross-check: PPSFP must detect the same faults on the same vectors
+    mask = (1 << vectors) - 1
+    packed = [sum(bits[i] << k for k, bits in enumerate(patterns)) for i in range(len(sim.inputs))]
+    good = sim.good_values(packed, mask)
+    expected = {fault for fault in sample if sim.propagate(fault, good, mask)}
+    if detected != expected:
+        raise SystemExit(f"Serial and PPSFP fault simulation disagree on "
+                         f"{', '.join(sim.fault_name(f) for f in detected ^ expected)}")
+    return len(sample) * vectors / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bits", type=int, nargs="+", default=[4, 8, 16, 24])
+    parser.add_argument("--vectors", type=int, default=4096)
+    parser.add_argument("--serial-faults", type=int, default=20)
+    parser.add_argument("--serial-vectors", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'bits':>4} {'gates':>7} {'faults':>7} {'vectors':>8} {'coverage':>9} {'tests':>6} "
+          f"{'time (s)':>9} {'PPSFP (pairs/s)':>16} {'serial (pairs/s)':>17} {'speedup':>9}")
+    for bits in args.bits:
+        netlist = parse_netlist(multiplier_bench(bits))
+        sim = FaultSimulator(netlist)
+        report = sim.run(vectors=args.vectors, seed=args.seed)
+        fast = report.faults * report.vectors / report.seconds
+        slow = serial_rate(sim, args.serial_faults, args.serial_vectors, rng)
+        print(f"{bits:>4} {netlist.gate_count:>7} {report.faults:>7} {report.vectors:>8} "
+              f"{report.coverage:>9.2%} {len(report.tests):>6} {report.seconds:>9.2f} "
+              f"{fast:>16,.0f} {slow:>17,.0f} {fast / slow:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
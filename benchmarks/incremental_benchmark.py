@@ -0,0 +1,72 @@
+"""
+Benchmark: full re-evaluation vs the subexpression vector cache while editing.
+
+Run from the repository root:
+    python benchmarks/incremental_benchmark.py [--vars 16] [--terms 300] [--edits 50]
+
+A random sum of products is evaluated once. Then one literal at a time is
+changed, the way a student edits, and each edit is timed twice: once with
+the one-pass ``truth_table.evaluate`` (a new expression text, so a new
+compiled function) and once with ``vector_cache``. Parsing is excluded from
+both timings.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dld.parser import parse
+from dld.truth_table import evaluate
+from dld.vector_cache import cache_for
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vars", type=int, default=16)
+    parser.add_argument("--terms", type=int, default=300)
+    parser.add_argument("--edits", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = [f"x{i}" for i in range(args.vars)]
+
+    def literal():
+        return ("~" if rng.random() < 0.5 else "") + rng.choice(names)
+
+    terms = [[literal() for _ in range(4)] for _ in range(args.terms)]
+
+    def text():
+        return " | ".join("(" + " & ".join(t) + ")" for t in terms)
+
+    cache = cache_for(names)
+    cache.evaluate(parse(text(), names).ast)
+
+    full = incremental = 0.0
+    recomputed = 0
+    for _ in range(args.edits):
+        terms[rng.randrange(args.terms)][rng.randrange(4)] = literal()
+        ast = parse(text(), names).ast
+
+        start = time.perf_counter()
+        expected = evaluate(ast, names)
+        full += time.perf_counter() - start
+
+        start = time.perf_counter()
+        vector, computed = cache.evaluate(ast)
+        incremental += time.perf_counter() - start
+        recomputed += computed
+        assert vector == expected
+
+    print(f"{'vars':>4} {'terms':>6} {'full (ms/edit)':>15} {'cached (ms/edit)':>17} "
+          f"{'nodes redone':>13} {'speedup':>8}")
+    print(f"{args.vars:>4} {args.terms:>6} {full * 1000 / args.edits:>15.2f} "
+          f"{incremental * 1000 / args.edits:>17.2f} {recomputed / args.edits:>13.1f} "
+          f"{full / incremental:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: multi-output minimization vs minimizing each output separately.
+
+Run from the repository root:
+    python benchmarks/multi_output_benchmark.py [--min-vars 4] [--max-vars 10] [--outputs 4]
+
+Each output is the OR of a random subset of a common pool of product terms,
+as in a PLA, so the outputs have terms worth sharing. Costs are reported as
+AND-plane products / literals and OR-plane connections.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dld import multi_output, qm
+
+
+def pla_outputs(num_vars, outputs, pool, rng):
+    """Minterm lists of ``outputs`` functions built from a pool of ``pool`` random cubes."""
+    cubes = []
+    for _ in range(pool):
+        literals = rng.sample(range(num_vars), rng.randint(max(1, num_vars // 2), num_vars))
+        mask, value = (1 << num_vars) - 1, 0
+        for b in literals:
+            mask &= ~(1 << b)
+            if rng.random() < 0.5:
+                value |= 1 << b
+        cubes.append((value, mask))
+    functions = []
+    for _ in range(outputs):
+        points = set()
+        for value, mask in rng.sample(cubes, rng.randint(1, pool // 2 + 1)):
+            points.update(m for m in range(1 << num_vars) if m & ~mask == value)
+        functions.append((sorted(points), []))
+    return functions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--min-vars", type=int, default=4)
+    parser.add_argument("--max-vars", type=int, default=10)
+    parser.add_argument("--outputs", type=int, default=4)
+    parser.add_argument("--pool", type=int, default=12, help="product terms shared by the outputs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'vars':>4} {'outs':>4} | {'shared prod/lit/conn':>21} {'time (s)':>9} | "
+          f"{'separate prod/lit/conn':>23} {'time (s)':>9}")
+    for n in range(args.min_vars, args.max_vars + 1):
+        functions = pla_outputs(n, args.outputs, args.pool, rng)
+
+        start = time.perf_counter()
+        shared = multi_output.minimize(n, functions)
+        shared_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        separate = multi_output.plane_cost(n, [qm.minimize(n, on, dc).implicants for on, dc in functions])
+        separate_time = time.perf_counter() - start
+
+        s = shared.stats
+        shared_cost = f"{s['products']}/{s['literals']}/{s['connections']}"
+        separate_cost = f"{separate.products}/{separate.literals}/{separate.connections}"
+        print(f"{n:>4} {args.outputs:>4} | {shared_cost:>21} {shared_time:>9.4f} | "
+              f"{separate_cost:>23} {separate_time:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
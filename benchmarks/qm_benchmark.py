@@ -0,0 +1,58 @@
+"""
+Benchmark: bitmask Quine–McCluskey vs SymPy's SOPform on random functions.
+
+Run from the repository root:
+    python benchmarks/qm_benchmark.py [--min-vars 4] [--max-vars 16] [--density 0.3]
+
+SOPform is only timed up to ``--sympy-limit`` variables (it slows down sharply).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sympy import SOPform, symbols
+
+from dld.qm import minimize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--min-vars", type=int, default=4)
+    parser.add_argument("--max-vars", type=int, default=16)
+    parser.add_argument("--density", type=float, default=0.3, help="fraction of minterms set")
+    parser.add_argument("--dc-density", type=float, default=0.05, help="fraction of don't-cares")
+    parser.add_argument("--sympy-limit", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'vars':>4} {'on':>6} {'dc':>5} {'primes':>7} {'ess.':>6} {'terms':>6} {'exact':>6} "
+          f"{'primes (s)':>11} {'cover (s)':>10} {'SOPform (s)':>12}")
+    for n in range(args.min_vars, args.max_vars + 1):
+        on, dc = [], []
+        for m in range(1 << n):
+            r = rng.random()
+            if r < args.density:
+                on.append(m)
+            elif r < args.density + args.dc_density:
+                dc.append(m)
+
+        result = minimize(n, on, dc)
+        s = result.stats
+
+        sympy_time = "-"
+        if n <= args.sympy_limit:
+            start = time.perf_counter()
+            SOPform(symbols([f"x{i}" for i in range(n)]), on, dc)
+            sympy_time = f"{time.perf_counter() - start:.4f}"
+
+        print(f"{n:>4} {len(on):>6} {len(dc):>5} {s['primes']:>7} {s['essential']:>6} {s['terms']:>6} "
+              f"{result.exact!s:>6} {s['prime_time']:>11.4f} {s['cover_time']:>10.4f} {sympy_time:>12}")
+
+
+if __name__ == "__main__":
+    main()
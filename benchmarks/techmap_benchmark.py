@@ -0,0 +1,77 @@
+"""
+Benchmark: NAND / NOR technology mapping of wide parity (XOR) functions.
+
+Run from the repository root:
+    python benchmarks/techmap_benchmark.py [--widths 2 4 8 16 20 32 64] [--check-vars 16]
+
+An n-input XOR is the worst case for the subject graph: every 2-input XOR
+reads both of its operands twice. Building it from the operands' nodes keeps
+the mapper linear in n; re-expanding the AST per XOR made it exponential
+(about 12 s at 20 inputs). Every mapping up to ``--check-vars`` inputs is
+evaluated over its full truth table and compared with the expression, so the
+script doubles as a regression check: it fails on a wrong circuit or when a
+width takes longer than ``--limit`` seconds.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dld.techmap import tech_map
+from dld.truth_table import evaluate, full_mask, variable_masks
+
+
+def parity(width):
+    names = [f"x{i}" for i in range(width)]
+    return ("xor", *[("var", name) for name in names]), names
+
+
+def mapped_output(dag, names):
+    """Packed Output column of a NAND/NOR ``GateDAG`` (see ``truth_table.evaluate``)."""
+    inputs = dict(zip(names, variable_masks(len(names))))
+    ones = full_mask(len(names))
+    values = []
+    for node in dag.nodes:
+        if node.op == "input":
+            value = inputs[node.label]
+        elif node.op == "const":
+            value = ones if node.label == "1" else 0
+        else:
+            fanins = [values[f] for f in node.fanins]
+            value = fanins[0]
+            for other in fanins[1:]:
+                value = value & other if node.op == "nand" else value | other
+            value ^= ones
+        values.append(value)
+    return values[dag.outputs[0][1]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--widths", type=int, nargs="+", default=[2, 4, 8, 16, 20, 32, 64])
+    parser.add_argument("--check-vars", type=int, default=16)
+    parser.add_argument("--limit", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"{'inputs':>6} {'library':>7} {'objective':>9} {'subject':>8} {'gates':>6} {'depth':>6} "
+          f"{'time (ms)':>10} {'checked':>8}")
+    for width in args.widths:
+        ast, names = parity(width)
+        for library in ("nand", "nor"):
+            for objective in ("gates", "depth"):
+                start = time.perf_counter()
+                mapping = tech_map(ast, library, objective)
+                seconds = time.perf_counter() - start
+                checked = width <= args.check_vars
+                if checked and mapped_output(mapping.dag, names) != evaluate(ast, names):
+                    raise SystemExit(f"{width}-input XOR mapped to {library.upper()} is not equivalent")
+                if seconds > args.limit:
+                    raise SystemExit(f"{width}-input XOR took {seconds:.2f} s to map (limit {args.limit} s)")
+                print(f"{width:>6} {library:>7} {objective:>9} {mapping.stats['subject_nodes']:>8} "
+                      f"{mapping.gates:>6} {mapping.depth:>6} {seconds * 1e3:>10.2f} {'yes' if checked else '-':>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: per-row ``expr.subs`` loop vs the bit-parallel truth-table engine.
+
+Run from the repository root:
+    python benchmarks/truth_table_benchmark.py [--min-vars 4] [--max-vars 20]
+
+The ``subs`` loop is timed on every row up to ``--subs-limit`` variables.
+Above that it is timed on a sample of rows and extrapolated (marked "est.").
+Past ``--frame-limit`` variables the DataFrame no longer fits comfortably in
+memory, so only the packed evaluation is timed (marked "packed").
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from itertools import product
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sympy import symbols
+from sympy.logic.boolalg import And, Not, Or
+
+from dld.truth_table import evaluate, truth_table
+
+SAMPLE_ROWS = 2048
+
+
+def random_expr(vars_sym, terms, rng):
+    """Random SOP-style expression that touches every variable."""
+    products = []
+    for _ in range(terms):
+        picked = rng.sample(vars_sym, min(3, len(vars_sym)))
+        products.append(And(*[v if rng.random() < 0.5 else Not(v) for v in picked]))
+    products.append(Or(*vars_sym))
+    return Or(*products)
+
+
+def time_subs(expr, vars_sym, limit):
+    n = len(vars_sym)
+    rows = product([0, 1], repeat=n)
+    count = 1 << n if n <= limit else SAMPLE_ROWS
+    start = time.perf_counter()
+    for _, values in zip(range(count), rows):
+        int(bool(expr.subs(dict(zip(vars_sym, values)))))
+    elapsed = time.perf_counter() - start
+    return elapsed * ((1 << n) / count), n > limit
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--min-vars", type=int, default=4)
+    parser.add_argument("--max-vars", type=int, default=20)
+    parser.add_argument("--subs-limit", type=int, default=12)
+    parser.add_argument("--frame-limit", type=int, default=22)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'vars':>4} {'rows':>9} {'subs loop (s)':>16} {'bit-parallel (s)':>17} {'speedup':>10}")
+    for n in range(args.min_vars, args.max_vars + 1):
+        vars_sym = list(symbols([f"x{i}" for i in range(n)]))
+        expr = random_expr(vars_sym, 2 * n, rng)
+
+        packed = n > args.frame_limit
+        start = time.perf_counter()
+        if packed:
+            evaluate(expr, vars_sym)
+        else:
+            truth_table(expr, vars_sym)
+        fast = time.perf_counter() - start
+
+        slow, estimated = time_subs(expr, vars_sym, args.subs_limit)
+        label = f"{slow:.4f}" + (" est." if estimated else "")
+        fast_label = f"{fast:.4f}" + (" packed" if packed else "")
+        print(f"{n:>4} {1 << n:>9} {label:>16} {fast_label:>17} {slow / fast:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Shared logic engines used by the Streamlit pages of the DLD Course Helper."""
@@ -0,0 +1,243 @@
+"""
+Reduced ordered binary decision diagrams (ROBDDs).
+
+A BDD node tests one variable and points to the sub-functions for 0 (low)
+and 1 (high). Nodes are created only through a *unique table*, so there is
+never a redundant test (low == high) or a duplicate node: every function has
+exactly one node for a fixed variable order. Equivalence checking is then
+comparing two integers, and satisfiability, model counting and minterm
+listing walk the graph once, in time proportional to its size instead of
+2**n.
+
+All operations go through ``ite(f, g, h)`` (if f then g else h) with a
+computed-table cache. The variable order matters a lot for the size; by
+default the order comes from ``dfs_order``, the depth-first order in which
+variables are reached in the expression (deepest subexpression first), which
+keeps related variables close together.
+
+Node ids: 0 is FALSE, 1 is TRUE. Minterm ``i`` uses the usual numbering: the
+first variable of ``variables`` (not of the BDD order) is the MSB.
+"""
+from collections import namedtuple
+
+from dld.compiler import as_ast
+
+FALSE, TRUE = 0, 1
+MAX_CACHE = 1_000_000  # the ITE cache is cleared when it grows past this
+
+Equivalence = namedtuple("Equivalence", "equal counterexample")
+
+
+def dfs_order(ast, variables=None):
+    """Variable order: first visit in a depth-first walk, deepest operand first."""
+    depth_memo = {}
+
+    def depth(node):
+        key = id(node)
+        if key not in depth_memo:
+            depth_memo[key] = 0 if node[0] in ("var", "const") else 1 + max(depth(a) for a in node[1:])
+        return depth_memo[key]
+
+    order, seen, visited = [], set(), set()
+    stack = [as_ast(ast)]
+    while stack:
+        node = stack.pop()
+        if id(node) in visited:
+            continue
+        visited.add(id(node))
+        if node[0] == "var":
+            if node[1] not in seen:
+                seen.add(node[1])
+                order.append(node[1])
+        elif node[0] != "const":
+            # Push shallow operands first so the deepest one is visited first
+            stack.extend(sorted(node[1:], key=depth))
+    for name in variables or ():
+        if str(name) not in seen:
+            seen.add(str(name))
+            order.append(str(name))
+    return order
+
+
+class BDD:
+    """Shared ROBDD manager for a fixed variable order."""
+
+    def __init__(self, order):
+        self.order = [str(v) for v in order]
+        self.level = {name: i for i, name in enumerate(self.order)}
+        n = len(self.order)
+        # Terminals sit below every variable level
+        self._var = [n, n]
+        self._low = [FALSE, TRUE]
+        self._high = [FALSE, TRUE]
+        self._unique = {}
+        self._ite_cache = {}
+
+    def __len__(self):
+        return len(self._var)
+
+    def mk(self, level, low, high):
+        """The (unique) node testing ``level`` with the given children."""
+        if low == high:
+            return low
+        key = (level, low, high)
+        node = self._unique.get(key)
+        if node is None:
+            node = len(self._var)
+            self._var.append(level)
+            self._low.append(low)
+            self._high.append(high)
+            self._unique[key] = node
+        return node
+
+    def var(self, name):
+        return self.mk(self.level[str(name)], FALSE, TRUE)
+
+    def _cofactors(self, f, level):
+        if self._var[f] == level:
+            return self._low[f], self._high[f]
+        return f, f
+
+    def ite(self, f, g, h):
+        """if ``f`` then ``g`` else ``h``."""
+        if f == TRUE:
+            return g
+        if f == FALSE:
+            return h
+        if g == h:
+            return g
+        if g == TRUE and h == FALSE:
+            return f
+        key = (f, g, h)
+        result = self._ite_cache.get(key)
+        if result is not None:
+            return result
+        level = min(self._var[f], self._var[g], self._var[h])
+        f0, f1 = self._cofactors(f, level)
+        g0, g1 = self._cofactors(g, level)
+        h0, h1 = self._cofactors(h, level)
+        result = self.mk(level, self.ite(f0, g0, h0), self.ite(f1, g1, h1))
+        if len(self._ite_cache) > MAX_CACHE:
+            self._ite_cache.clear()
+        self._ite_cache[key] = result
+        return result
+
+    def negate(self, f):
+        return self.ite(f, FALSE, TRUE)
+
+    def conj(self, f, g):
+        return self.ite(f, g, FALSE)
+
+    def disj(self, f, g):
+        return self.ite(f, TRUE, g)
+
+    def xor(self, f, g):
+        return self.ite(f, self.negate(g), g)
+
+    def build(self, expr):
+        """BDD of a parser AST or SymPy expression."""
+        memo = {}
+
+        def walk(node):
+            key = id(node)  # identity: hashing nested tuples is O(subtree)
+            if key in memo:
+                return memo[key]
+            op = node[0]
+            if op == "var":
+                result = self.var(node[1])
+            elif op == "const":
+                result = TRUE if node[1] else FALSE
+            elif op == "not":
+                result = self.negate(walk(node[1]))
+            else:
+                combine = {"and": self.conj, "or": self.disj, "xor": self.xor}[op]
+                result = walk(node[1])
+                for arg in node[2:]:
+                    result = combine(result, walk(arg))
+            memo[key] = result
+            return result
+
+        return walk(as_ast(expr))
+
+    # ---- queries --------------------------------------------------------
+
+    def size(self, f):
+        """Number of nodes reachable from ``f`` (terminals included)."""
+        seen, stack = set(), [f]
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                if node > TRUE:
+                    stack += [self._low[node], self._high[node]]
+        return len(seen)
+
+    def sat_count(self, f):
+        """Number of assignments of all ``len(order)`` variables that make ``f`` true."""
+        memo = {FALSE: 0, TRUE: 1}
+
+        def count(node):
+            # Models of ``node`` over the variables from its own level down
+            if node not in memo:
+                level = self._var[node]
+                low, high = self._low[node], self._high[node]
+                memo[node] = (count(low) << (self._var[low] - level - 1)) + \
+                             (count(high) << (self._var[high] - level - 1))
+            return memo[node]
+
+        return count(f) << self._var[f]
+
+    def any_sat(self, f):
+        """One satisfying assignment ``{name: 0/1}`` (tested variables only), or ``None``."""
+        if f == FALSE:
+            return None
+        assignment = {}
+        while f > TRUE:
+            name = self.order[self._var[f]]
+            if self._high[f] != FALSE:
+                assignment[name], f = 1, self._high[f]
+            else:
+                assignment[name], f = 0, self._low[f]
+        return assignment
+
+    def minterms(self, f, variables=None):
+        """
+        Yield the minterm indices of ``f`` over ``variables`` (default: the
+        BDD order), first variable = MSB. Each path expands its skipped levels;
+        indices come in path order, so sort them if the BDD order differs.
+        """
+        variables = [str(v) for v in (variables or self.order)]
+        n = len(variables)
+        weight = {self.level[name]: 1 << (n - 1 - i) for i, name in enumerate(variables)}
+        levels = len(self.order)
+
+        def paths(node, level, value):
+            if node == FALSE:
+                return
+            if level == levels:
+                yield value
+                return
+            if self._var[node] != level:  # variable not tested on this path: both values
+                yield from paths(node, level + 1, value)
+                yield from paths(node, level + 1, value | weight[level])
+            else:
+                yield from paths(self._low[node], level + 1, value)
+                yield from paths(self._high[node], level + 1, value | weight[level])
+
+        return paths(f, 0, 0)
+
+
+def check_equivalence(a, b, variables=None):
+    """
+    Compare two expressions (ASTs or SymPy) with one shared BDD. Returns
+    ``Equivalence(equal, counterexample)``; the counterexample assigns every
+    variable and makes the two expressions differ.
+    """
+    a, b = as_ast(a), as_ast(b)
+    order = dfs_order(("xor", a, b), variables)
+    bdd = BDD(order)
+    fa, fb = bdd.build(a), bdd.build(b)
+    if fa == fb:
+        return Equivalence(True, None)
+    witness = bdd.any_sat(bdd.xor(fa, fb))
+    return Equivalence(False, {name: witness.get(name, 0) for name in order})
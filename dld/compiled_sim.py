@@ -0,0 +1,261 @@
+"""
+Levelized, compiled-code, bit-parallel simulation of combinational netlists.
+
+The event-driven simulator (``event_sim``) follows one vector at a time with
+real gate delays. For zero-delay functional testing that is wasted effort:
+every gate has to be evaluated for every vector anyway. Here the gates are
+sorted topologically once and turned into straight-line Python code (one
+``&``/``|``/``^`` statement per gate, like ``compiler.generate_source``) that
+runs on NumPy ``uint64`` arrays. Bit ``b`` of word ``w`` is vector
+``64 * w + b``, so one pass evaluates ``64 × words`` vectors.
+
+Flip-flops are cut (full-scan view): each Q is an extra input and each D an
+extra output named ``<q>.next``, so one pass computes the next state.
+"""
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from dld.lru import LRUCache
+from dld.netlist import CLOCK, to_bench
+
+WORD_BITS = 64
+BLOCK_WORDS = 1024  # words per pass: 65,536 vectors
+EXHAUSTIVE_MAX_INPUTS = 24
+ONES = np.uint64(0xFFFF_FFFF_FFFF_FFFF)
+
+COMPILED_NETLISTS = LRUCache(maxsize=32)
+
+TestResult = namedtuple("TestResult", "vectors seconds exhaustive mismatch")
+Mismatch = namedtuple("Mismatch", "inputs outputs expected")
+
+_JOIN = {"and": " & ", "nand": " & ", "or": " | ", "nor": " | ", "xor": " ^ ", "xnor": " ^ "}
+
+
+def generate_source(netlist):
+    """Python source of ``f(inputs..., ones, zero)`` returning a tuple of output words."""
+    names = netlist.names
+    params = [n for n in netlist.inputs if names[n] != CLOCK] + [ff.q for ff in netlist.flip_flops]
+    var = {net: f"v{net}" for net in params}
+    order = netlist.levelize()
+    keep = set(netlist.outputs) | {ff.d for ff in netlist.flip_flops}
+    last_use = {}
+    for step, i in enumerate(order):
+        for n in netlist.gates[i].inputs:
+            last_use[n] = step
+    lines = []
+    for step, i in enumerate(order):
+        gate = netlist.gates[i]
+        args = [var[n] for n in gate.inputs]
+        if gate.op == "const0":
+            code = "zero"
+        elif gate.op == "const1":
+            code = "ones"
+        elif gate.op == "buf":
+            code = args[0]
+        elif gate.op == "not":
+            code = f"ones ^ {args[0]}"
+        else:
+            code = _JOIN[gate.op].join(args)
+            if gate.op in ("nand", "nor", "xnor"):
+                code = f"ones ^ ({code})"
+        var[gate.output] = f"v{gate.output}"
+        lines.append(f"    v{gate.output} = {code}")
+        # Drop temporaries after their last reader so the working set stays in cache
+        dead = sorted({var[n] for n in gate.inputs if last_use[n] == step and n not in keep})
+        if dead:
+            lines.append(f"    del {', '.join(dead)}")
+    results = [var[n] for n in netlist.outputs] + [var[ff.d] for ff in netlist.flip_flops]
+    signature = ", ".join([var[n] for n in params] + ["ones", "zero"])
+    body = "\n".join(lines + [f"    return ({', '.join(results)},)"])
+    return f"def f({signature}):\n{body}\n"
+
+
+class CompiledCircuit:
+    """A netlist compiled to one straight-line function over packed vectors."""
+
+    def __init__(self, netlist):
+        names = netlist.names
+        self.inputs = [names[n] for n in netlist.inputs if names[n] != CLOCK] + \
+                      [names[ff.q] for ff in netlist.flip_flops]
+        self.outputs = [names[n] for n in netlist.outputs] + \
+                       [f"{names[ff.q]}.next" for ff in netlist.flip_flops]
+        self.gate_count = netlist.gate_count
+        self.source = generate_source(netlist)
+        namespace = {}
+        # Generated code: nets appear as v<net>, never by their text names
+        exec(compile(self.source, "<netlist>", "exec"), namespace)  # noqa: S102
+        self._func = namespace["f"]
+
+    def evaluate(self, words):
+        """Output words for ``words`` (one uint64 array per input, all the same length)."""
+        length = len(words[0]) if words else 1
+        zero = np.zeros(length, dtype=np.uint64)
+        outputs = self._func(*words, ONES, zero)
+        # Outputs tied to a constant come back as a scalar
+        return [np.broadcast_to(np.asarray(out, dtype=np.uint64), (length,)) for out in outputs]
+
+    def run(self, patterns):
+        """Outputs (vectors × outputs, 0/1 uint8) for a vectors × inputs 0/1 matrix."""
+        patterns = np.asarray(patterns, dtype=np.uint8)
+        count = len(patterns)
+        results = []
+        for start in range(0, count, BLOCK_WORDS * WORD_BITS):
+            block = patterns[start:start + BLOCK_WORDS * WORD_BITS]
+            results.append(unpack_words(self.evaluate(pack_patterns(block)), len(block)))
+        if not results:
+            return np.zeros((0, len(self.outputs)), dtype=np.uint8)
+        return np.vstack(results)
+
+
+def compile_netlist(netlist):
+    """Cached ``CompiledCircuit`` (keyed by the netlist's ``.bench`` text)."""
+    key = to_bench(netlist)
+    circuit = COMPILED_NETLISTS.get(key)
+    if circuit is None:
+        circuit = CompiledCircuit(netlist)
+        COMPILED_NETLISTS.put(key, circuit)
+    return circuit
+
+
+# ---- packing -------------------------------------------------------------
+
+def pack_patterns(patterns):
+    """vectors × inputs 0/1 matrix → one uint64 word array per input."""
+    patterns = np.asarray(patterns, dtype=np.uint8)
+    count, width = patterns.shape
+    words = -(-count // WORD_BITS)
+    padded = np.zeros((words * WORD_BITS, width), dtype=np.uint8)
+    padded[:count] = patterns
+    packed = np.ascontiguousarray(np.packbits(padded.T, axis=1, bitorder="little"))  # width × words*8 bytes
+    return list(packed.view("<u8").astype(np.uint64))
+
+
+def unpack_words(words, count):
+    """Inverse of ``pack_patterns``: word arrays → count × len(words) 0/1 matrix."""
+    if not len(words):
+        return np.zeros((count, 0), dtype=np.uint8)
+    raw = np.stack([np.ascontiguousarray(w, dtype="<u8") for w in words]).view(np.uint8)
+    return np.unpackbits(raw, axis=1, bitorder="little")[:, :count].T.copy()
+
+
+def exhaustive_words(num_inputs, start_word, count):
+    """
+    Input words for rows ``64 * start_word`` .. of the exhaustive truth table
+    (first input = MSB of the row number, as in ``truth_table``).
+    """
+    word_index = np.arange(start_word, start_word + count, dtype=np.uint64)
+    words = []
+    for i in range(num_inputs):
+        k = num_inputs - 1 - i  # bit of the row number
+        if k >= 6:
+            words.append(np.where((word_index >> np.uint64(k - 6)) & np.uint64(1), ONES, np.uint64(0)))
+        else:
+            pattern = sum(1 << b for b in range(WORD_BITS) if (b >> k) & 1)
+            words.append(np.full(count, pattern, dtype=np.uint64))
+    return words
+
+
+# ---- testing -------------------------------------------------------------
+
+def pattern_blocks(num_inputs, vectors=1 << 20, seed=0):
+    """
+    Input blocks for a test run: every combination when there are at most
+    ``EXHAUSTIVE_MAX_INPUTS`` inputs, otherwise ``vectors`` random vectors.
+    Yields ``(first_word, words, valid)``; ``valid`` masks the padding bits
+    of the last word.
+    """
+    total = (1 << num_inputs) if num_inputs <= EXHAUSTIVE_MAX_INPUTS else vectors
+    total_words = -(-total // WORD_BITS)
+    rng = np.random.default_rng(seed)
+    for first in range(0, total_words, BLOCK_WORDS):
+        count = min(BLOCK_WORDS, total_words - first)
+        if num_inputs <= EXHAUSTIVE_MAX_INPUTS:
+            words = exhaustive_words(num_inputs, first, count)
+        else:
+            words = list(rng.integers(0, 1 << 64, size=(num_inputs, count), dtype=np.uint64, endpoint=False))
+        valid = np.full(count, ONES, dtype=np.uint64)
+        tail = total - (first + count - 1) * WORD_BITS
+        if tail < WORD_BITS:
+            valid[-1] = np.uint64((1 << tail) - 1)
+        yield first, words, valid
+
+
+def _bit(word_array, w, b):
+    return int((word_array[w] >> np.uint64(b)) & np.uint64(1))
+
+
+def _first_mismatch(got, expected, valid):
+    """(word, bit) of the first differing vector, or ``None``."""
+    diff = np.zeros(len(valid), dtype=np.uint64)
+    for a, b in zip(got, expected):
+        diff |= a ^ b
+    diff &= valid
+    hits = np.flatnonzero(diff)
+    if not len(hits):
+        return None
+    w = int(hits[0])
+    word = int(diff[w])
+    return w, (word & -word).bit_length() - 1
+
+
+def compare(circuit, reference, vectors=1 << 20, seed=0):
+    """
+    Run ``circuit`` and ``reference`` (both ``CompiledCircuit``) on the same
+    ``pattern_blocks`` and compare the outputs they share by name. Returns
+    ``TestResult(vectors, seconds, exhaustive, mismatch)``; ``mismatch`` is the
+    first failing vector as ``Mismatch(inputs, outputs, expected)`` or ``None``.
+    """
+    missing = [name for name in reference.inputs if name not in circuit.inputs]
+    if missing:
+        raise ValueError(f"Reference input(s) missing from the circuit: {', '.join(missing)}")
+    shared = [name for name in reference.outputs if name in circuit.outputs]
+    if not shared:
+        raise ValueError("The circuit and the reference have no output in common")
+    got_index = [circuit.outputs.index(name) for name in shared]
+    ref_index = [reference.outputs.index(name) for name in shared]
+    ref_inputs = [circuit.inputs.index(name) for name in reference.inputs]
+
+    n = len(circuit.inputs)
+    exhaustive = n <= EXHAUSTIVE_MAX_INPUTS
+    tested = 0
+    start = time.perf_counter()
+    for first, words, valid in pattern_blocks(n, vectors, seed):
+        got = circuit.evaluate(words)
+        expected = reference.evaluate([words[i] for i in ref_inputs])
+        hit = _first_mismatch([got[i] for i in got_index], [expected[i] for i in ref_index], valid)
+        if hit is not None:
+            w, b = hit
+            mismatch = Mismatch({name: _bit(words[i], w, b) for i, name in enumerate(circuit.inputs)},
+                                {name: _bit(got[i], w, b) for name, i in zip(shared, got_index)},
+                                {name: _bit(expected[i], w, b) for name, i in zip(shared, ref_index)})
+            return TestResult((first + w) * WORD_BITS + b + 1, time.perf_counter() - start, exhaustive, mismatch)
+        tested += int(valid[-1]).bit_count() + WORD_BITS * (len(valid) - 1)
+    return TestResult(tested, time.perf_counter() - start, exhaustive, None)
+
+
+def output_counts(circuit, vectors=1 << 20, seed=0):
+    """
+    How often each output is 1 over ``pattern_blocks``. Returns
+    ``(counts, TestResult)`` where ``counts`` maps output name → number of 1s.
+    """
+    counts = dict.fromkeys(circuit.outputs, 0)
+    tested = 0
+    start = time.perf_counter()
+    for _, words, valid in pattern_blocks(len(circuit.inputs), vectors, seed):
+        for name, out in zip(circuit.outputs, circuit.evaluate(words)):
+            counts[name] += int(np.unpackbits((out & valid).view(np.uint8)).sum())
+        tested += int(valid[-1]).bit_count() + WORD_BITS * (len(valid) - 1)
+    exhaustive = len(circuit.inputs) <= EXHAUSTIVE_MAX_INPUTS
+    return counts, TestResult(tested, time.perf_counter() - start, exhaustive, None)
+
+
+def throughput(circuit, words=BLOCK_WORDS, passes=4, seed=0):
+    """Random-pattern vectors per second of ``circuit`` (``passes`` passes of ``words`` words)."""
+    rng = np.random.default_rng(seed)
+    batch = list(rng.integers(0, 1 << 64, size=(len(circuit.inputs), words), dtype=np.uint64, endpoint=False))
+    start = time.perf_counter()
+    for _ in range(passes):
+        circuit.evaluate(batch)
+    return passes * words * WORD_BITS / (time.perf_counter() - start)
@@ -0,0 +1,190 @@
+"""
+Espresso-style heuristic two-level minimizer for large functions.
+
+Exact minimization (``dld.qm``) blows up beyond about 12–14 inputs. This
+module trades the guarantee of a minimum for speed: starting from the
+minterms, it repeats the classic Espresso loop
+
+    expand      grow every cube as far as the ON ∪ DC set allows,
+                dropping the cubes it swallows
+    irredundant remove cubes whose ON minterms are all covered elsewhere
+    reduce      shrink each cube to the minterms only it covers
+
+until the cost (terms, literals) stops improving. Cubes use the same
+``(value, mask)`` convention as ``dld.qm`` so the result can be printed
+with ``qm.sop_ast``. Input is the usual ``minterms`` / ``dc_terms`` lists.
+"""
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from dld.qm import literal_count, popcount
+
+EspressoResult = namedtuple("EspressoResult", "implicants stats")
+
+MAX_ITERATIONS = 10
+ENUMERATE_LIMIT = 64  # cubes with at most this many points are checked point by point
+OFF_SET_VARS = 22  # up to this size the OFF set may be listed explicitly
+
+
+class _Function:
+    """ON and ON ∪ DC point sets with fast cube-containment checks."""
+
+    def __init__(self, num_vars, minterms, dont_cares):
+        self.num_vars = num_vars
+        self.full = (1 << num_vars) - 1
+        self.on = np.array(sorted(minterms), dtype=np.int64)
+        care = set(minterms) | set(dont_cares)
+        self.care_set = care
+        self.care = np.array(sorted(care), dtype=np.int64)
+        # For dense functions it is cheaper to look for an OFF point in the cube
+        self.off = None
+        if num_vars <= OFF_SET_VARS and len(care) > (1 << num_vars) // 2:
+            present = np.zeros(1 << num_vars, dtype=bool)
+            present[self.care] = True
+            self.off = np.flatnonzero(~present).astype(np.int64)
+        self._valid = {}
+
+    def inside(self, points, cube):
+        value, mask = cube
+        return (points & (self.full & ~mask)) == value
+
+    def valid(self, cube):
+        """True if every point of ``cube`` is in ON ∪ DC."""
+        known = self._valid.get(cube)
+        if known is not None:
+            return known
+        value, mask = cube
+        size = 1 << popcount(mask)
+        if size > len(self.care):
+            ok = False
+        elif size <= ENUMERATE_LIMIT:
+            ok = True
+            sub = mask
+            while True:
+                if value | sub not in self.care_set:
+                    ok = False
+                    break
+                if sub == 0:
+                    break
+                sub = (sub - 1) & mask
+        elif self.off is not None:
+            ok = not np.any(self.inside(self.off, cube))
+        else:
+            ok = int(np.count_nonzero(self.inside(self.care, cube))) == size
+        self._valid[cube] = ok
+        return ok
+
+
+def _contains(outer, inner):
+    (vo, mo), (vi, mi) = outer, inner
+    return mi & ~mo == 0 and (vo ^ vi) & ~mo == 0
+
+
+def _expand(func, cubes):
+    """Raise literals greedily; bigger cubes first, swallowed cubes are dropped."""
+    if any(mask for _, mask in cubes):
+        cubes = sorted(cubes, key=lambda c: -popcount(c[1]))
+    values = np.array([c[0] for c in cubes], dtype=np.int64)
+    masks = np.array([c[1] for c in cubes], dtype=np.int64)
+    uncovered = func.on
+    result = []
+    while len(values):
+        value, mask = int(values[0]), int(masks[0])
+        # Try first the literals with the most uncovered ON minterms just across them
+        diff = (uncovered & (func.full & ~mask)) ^ value
+        adjacent = diff[(diff != 0) & ((diff & (diff - 1)) == 0)]
+        free = [1 << b for b in range(func.num_vars) if not mask >> b & 1]
+        scores = {bit: int(np.count_nonzero(adjacent == bit)) for bit in free}
+        for bit in sorted(free, key=lambda b: -scores[b]):
+            candidate = (value & ~bit, mask | bit)
+            if func.valid(candidate):
+                value, mask = candidate
+        cube = (value, mask)
+        keep = func.full & ~mask
+        # Drop every pending cube the expanded one swallowed (including itself)
+        pending = ((masks & keep) != 0) | (((values ^ value) & keep) != 0)
+        values, masks = values[pending], masks[pending]
+        uncovered = uncovered[~func.inside(uncovered, cube)]
+        result = [c for c in result if not _contains(cube, c)]
+        result.append(cube)
+    return result
+
+
+def _coverage_counts(func, cubes):
+    inside = np.array([func.inside(func.on, c) for c in cubes], dtype=bool).reshape(len(cubes), -1)
+    return inside, inside.sum(axis=0)
+
+
+def _irredundant(func, cubes):
+    """Drop cubes whose ON minterms are all covered by the other cubes."""
+    if not cubes:
+        return cubes
+    inside, counts = _coverage_counts(func, cubes)
+    keep = []
+    # Try to remove the small (expensive) cubes first
+    order = sorted(range(len(cubes)), key=lambda i: popcount(cubes[i][1]))
+    removed = set()
+    for i in order:
+        if np.all(counts[inside[i]] >= 2):
+            counts[inside[i]] -= 1
+            removed.add(i)
+    for i, cube in enumerate(cubes):
+        if i not in removed:
+            keep.append(cube)
+    return keep
+
+
+def _reduce(func, cubes):
+    """Shrink each cube to the supercube of the ON minterms only it covers."""
+    if not cubes:
+        return cubes
+    inside, counts = _coverage_counts(func, cubes)
+    reduced = []
+    for i in sorted(range(len(cubes)), key=lambda i: -popcount(cubes[i][1])):
+        unique = func.on[inside[i] & (counts == 1)]
+        if len(unique) == 0:
+            counts[inside[i]] -= 1  # fully covered by others: drop it
+            continue
+        ones = int(np.bitwise_or.reduce(unique))
+        zeros = int(np.bitwise_and.reduce(unique))
+        mask = ones ^ zeros
+        cube = (zeros, mask)
+        now_inside = func.inside(func.on, cube)
+        counts[inside[i]] -= 1
+        counts[now_inside] += 1
+        reduced.append(cube)
+    return reduced
+
+
+def _cost(cubes, num_vars):
+    return (len(cubes), sum(literal_count(c, num_vars) for c in cubes))
+
+
+def minimize(num_vars, minterms, dont_cares=(), max_iterations=MAX_ITERATIONS):
+    """
+    Heuristic minimal SOP cover of ``minterms`` (with optional don't-cares).
+    Returns ``EspressoResult(implicants, stats)``.
+    """
+    start = time.perf_counter()
+    minterms = sorted(set(minterms))
+    dont_cares = set(dont_cares) - set(minterms)
+    func = _Function(num_vars, minterms, dont_cares)
+    stats = {"variables": num_vars, "minterms": len(minterms), "dont_cares": len(dont_cares)}
+
+    cover = _irredundant(func, _expand(func, [(m, 0) for m in minterms]))
+    best, best_cost = cover, _cost(cover, num_vars)
+    iterations = 1
+    while iterations < max_iterations:
+        iterations += 1
+        cover = _irredundant(func, _expand(func, _reduce(func, best)))
+        cost = _cost(cover, num_vars)
+        if cost >= best_cost:
+            break
+        best, best_cost = cover, cost
+
+    stats["iterations"] = iterations
+    stats["terms"], stats["literals"] = best_cost
+    stats["time"] = time.perf_counter() - start
+    return EspressoResult(sorted(best, key=lambda c: (c[1], c[0])), stats)
@@ -0,0 +1,223 @@
+"""
+Event-driven gate-level simulation of a ``Netlist``.
+
+Only changes are simulated. When a net changes value, the gates that read it
+are re-evaluated. A gate whose output would change schedules an event
+``delay`` time units later. Work is therefore proportional to switching
+activity, not to circuit size × time, and per-gate delays show glitches and
+races the way a real circuit would (transport delay).
+
+Pending events live in a *timing wheel*: since every delay is at most
+``max_delay``, all scheduled events fall inside the next ``max_delay + 1``
+time units, so a ring of that many buckets indexed by ``time % size`` takes
+every event in O(1). Input changes can be scheduled any time ahead and sit
+in a small heap until their time comes.
+
+Each time step first applies all events due at that time, then evaluates
+every affected gate once. A ``DFF`` samples D (the value from before the
+step) on a rising edge of its clock. Feedback loops such as a NOR latch are
+fine; a loop that oscillates simply keeps producing events until ``until``.
+"""
+import heapq
+import itertools
+import time
+from collections import defaultdict, namedtuple
+
+from dld.netlist import CLOCK, NetlistError, evaluate_gate
+
+MAX_TRACE = 200_000  # recorded changes per run (the rest are still simulated)
+
+SimResult = namedtuple("SimResult", "samples trace stats period")
+
+
+def gate_function(op, inputs):
+    """``f(values) -> 0/1`` for one gate, specialised for the common 1- and 2-input cases."""
+    if len(inputs) == 2:
+        a, b = inputs
+        if op == "and":
+            return lambda v: v[a] & v[b]
+        if op == "or":
+            return lambda v: v[a] | v[b]
+        if op == "xor":
+            return lambda v: v[a] ^ v[b]
+        if op == "nand":
+            return lambda v: 1 ^ (v[a] & v[b])
+        if op == "nor":
+            return lambda v: 1 ^ (v[a] | v[b])
+        if op == "xnor":
+            return lambda v: 1 ^ v[a] ^ v[b]
+    if op == "not":
+        a = inputs[0]
+        return lambda v: 1 ^ v[a]
+    if op == "buf":
+        a = inputs[0]
+        return lambda v: v[a]
+    return lambda v: evaluate_gate(op, [v[n] for n in inputs])
+
+
+class EventSimulator:
+    """Event-driven simulator for one netlist; state persists across ``run`` calls."""
+
+    def __init__(self, netlist, watch=None, max_trace=MAX_TRACE, on_change=None):
+        self.netlist = netlist
+        size = len(netlist.names)
+        self.values = [0] * size
+        self.projected = [0] * size  # last value scheduled for each net
+        self.readers = netlist.fanout()
+        self.clocked = defaultdict(list)
+        for ff in netlist.flip_flops:
+            self.clocked[ff.clock].append(ff)
+            self.values[ff.q] = self.projected[ff.q] = ff.init
+        delays = [g.delay for g in netlist.gates] + [ff.delay for ff in netlist.flip_flops]
+        self.size = max(delays, default=1) + 1
+        self.wheel = [[] for _ in range(self.size)]
+        self.pending = 0
+        self.stimulus = []  # (time, seq, net, value)
+        self._seq = itertools.count()
+        self.now = 0
+        self.watch = set(range(size) if watch is None else (netlist.index[str(n)] for n in watch))
+        self.max_trace = max_trace
+        self.trace = []  # (time, net, value)
+        self.on_change = on_change  # called as on_change(time, net, value) for watched nets
+        self.stats = {"events": 0, "evaluations": 0, "steps": 0, "seconds": 0.0}
+        self._started = False
+        self._compiled = [(gate_function(g.op, g.inputs), g.output, g.delay) for g in netlist.gates]
+
+    def set_input(self, name, value, at=None):
+        """Drive primary input ``name`` to ``value`` at time ``at`` (default: now)."""
+        net = self.netlist.index.get(str(name))
+        if net is None or self.netlist.driver.get(net) != "input":
+            raise NetlistError(f"'{name}' is not a primary input")
+        at = self.now if at is None else at
+        if at < self.now:
+            raise ValueError(f"Cannot schedule at {at}: the simulation is already at {self.now}")
+        heapq.heappush(self.stimulus, (at, next(self._seq), net, int(value)))
+
+    def value(self, name):
+        return self.values[self.netlist.index[str(name)]]
+
+    def _schedule(self, net, value, at):
+        self.projected[net] = value
+        self.wheel[at % self.size].append((net, value))
+        self.pending += 1
+
+    def _evaluate(self, gates, now):
+        values, projected, wheel, size = self.values, self.projected, self.wheel, self.size
+        compiled = self._compiled
+        scheduled = 0
+        for i in gates:
+            func, output, delay = compiled[i]
+            out = func(values)
+            if out != projected[output]:
+                projected[output] = out
+                wheel[(now + delay) % size].append((output, out))
+                scheduled += 1
+        self.pending += scheduled
+        self.stats["evaluations"] += len(gates)
+
+    def _next_time(self):
+        best = self.stimulus[0][0] if self.stimulus else None
+        if self.pending:
+            for t in range(self.now, self.now + self.size):
+                if self.wheel[t % self.size]:
+                    return t if best is None else min(t, best)
+        return best
+
+    def _step(self, now):
+        values, watch = self.values, self.watch
+        slot = now % self.size
+        events = self.wheel[slot]
+        self.wheel[slot] = []
+        self.pending -= len(events)
+        while self.stimulus and self.stimulus[0][0] == now:
+            _, _, net, value = heapq.heappop(self.stimulus)
+            events.append((net, value))
+
+        before = {}
+        on_change = self.on_change
+        for net, value in events:
+            if values[net] != value:
+                before.setdefault(net, values[net])
+                values[net] = value
+                if net in watch:
+                    if len(self.trace) < self.max_trace:
+                        self.trace.append((now, net, value))
+                    if on_change is not None:
+                        on_change(now, net, value)
+        self.stats["events"] += len(before)
+        self.stats["steps"] += 1
+
+        dirty = set()
+        for net, old in before.items():
+            if values[net] == old:
+                continue  # changed and changed back within the step
+            dirty.update(self.readers[net])
+            if values[net] == 1 and net in self.clocked:
+                for ff in self.clocked[net]:
+                    d = before.get(ff.d, values[ff.d])
+                    if d != self.projected[ff.q]:
+                        self._schedule(ff.q, d, now + ff.delay)
+        self._evaluate(dirty, now)
+
+    def run(self, until):
+        """Process every event before time ``until``; afterwards ``now == until``."""
+        start = time.perf_counter()
+        if not self._started:
+            self._started = True
+            self._evaluate(range(len(self.netlist.gates)), self.now)  # settle from all-zero nets
+        while True:
+            t = self._next_time()
+            if t is None or t >= until:
+                break
+            self.now = t
+            self._step(t)
+        self.now = max(self.now, until)
+        self.stats["seconds"] += time.perf_counter() - start
+        return self
+
+    @property
+    def events_per_second(self):
+        return self.stats["events"] / self.stats["seconds"] if self.stats["seconds"] else 0.0
+
+
+def default_period(netlist):
+    """Clock / vector period long enough for every path to settle twice over."""
+    ff_delay = max((ff.delay for ff in netlist.flip_flops), default=0)
+    try:
+        settle = netlist.critical_delay()
+    except NetlistError:  # feedback loops: bound by the sum of all delays
+        settle = sum(g.delay for g in netlist.gates)
+    return 2 * (settle + ff_delay) + 2
+
+
+def simulate(netlist, vectors, period=None, watch=None, max_trace=MAX_TRACE, on_change=None):
+    """
+    Apply one input vector (``{input: 0/1}``) per period. If the netlist has
+    flip-flops on the implicit ``clk`` input, the clock falls at the start of
+    each period and rises half-way through. Returns ``SimResult(samples,
+    trace, stats, period)``: ``samples`` holds every output (and flip-flop
+    output) at the end of each period, ``trace`` the recorded changes as
+    ``(time, net name, value)``. ``on_change(time, net, value)`` is called
+    for every change of a watched net as it happens (e.g. a ``vcd.VCDWriter``).
+    """
+    period = period or default_period(netlist)
+    sim = EventSimulator(netlist, watch=watch, max_trace=max_trace, on_change=on_change)
+    names = netlist.names
+    clock = netlist.index.get(CLOCK)
+    clocked = clock is not None and netlist.driver.get(clock) == "input" and bool(sim.clocked.get(clock))
+    probes = list(dict.fromkeys(netlist.outputs + [ff.q for ff in netlist.flip_flops]))
+
+    samples = []
+    for k, vector in enumerate(vectors):
+        start = k * period
+        for name, value in vector.items():
+            sim.set_input(name, value, start)
+        if clocked:
+            sim.set_input(CLOCK, 0, start)
+            sim.set_input(CLOCK, 1, start + period // 2)
+        sim.run(start + period)
+        samples.append({names[n]: sim.values[n] for n in probes})
+
+    stats = dict(sim.stats, gates=netlist.gate_count, events_per_second=sim.events_per_second)
+    trace = [(t, names[net], value) for t, net, value in sim.trace]
+    return SimResult(samples, trace, stats, period)
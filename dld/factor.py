@@ -0,0 +1,225 @@
+"""
+Multi-level logic optimization by algebraic factoring.
+
+``simplify_logic`` returns two-level logic: one wide OR of wide ANDs (or the
+reverse). Factoring rewrites a sum of products algebraically, treating the
+literals as independent symbols, so the result is equivalent by construction:
+
+- common-cube extraction: ``ab + ac`` → ``a(b + c)``
+- kernels: a kernel of F is a cube-free quotient ``F / c`` by a cube ``c``
+  (its co-kernel). Dividing F by a kernel K gives ``F = Q·K + R``.
+
+``factor_sop`` is the "good factor" recursion: it picks a kernel as divisor,
+makes the quotient cube-free, and recurses on quotient, divisor and
+remainder. Small covers try every kernel; larger ones take a level-0 kernel
+found by repeatedly dividing by a literal that occurs in at least two cubes,
+which is linear in the number of literals, so the whole pass stays roughly
+linear in the expression size. Products of sums are handled by duality.
+Repeated factors are then shared for free by the hash-consed ``GateDAG``.
+
+A cover is a list of cubes; a cube is a frozenset of literals ``(name, positive)``.
+"""
+from collections import Counter
+
+from dld.compiler import as_ast
+
+# Up to this many cubes all kernels are tried; bigger covers use the quick divisor
+KERNEL_SEARCH_CUBES = 24
+
+
+# ---- covers -------------------------------------------------------------
+
+def _literal_of(node):
+    if node[0] == "var":
+        return (node[1], True)
+    if node[0] == "not" and node[1][0] == "var":
+        return (node[1][1], False)
+    return None
+
+
+def _cube_of(node):
+    literal = _literal_of(node)
+    if literal is not None:
+        return frozenset([literal])
+    if node[0] == "and":
+        literals = [_literal_of(arg) for arg in node[1:]]
+        if all(literals):
+            return frozenset(literals)
+    return None
+
+
+def as_cover(ast):
+    """The cubes of a sum-of-products AST, or ``None`` if it is not one."""
+    terms = ast[1:] if ast[0] == "or" else (ast,)
+    cubes = [_cube_of(t) for t in terms]
+    return cubes if all(c is not None for c in cubes) else None
+
+
+def common_cube(cover):
+    """Largest cube dividing every cube of ``cover``."""
+    return frozenset.intersection(*cover) if cover else frozenset()
+
+
+def divide(cover, divisor):
+    """Algebraic (weak) division: ``cover = quotient · divisor + remainder``."""
+    quotient = None
+    for d in divisor:
+        q = {c - d for c in cover if d <= c}
+        quotient = q if quotient is None else quotient & q
+        if not quotient:
+            return [], list(cover)
+    product = {q | d for q in quotient for d in divisor}
+    return sorted(quotient, key=sorted), [c for c in cover if c not in product]
+
+
+def _repeated_literal(cover):
+    counts = Counter(lit for cube in cover for lit in cube)
+    literal, count = max(counts.items(), key=lambda item: (item[1], item[0]), default=(None, 0))
+    return literal if count >= 2 else None
+
+
+def kernels(cover, min_literal=None):
+    """All ``(co_kernel, kernel)`` pairs of ``cover`` (kernel-of-kernel recursion)."""
+    result = []
+    literals = sorted({lit for cube in cover for lit in cube})
+    for i, literal in enumerate(literals):
+        if min_literal is not None and literal <= min_literal:
+            continue
+        with_lit = [c for c in cover if literal in c]
+        if len(with_lit) < 2:
+            continue
+        cube = common_cube(with_lit)
+        # Skip if an earlier literal is in the cube: that kernel was already found
+        if any(l in cube for l in literals[:i]):
+            continue
+        quotient = [c - cube for c in with_lit]
+        for co_kernel, kernel in kernels(quotient, literal):
+            result.append((co_kernel | cube, kernel))
+    if len(cover) > 1 and not common_cube(cover):
+        result.append((frozenset(), list(cover)))
+    return result
+
+
+def quick_divisor(cover):
+    """A level-0 kernel of ``cover`` (``None`` if no literal repeats)."""
+    if len(cover) < 2 or _repeated_literal(cover) is None:
+        return None
+    current = list(cover)
+    while True:
+        literal = _repeated_literal(current)
+        if literal is None:
+            return current
+        with_lit = [c for c in current if literal in c]
+        cube = common_cube(with_lit)
+        current = [c - cube for c in with_lit]
+
+
+def _literals(cover):
+    return sum(len(c) for c in cover)
+
+
+def best_divisor(cover):
+    """
+    Divisor for the next factoring step: for small covers the kernel that
+    saves the most literals, otherwise the (linear-time) quick divisor.
+    """
+    if len(cover) > KERNEL_SEARCH_CUBES:
+        return quick_divisor(cover)
+    best, best_saving = None, 0
+    for co_kernel, kernel in kernels(cover):
+        if not co_kernel:
+            continue  # F itself
+        quotient, _ = divide(cover, kernel)
+        # Q·K costs lits(Q) + lits(K) instead of |Q|·lits(K) + |K|·lits(Q)
+        saving = (len(quotient) - 1) * _literals(kernel) + (len(kernel) - 1) * _literals(quotient)
+        if saving > best_saving:
+            best, best_saving = kernel, saving
+    return best
+
+
+# ---- factoring ----------------------------------------------------------
+
+def _lit_ast(literal):
+    name, positive = literal
+    return ("var", name) if positive else ("not", ("var", name))
+
+
+def _join(op, items):
+    flat = []
+    for item in items:
+        flat.extend(item[1:] if item[0] == op else [item])
+    if not flat:
+        return ("const", op == "and")
+    return flat[0] if len(flat) == 1 else (op, *flat)
+
+
+def _cube_ast(cube):
+    return _join("and", [_lit_ast(l) for l in sorted(cube)])
+
+
+def _cover_ast(cover):
+    return _join("or", [_cube_ast(c) for c in cover])
+
+
+def _literal_factor(cover, cube):
+    """Factor out the literal of ``cube`` that occurs most often in ``cover``."""
+    counts = Counter(lit for c in cover for lit in c if lit in cube)
+    literal = max(counts, key=lambda l: (counts[l], l))
+    quotient, remainder = divide(cover, [frozenset([literal])])
+    parts = [_join("and", [_lit_ast(literal), factor_sop(quotient)])]
+    if remainder:
+        parts.append(factor_sop(remainder))
+    return _join("or", parts)
+
+
+def factor_sop(cover):
+    """Factored AST of a cover (list of cubes)."""
+    if len(cover) <= 1:
+        return _cover_ast(cover)
+    cube = common_cube(cover)
+    if cube:
+        return _join("and", [_cube_ast(cube), factor_sop([c - cube for c in cover])])
+    divisor = best_divisor(cover)
+    if divisor is None:
+        return _cover_ast(cover)
+    quotient, _ = divide(cover, divisor)
+    if len(quotient) == 1:
+        return _literal_factor(cover, quotient[0])
+    quotient = [c - common_cube(quotient) for c in quotient]  # make it cube-free
+    divisor, remainder = divide(cover, quotient)
+    if common_cube(divisor):
+        return _literal_factor(cover, common_cube(divisor))
+    parts = [_join("and", [factor_sop(quotient), factor_sop(divisor)])]
+    if remainder:
+        parts.append(factor_sop(remainder))
+    return _join("or", parts)
+
+
+def _dual(ast):
+    op = ast[0]
+    if op == "and":
+        return ("or", *(_dual(a) for a in ast[1:]))
+    if op == "or":
+        return ("and", *(_dual(a) for a in ast[1:]))
+    if op == "const":
+        return ("const", not ast[1])
+    return ast  # literals
+
+
+def factor_ast(expr):
+    """
+    Multi-level version of ``expr`` (AST or SymPy): sums of products and
+    products of sums are factored, anything else is factored inside.
+    """
+    ast = as_ast(expr)
+    op = ast[0]
+    if op in ("var", "const") or _literal_of(ast) is not None:
+        return ast
+    cover = as_cover(ast)
+    if cover is not None:
+        return factor_sop(cover)
+    if op == "and":
+        dual_cover = as_cover(_dual(ast))
+        if dual_cover is not None:
+            return _dual(factor_sop(dual_cover))
+    return (op, *(factor_ast(arg) for arg in ast[1:]))
@@ -0,0 +1,215 @@
+"""
+Stuck-at fault simulation with parallel patterns, fault dropping and test
+compaction.
+
+The fault list has a stuck-at-0 and a stuck-at-1 fault on every net (stem
+faults). It uses the same full-scan view as ``compiled_sim``: flip-flop
+outputs act as inputs, and flip-flop D nets are observed like outputs.
+
+Parallel-pattern single-fault propagation (PPSFP). Vectors come from
+``compiled_sim.pattern_blocks`` and are processed ``FAULT_BLOCK_WORDS`` words
+at a time. Each net's values over a block form one Python int, with bit ``k``
+for vector ``k`` (the packed form ``truth_table`` uses). The fault-free
+circuit is simulated once per block. Each remaining fault then forces its
+net to all-0s or all-1s, and only gates reading a net whose faulty value
+*differs* are evaluated again. A heap keyed by topological position keeps
+them in order. Propagation dies out where the fault is masked, and it stops
+as soon as a difference reaches an observed net. That fault is then detected
+and dropped from later blocks. Most faults are caught by the first block or
+two, so the long tail of vectors is spent only on the hard ones.
+
+Compaction: the first detecting vector of each fault is a candidate. Every
+detected fault is propagated in full over all the candidates at once. A
+greedy set cover then keeps the fewest candidates that still detect every
+one of those faults.
+"""
+import functools
+import heapq
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from dld.compiled_sim import pattern_blocks
+from dld.netlist import CLOCK
+
+FAULT_BLOCK_WORDS = 64  # 4,096 vectors per fault-simulation pass
+DEFAULT_VECTORS = 1 << 16
+
+Fault = namedtuple("Fault", "net value")
+FaultReport = namedtuple("FaultReport", "faults detected coverage vectors tests undetected seconds")
+
+
+def _as_int(words):
+    return int.from_bytes(np.ascontiguousarray(words, dtype="<u8").tobytes(), "little")
+
+
+def word_function(op, inputs):
+    """``f(values, mask)`` for one gate over packed ints, like ``event_sim.gate_function``."""
+    if len(inputs) == 2:
+        a, b = inputs
+        if op == "and":
+            return lambda v, m: v[a] & v[b]
+        if op == "or":
+            return lambda v, m: v[a] | v[b]
+        if op == "xor":
+            return lambda v, m: v[a] ^ v[b]
+        if op == "nand":
+            return lambda v, m: m ^ (v[a] & v[b])
+        if op == "nor":
+            return lambda v, m: m ^ (v[a] | v[b])
+        if op == "xnor":
+            return lambda v, m: m ^ v[a] ^ v[b]
+    if op == "not":
+        a = inputs[0]
+        return lambda v, m: m ^ v[a]
+    if op == "buf":
+        a = inputs[0]
+        return lambda v, m: v[a]
+    if op == "const0":
+        return lambda v, m: 0
+    if op == "const1":
+        return lambda v, m: m
+    reduce = {"and": int.__and__, "nand": int.__and__, "or": int.__or__, "nor": int.__or__}.get(op, int.__xor__)
+    invert = op in ("nand", "nor", "xnor")
+    return lambda v, m: (m if invert else 0) ^ functools.reduce(reduce, [v[n] for n in inputs])
+
+
+class FaultSimulator:
+    """PPSFP fault simulator for one netlist without combinational loops."""
+
+    def __init__(self, netlist):
+        self.netlist = netlist
+        names = netlist.names
+        self.order = netlist.levelize()
+        self.position = {g: k for k, g in enumerate(self.order)}
+        self.readers = netlist.fanout()
+        self.inputs = [n for n in netlist.inputs if names[n] != CLOCK] + [ff.q for ff in netlist.flip_flops]
+        self.observed = set(netlist.outputs) | {ff.d for ff in netlist.flip_flops}
+        self._compiled = [(word_function(g.op, g.inputs), g.output) for g in netlist.gates]
+        clock = netlist.index.get(CLOCK)
+        self.faults = [Fault(net, value) for net in range(len(names)) if net != clock for value in (0, 1)]
+
+    def fault_name(self, fault):
+        return f"{self.netlist.names[fault.net]} s-a-{fault.value}"
+
+    def good_values(self, inputs, mask):
+        """Fault-free value (packed int) of every net, given the packed ``inputs``."""
+        values = [0] * len(self.netlist.names)
+        for net, value in zip(self.inputs, inputs):
+            values[net] = value
+        compiled = self._compiled
+        for g in self.order:
+            func, output = compiled[g]
+            values[output] = func(values, mask)
+        return values
+
+    def propagate(self, fault, good, mask, first_only=False):
+        """
+        Vectors (packed int) that detect ``fault``: the bitwise OR of the
+        differences on the observed nets. With ``first_only`` it returns as
+        soon as one observed net differs, which is enough to detect the fault.
+        """
+        stuck = mask if fault.value else 0
+        if stuck == good[fault.net]:
+            return 0  # not excited by any vector in this block
+        compiled, order, position, readers = self._compiled, self.order, self.position, self.readers
+        observed = self.observed
+        detected = stuck ^ good[fault.net] if fault.net in observed else 0
+        if detected and first_only:
+            return detected
+        faulty = good[:]  # copied once per fault: cheaper than merging lookups per gate
+        faulty[fault.net] = stuck
+        heap = [position[g] for g in readers[fault.net]]
+        heapq.heapify(heap)
+        queued = set(heap)
+        while heap:
+            func, output = compiled[order[heapq.heappop(heap)]]
+            out = func(faulty, mask)
+            if out == good[output]:
+                continue  # masked here
+            faulty[output] = out
+            if output in observed:
+                detected |= out ^ good[output]
+                if first_only:
+                    return detected
+            for g in readers[output]:
+                pos = position[g]
+                if pos not in queued:
+                    queued.add(pos)
+                    heapq.heappush(heap, pos)
+        return detected
+
+    def run(self, vectors=DEFAULT_VECTORS, seed=0):
+        """
+        Fault-simulate every fault with fault dropping, then compact the tests.
+        Vectors are exhaustive when the inputs allow it, otherwise ``vectors``
+        random ones. Returns a ``FaultReport``, where ``tests`` is the
+        compacted test set as ``{input name: 0/1}`` dicts.
+        """
+        start = time.perf_counter()
+        names = self.netlist.names
+        remaining = list(self.faults)
+        first_test = {}  # fault -> vector (tuple of input bits)
+        simulated = 0
+        for _, words, valid in pattern_blocks(len(self.inputs), vectors, seed):
+            for w in range(0, len(valid), FAULT_BLOCK_WORDS):
+                mask = _as_int(valid[w:w + FAULT_BLOCK_WORDS])
+                inputs = [_as_int(x[w:w + FAULT_BLOCK_WORDS]) & mask for x in words]
+                good = self.good_values(inputs, mask)
+                still = []
+                for fault in remaining:
+                    detected = self.propagate(fault, good, mask, first_only=True)
+                    if detected:
+                        k = (detected & -detected).bit_length() - 1
+                        first_test[fault] = tuple((x >> k) & 1 for x in inputs)
+                    else:
+                        still.append(fault)
+                remaining = still
+                simulated += mask.bit_count()
+                if not remaining:
+                    break
+            if not remaining:
+                break
+
+        tests = self.compact(first_test)
+        total = len(self.faults)
+        return FaultReport(
+            faults=total,
+            detected=len(first_test),
+            coverage=len(first_test) / total if total else 1.0,
+            vectors=simulated,
+            tests=[dict(zip((names[n] for n in self.inputs), t)) for t in tests],
+            undetected=[self.fault_name(f) for f in remaining],
+            seconds=time.perf_counter() - start,
+        )
+
+    def compact(self, first_test):
+        """Greedy set cover over the candidate vectors of the detected faults."""
+        candidates = list(dict.fromkeys(first_test.values()))
+        if len(candidates) <= 1:
+            return candidates
+        count = len(candidates)
+        mask = (1 << count) - 1
+        inputs = [sum(vector[i] << k for k, vector in enumerate(candidates)) for i in range(len(self.inputs))]
+        good = self.good_values(inputs, mask)
+        nbytes = -(-count // 8)
+        rows = b"".join(self.propagate(fault, good, mask).to_bytes(nbytes, "little") for fault in first_test)
+        detects = np.unpackbits(np.frombuffer(rows, dtype=np.uint8).reshape(len(first_test), nbytes),
+                                axis=1, bitorder="little")[:, :count].astype(bool)
+
+        chosen = []
+        uncovered = np.ones(len(first_test), dtype=bool)
+        while uncovered.any():
+            gains = detects[uncovered].sum(axis=0)
+            best = int(gains.argmax())
+            if not gains[best]:
+                break
+            chosen.append(candidates[best])
+            uncovered &= ~detects[:, best]
+        return chosen
+
+
+def fault_simulate(netlist, vectors=DEFAULT_VECTORS, seed=0):
+    """Shortcut for ``FaultSimulator(netlist).run(vectors, seed)``."""
+    return FaultSimulator(netlist).run(vectors, seed)
@@ -0,0 +1,270 @@
+"""
+Bulk ways of entering a Boolean function for the K-Map page.
+
+Every parser reads its input in a single pass and returns a ``FunctionSpec``
+with the integer minterm / don't-care sets the minimizers take. Minterm ``i``
+uses the usual numbering: the first variable is the most significant bit.
+
+Supported formats:
+
+- minterm lists: ``m(1,3,5) + d(7)`` (ranges such as ``m(0-3)`` allowed)
+- hex truth tables: ``0xE8`` (bit ``i`` of the number is the output of minterm ``i``)
+- CSV: one row per minterm, input bits then the output (0 / 1 / X), or
+  ``minterm,output`` pairs
+- several outputs, one ``name = m(...) + d(...)`` line each
+- PLA (Espresso/Berkeley format): ``.i``, ``.o``, ``.ilb``, ``.ob`` and cube rows
+  such as ``1-0 1``; every output column becomes its own function
+"""
+import csv
+import io
+import itertools
+import re
+from collections import namedtuple
+
+FunctionSpec = namedtuple("FunctionSpec", "num_vars minterms dont_cares names")
+
+MAX_VARS = 20
+_DC_VALUES = {"x", "X", "-", "2", "d", "D"}
+
+
+def default_names(num_vars):
+    """A, B, C, ... (then x20, x21 ... past Z)."""
+    return [chr(65 + i) if i < 26 else f"x{i}" for i in range(num_vars)]
+
+
+def _check_vars(num_vars):
+    if not 1 <= num_vars <= MAX_VARS:
+        raise ValueError(f"Between 1 and {MAX_VARS} variables are supported, got {num_vars}")
+
+
+def function_spec(num_vars, minterms, dont_cares, names=None):
+    overlap = minterms & dont_cares
+    if overlap:
+        shown = sorted(overlap)[:10]
+        raise ValueError(f"These terms are in both minterms and don't cares: {shown}")
+    return FunctionSpec(num_vars, sorted(minterms), sorted(dont_cares), names or default_names(num_vars))
+
+
+_TERM_LIST_RE = re.compile(r"\s*(?:Σ|∑)?\s*([mdMD])\s*\(([^)]*)\)\s*(\+|$)")
+
+
+def parse_term_lists(text, num_vars):
+    """``m(1,3,5) + d(7)`` → FunctionSpec (``M(...)`` lists maxterms instead)."""
+    _check_vars(num_vars)
+    size = 1 << num_vars
+    sets = {"m": set(), "d": set(), "M": set()}
+    pos = 0
+    text = text.strip()
+    if not text:
+        raise ValueError("Enter at least one list, e.g. m(1,3,5) + d(7)")
+    while pos < len(text):
+        match = _TERM_LIST_RE.match(text, pos)
+        if not match:
+            raise ValueError(f"Expected m(...), M(...) or d(...) at position {pos + 1}: '{text[pos:pos + 10]}'")
+        kind = match.group(1) if match.group(1) == "M" else match.group(1).lower()
+        for item in filter(None, (p.strip() for p in match.group(2).split(","))):
+            lo, _, hi = item.partition("-")
+            try:
+                lo, hi = int(lo), int(hi or lo)
+            except ValueError:
+                raise ValueError(f"'{item}' is not a number or range") from None
+            if not 0 <= lo <= hi < size:
+                raise ValueError(f"Term {item} is out of range for {num_vars} variables (0–{size - 1})")
+            sets[kind].update(range(lo, hi + 1))
+        pos = match.end()
+    if sets["M"]:
+        if sets["m"]:
+            raise ValueError("Give either minterms m(...) or maxterms M(...), not both")
+        sets["m"] = set(range(size)) - sets["M"] - sets["d"]
+    return function_spec(num_vars, sets["m"], sets["d"])
+
+
+def parse_hex(text):
+    """Hex truth table such as ``0xE8``; its length sets the number of variables."""
+    digits = text.strip().replace("_", "").replace(" ", "")
+    if digits[:2].lower() == "0x":
+        digits = digits[2:]
+    if not digits or not re.fullmatch(r"[0-9A-Fa-f]+", digits):
+        raise ValueError("A hex truth table may only contain 0-9 and A-F")
+    bits = 4 * len(digits)
+    num_vars = bits.bit_length() - 1
+    if 1 << num_vars != bits:
+        raise ValueError(f"{len(digits)} hex digits do not make a full truth table "
+                         "(use 1, 2, 4, 8, 16, ... digits)")
+    _check_vars(num_vars)
+    value = int(digits, 16)
+    minterms = set()
+    while value:
+        low = value & -value
+        minterms.add(low.bit_length() - 1)
+        value ^= low
+    return function_spec(num_vars, minterms, set())
+
+
+def _output(value, where):
+    value = value.strip()
+    if value == "1":
+        return 1
+    if value == "0":
+        return 0
+    if value in _DC_VALUES:
+        return None
+    raise ValueError(f"{where}: output must be 0, 1 or X, got '{value}'")
+
+
+def parse_csv(text):
+    """
+    Truth table CSV: ``A,B,C,F`` rows of input bits plus output, or
+    ``minterm,output`` pairs (then the largest minterm sets the size).
+    A header row, if present, supplies the variable names.
+    """
+    rows = [r for r in csv.reader(io.StringIO(text)) if r and any(c.strip() for c in r)]
+    if not rows:
+        raise ValueError("The CSV file is empty")
+    names = None
+    if not all(c.strip() in ("0", "1") or c.strip() in _DC_VALUES or c.strip().isdigit() for c in rows[0]):
+        names = [c.strip() for c in rows[0][:-1]]
+        rows = rows[1:]
+    minterms, dont_cares = set(), set()
+    width = len(rows[0]) if rows else 0
+    pairs = width == 2 and (names is None or len(names) == 1) and any(
+        r[0].strip() not in ("0", "1") for r in rows)
+    if pairs:
+        top = 0
+        for line, row in enumerate(rows, 1):
+            index = int(row[0])
+            top = max(top, index)
+            out = _output(row[1], f"Row {line}")
+            (minterms if out == 1 else dont_cares if out is None else set()).add(index)
+        num_vars = max(1, top.bit_length())
+        names = None
+    else:
+        num_vars = width - 1
+        _check_vars(num_vars)
+        for line, row in enumerate(rows, 1):
+            if len(row) != width:
+                raise ValueError(f"Row {line} has {len(row)} columns, expected {width}")
+            index = 0
+            for cell in row[:-1]:
+                cell = cell.strip()
+                if cell not in ("0", "1"):
+                    raise ValueError(f"Row {line}: inputs must be 0 or 1, got '{cell}'")
+                index = index << 1 | (cell == "1")
+            out = _output(row[-1], f"Row {line}")
+            (minterms if out == 1 else dont_cares if out is None else set()).add(index)
+    _check_vars(num_vars)
+    return function_spec(num_vars, minterms, dont_cares, names if names and len(names) == num_vars else None)
+
+
+def _cube_points(cube):
+    """All minterms of an input cube such as ``1-0`` (``-`` = both values)."""
+    value, mask = 0, 0
+    for ch in cube:
+        value <<= 1
+        mask <<= 1
+        if ch == "1":
+            value |= 1
+        elif ch in "-xX2":
+            mask |= 1
+        elif ch != "0":
+            raise ValueError(f"Invalid character '{ch}' in input cube '{cube}'")
+    sub = mask
+    while True:
+        yield value | sub
+        if sub == 0:
+            break
+        sub = (sub - 1) & mask
+
+
+def parse_pla(text):
+    """
+    PLA file → list of ``(output_name, FunctionSpec)``, one per output column.
+    Output ``1`` adds the cube to the ON set, ``-``/``2`` to the don't-cares;
+    ``0`` and ``~`` rows are ignored (type fd).
+    """
+    num_inputs = num_outputs = None
+    input_names = output_names = None
+    functions = None
+    for line_no, raw in enumerate(text.splitlines(), 1):
+        line = raw.split("#", 1)[0].strip()
+        if not line:
+            continue
+        if line.startswith("."):
+            key, *args = line.split()
+            if key == ".i":
+                num_inputs = int(args[0])
+                _check_vars(num_inputs)
+            elif key == ".o":
+                num_outputs = int(args[0])
+            elif key == ".ilb":
+                input_names = args
+            elif key == ".ob":
+                output_names = args
+            elif key == ".e" or key == ".end":
+                break
+            continue  # .p, .type and friends are not needed
+        if num_inputs is None:
+            raise ValueError(f"Line {line_no}: cube before the .i declaration")
+        parts = line.split()
+        inputs = parts[0]
+        outputs = "".join(parts[1:]) if len(parts) > 1 else "1"
+        if num_outputs is None:
+            num_outputs = len(outputs)
+        if len(inputs) != num_inputs or len(outputs) != num_outputs:
+            raise ValueError(f"Line {line_no}: expected {num_inputs} inputs and {num_outputs} outputs")
+        if functions is None:
+            functions = [(set(), set()) for _ in range(num_outputs)]
+        points = None
+        for k, ch in enumerate(outputs):
+            if ch in "0~":
+                continue
+            if ch not in "1-2":
+                raise ValueError(f"Line {line_no}: invalid output character '{ch}'")
+            if points is None:
+                points = list(_cube_points(inputs))
+            (functions[k][0] if ch == "1" else functions[k][1]).update(points)
+    if functions is None:
+        raise ValueError("The PLA file contains no cubes")
+    if input_names and len(input_names) != num_inputs:
+        input_names = None
+    if not output_names or len(output_names) != num_outputs:
+        output_names = [f"F{k}" if num_outputs > 1 else "F" for k in range(num_outputs)]
+    return [(name, function_spec(num_inputs, on, dc - on, input_names))
+            for name, (on, dc) in zip(output_names, functions)]
+
+
+def parse_multi_output(text, num_vars):
+    """
+    One function per line, ``name = m(...) + d(...)`` (``:`` works too) →
+    list of ``(name, FunctionSpec)``.
+    """
+    functions = []
+    for line_no, raw in enumerate(text.splitlines(), 1):
+        line = raw.strip()
+        if not line:
+            continue
+        name, sep, terms = line.partition("=") if "=" in line else line.partition(":")
+        if not sep or not name.strip():
+            raise ValueError(f"Line {line_no}: expected 'name = m(...)', got '{line}'")
+        try:
+            functions.append((name.strip(), parse_term_lists(terms, num_vars)))
+        except ValueError as e:
+            raise ValueError(f"Line {line_no} ({name.strip()}): {e}") from None
+    if not functions:
+        raise ValueError("Enter at least one output, e.g. F = m(1,3,5) + d(7)")
+    return functions
+
+
+def format_terms(terms, limit=64, total=None):
+    """
+    Readable term list that stays short for huge functions. When ``total``
+    is known, ``terms`` may be a lazy iterator: only ``limit`` terms are read.
+    """
+    if total is None:
+        terms = list(terms)
+        total = len(terms)
+    else:
+        terms = list(itertools.islice(terms, limit))
+    if total <= limit:
+        return str(terms)
+    return f"{terms[:limit]}… ({total} in total)"
@@ -0,0 +1,123 @@
+"""
+Structurally hashed gate netlists (a DAG instead of an expression tree).
+
+Drawing an expression tree gives every occurrence of a variable or a repeated
+subexpression its own node, so the diagram grows with the size of the text
+instead of the size of the circuit. ``GateDAG`` keeps a unique table keyed by
+``(op, fanins)``: asking for a gate that already exists returns the existing
+node, so identical subexpressions and all uses of an input share one node.
+Fanins of the commutative gates are sorted (and repeated AND/OR inputs
+dropped) before the lookup, so ``A & B`` and ``B & A`` are the same gate.
+
+Nodes are small integers in creation order, which is also a topological order.
+"""
+from collections import namedtuple
+
+from dld.compiler import as_ast
+
+Node = namedtuple("Node", "op fanins label")
+
+GATE_LABELS = {"and": "AND", "or": "OR", "xor": "XOR", "not": "NOT", "nand": "NAND", "nor": "NOR"}
+
+
+class GateDAG:
+    """Hash-consed netlist of inputs, constants and AND/OR/XOR/NOT/NAND/NOR gates."""
+
+    def __init__(self):
+        self.nodes = []
+        self.outputs = []  # (name, node)
+        self._unique = {}
+
+    def _intern(self, op, fanins, label):
+        key = (op, fanins, label if op in ("input", "const") else None)
+        node = self._unique.get(key)
+        if node is None:
+            node = len(self.nodes)
+            self.nodes.append(Node(op, fanins, label))
+            self._unique[key] = node
+        return node
+
+    def add_input(self, name):
+        return self._intern("input", (), str(name))
+
+    def add_const(self, value):
+        return self._intern("const", (), "1" if value else "0")
+
+    def add_gate(self, op, fanins):
+        """Node for ``op`` over ``fanins`` (existing one if already built)."""
+        fanins = tuple(fanins)
+        if op in ("and", "or"):
+            fanins = tuple(sorted(set(fanins)))
+            if len(fanins) == 1:
+                return fanins[0]
+        elif op in ("xor", "nand", "nor"):
+            fanins = tuple(sorted(fanins))  # repeats matter here (tied NAND/NOR inputs)
+        return self._intern(op, fanins, GATE_LABELS[op])
+
+    def add_ast(self, ast):
+        """Add the gates of a parser AST (or SymPy expression); returns its root node."""
+        built = {}
+
+        def build(node):
+            key = id(node)  # identity: hashing nested tuples is O(subtree)
+            if key in built:
+                return built[key]
+            op = node[0]
+            if op == "var":
+                result = self.add_input(node[1])
+            elif op == "const":
+                result = self.add_const(node[1])
+            else:
+                result = self.add_gate(op, [build(arg) for arg in node[1:]])
+            built[key] = result
+            return result
+
+        return build(as_ast(ast))
+
+    def add_output(self, name, node):
+        self.outputs.append((name, node))
+
+    def levels(self):
+        """Logic level of every node: inputs/constants are 0, a gate is 1 + its deepest fanin."""
+        levels = []
+        for node in self.nodes:
+            levels.append(1 + max(levels[f] for f in node.fanins) if node.fanins else 0)
+        return levels
+
+    @property
+    def gate_count(self):
+        return sum(1 for n in self.nodes if n.op in GATE_LABELS)
+
+    @property
+    def depth(self):
+        """Gates on the longest input → output path."""
+        levels = self.levels()
+        return max((levels[node] for _, node in self.outputs), default=0)
+
+    @property
+    def edge_count(self):
+        return sum(len(n.fanins) for n in self.nodes) + len(self.outputs)
+
+    def to_dot(self, title="Logic Circuit"):
+        """Graphviz DOT source, inputs on the left and outputs on the right."""
+        lines = [f'digraph "{title}" {{', "  rankdir=LR;", "  node [fontname=Helvetica];"]
+        for i, node in enumerate(self.nodes):
+            if node.op == "input":
+                lines.append(f'  n{i} [label="{node.label}", shape=circle];')
+            elif node.op == "const":
+                lines.append(f'  n{i} [label="{node.label}", shape=square];')
+            else:
+                lines.append(f'  n{i} [label="{node.label}", shape=box];')
+            lines.extend(f"  n{child} -> n{i};" for child in node.fanins)
+        for k, (name, node) in enumerate(self.outputs):
+            lines.append(f'  out{k} [label="{name}", shape=plaintext];')
+            lines.append(f"  n{node} -> out{k};")
+        lines.append("}")
+        return "\n".join(lines)
+
+
+def build_dag(expr, output="F"):
+    """Single-output DAG for ``expr`` (AST or SymPy)."""
+    dag = GateDAG()
+    dag.add_output(output, dag.add_ast(expr))
+    return dag
@@ -0,0 +1,235 @@
+"""
+Run heavy simplification / truth-table work in a shared process pool.
+
+A pathological expression must never pin a Streamlit script thread, so the
+pages hand the work to a bounded ``ProcessPoolExecutor`` and only wait on the
+result. Every job has a deadline that is enforced inside the worker (with
+``SIGALRM`` on POSIX), and a job whose widget value changed is cancelled:
+pending jobs are dropped from the queue, running ones are interrupted with
+``SIGUSR1``.
+"""
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from dld import multi_output, qm
+from dld.parser import from_sympy, parse, to_infix, to_sympy
+from dld.simplify_cache import cached_simplify_logic, lookup
+from dld.truth_table import PackedTable
+from dld.vector_cache import evaluate_incremental
+
+MAX_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+DEFAULT_TIMEOUT = 30  # seconds
+POLL_INTERVAL = 0.2
+# Below these sizes the work is faster than a round trip to the pool
+INLINE_SIMPLIFY_VARS = 6
+INLINE_TABLE_VARS = 16
+INLINE_MINIMIZE_VARS = 10
+
+_HAS_SIGNALS = hasattr(signal, "setitimer") and hasattr(signal, "SIGUSR1")
+
+
+class JobTimeout(Exception):
+    """The job ran past its deadline."""
+
+
+class JobCancelled(Exception):
+    """The job was cancelled because its input changed."""
+
+
+# ---- worker side --------------------------------------------------------
+
+_cancelled = None    # shared dict of cancelled job ids (set by the initializer)
+_current_job = None
+
+
+def _init_worker(cancelled):
+    global _cancelled
+    _cancelled = cancelled
+    if _HAS_SIGNALS:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.signal(signal.SIGUSR1, _on_cancel)
+
+
+def _on_alarm(signum, frame):
+    raise JobTimeout("Computation took too long and was stopped")
+
+
+def _on_cancel(signum, frame):
+    # The signal may arrive just after the job finished; only abort the right one
+    if _current_job is not None and _current_job in _cancelled:
+        raise JobCancelled("Input changed")
+
+
+def _run(job_id, timeout, func, args):
+    global _current_job
+    _cancelled[f"pid:{job_id}"] = os.getpid()
+    _current_job = job_id
+    if _HAS_SIGNALS:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        if job_id in _cancelled:
+            raise JobCancelled("Input changed")
+        return func(*args)
+    finally:
+        if _HAS_SIGNALS:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        _current_job = None
+        _cancelled.pop(f"pid:{job_id}", None)
+
+
+# ---- app side -----------------------------------------------------------
+
+class JobPool:
+    """Bounded process pool with per-job deadlines and cancellation."""
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        ctx = multiprocessing.get_context("spawn")  # never fork the threaded server
+        self._manager = ctx.Manager()
+        self._cancelled = self._manager.dict()
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=ctx,
+            initializer=_init_worker, initargs=(self._cancelled,),
+        )
+        self._ids = itertools.count()
+
+    def submit(self, func, *args, timeout=DEFAULT_TIMEOUT):
+        job_id = f"job:{os.getpid()}:{next(self._ids)}"
+        future = self._executor.submit(_run, job_id, timeout, func, args)
+        future.job_id = job_id
+        future.deadline = time.monotonic() + timeout
+        return future
+
+    def cancel(self, future):
+        if future.cancel() or future.done():
+            return
+        self._cancelled[future.job_id] = True
+        pid = self._cancelled.get(f"pid:{future.job_id}")
+        if pid and _HAS_SIGNALS:
+            try:
+                os.kill(pid, signal.SIGUSR1)
+            except ProcessLookupError:
+                pass
+        future.add_done_callback(lambda f: self._cancelled.pop(f.job_id, None))
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process-wide pool shared by every session."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = JobPool()
+        return _pool
+
+
+def run_job(state, slot, key, func, *args, timeout=DEFAULT_TIMEOUT, on_wait=None):
+    """
+    Compute ``func(*args)`` in the pool and wait for it without burning CPU.
+
+    ``state`` is a per-session mapping (``st.session_state``) and ``slot`` names
+    the widget the job belongs to. If the slot still holds a job for a different
+    ``key`` (the widget value changed), that job is cancelled. A rerun with the
+    same key picks the running job up again instead of starting a new one.
+    ``on_wait(seconds)`` is called while waiting so the page can show progress;
+    calling Streamlit there also lets a rerun interrupt the wait.
+    """
+    pool = get_pool()
+    previous = state.get(slot)
+    if previous is not None and previous[0] != key:
+        pool.cancel(previous[1])
+        previous = None
+    if previous is None:
+        future = pool.submit(func, *args, timeout=timeout)
+        state[slot] = (key, future)
+    else:
+        future = previous[1]
+
+    start = time.monotonic()
+    try:
+        while True:
+            try:
+                return future.result(timeout=POLL_INTERVAL)
+            except FutureTimeout:
+                if time.monotonic() > future.deadline + 1:
+                    pool.cancel(future)  # e.g. no SIGALRM on this platform
+                    raise JobTimeout("Computation took too long and was stopped") from None
+                if on_wait is not None:
+                    on_wait(time.monotonic() - start)
+            except CancelledError as exc:
+                raise JobCancelled("Input changed") from exc
+    finally:
+        if future.done() and state.get(slot, (None, None))[1] is future:
+            del state[slot]
+
+
+# ---- jobs ---------------------------------------------------------------
+
+def simplify_job(text, variables, form=None):
+    """Parse and simplify ``text``; returns the result as parser text."""
+    ast = parse(text, variables).ast
+    return to_infix(from_sympy(cached_simplify_logic(ast, form=form)))
+
+
+def truth_table_job(text, variables):
+    """Packed Output column of ``text`` (see ``truth_table.evaluate``)."""
+    return evaluate_incremental(parse(text, variables).ast, variables)
+
+
+def multi_output_job(num_vars, pairs):
+    """Shared multi-output cover and, for comparison, the cost of one QM cover per output."""
+    shared = multi_output.minimize(num_vars, pairs)
+    separate = multi_output.plane_cost(num_vars, [qm.minimize(num_vars, on, dc).implicants for on, dc in pairs])
+    return shared, separate
+
+
+# ---- page helpers -------------------------------------------------------
+
+def simplify_in_pool(state, slot, ast, variables, form=None, on_wait=None, timeout=DEFAULT_TIMEOUT):
+    """Simplified SymPy expression for ``ast``: cache, then inline or pooled."""
+    result = lookup(ast, form)
+    if result is not None:
+        return result
+    if len(variables) <= INLINE_SIMPLIFY_VARS:
+        return cached_simplify_logic(ast, form=form)
+    text = to_infix(ast)
+    key = (text, tuple(variables), form)
+    result = run_job(state, slot, key, simplify_job, text, list(variables), form,
+                     timeout=timeout, on_wait=on_wait)
+    return to_sympy(parse(result).ast)
+
+
+def truth_table_in_pool(state, slot, ast, variables, on_wait=None, timeout=DEFAULT_TIMEOUT):
+    """``PackedTable`` for ``ast``, computed in the pool for large tables."""
+    if len(variables) <= INLINE_TABLE_VARS:
+        return PackedTable(variables, evaluate_incremental(ast, variables))
+    text = to_infix(ast)
+    output = run_job(state, slot, (text, tuple(variables)), truth_table_job, text, list(variables),
+                     timeout=timeout, on_wait=on_wait)
+    return PackedTable(variables, output)
+
+
+def minimize_in_pool(state, slot, minimize, num_vars, terms, dont_cares=(), on_wait=None, timeout=DEFAULT_TIMEOUT):
+    """``minimize(num_vars, terms, dont_cares)`` (``qm`` / ``espresso``), pooled past a few variables."""
+    if num_vars <= INLINE_MINIMIZE_VARS:
+        return minimize(num_vars, terms, dont_cares)
+    terms, dont_cares = list(terms), list(dont_cares)
+    key = (minimize.__module__, num_vars, tuple(terms), tuple(dont_cares))
+    return run_job(state, slot, key, minimize, num_vars, terms, dont_cares, timeout=timeout, on_wait=on_wait)
+
+
+def multi_output_in_pool(state, slot, num_vars, pairs, on_wait=None, timeout=DEFAULT_TIMEOUT):
+    """``multi_output_job(num_vars, pairs)``, pooled past a few variables."""
+    if num_vars <= INLINE_MINIMIZE_VARS:
+        return multi_output_job(num_vars, pairs)
+    pairs = [(list(on), list(dc)) for on, dc in pairs]
+    key = (num_vars, tuple((tuple(on), tuple(dc)) for on, dc in pairs))
+    return run_job(state, slot, key, multi_output_job, num_vars, pairs, timeout=timeout, on_wait=on_wait)
@@ -0,0 +1,151 @@
+"""
+Karnaugh map layouts for 1–6 variables.
+
+The first ``n // 2`` variables index the rows and the rest the columns, each
+in reflected Gray-code order, so neighbouring cells differ in one variable.
+For 5 and 6 variables the 3-bit Gray code gives the *mirror* layout: the
+left and right (and, for 6 variables, top and bottom) sub-maps are mirror
+images of each other, and cells reflected across the thick axis are
+adjacent too.
+
+``layout(n)`` is computed once per variable count and cached; its
+``cells`` grid holds the minterm index of every cell and ``positions`` the
+inverse mapping. Implicants use the ``(value, mask)`` format of ``dld.qm``.
+"""
+from collections import namedtuple
+from functools import cache
+from html import escape
+
+import numpy as np
+import pandas as pd
+
+MAX_KMAP_VARS = 6
+
+KMapLayout = namedtuple("KMapLayout", "num_vars row_vars col_vars row_codes col_codes cells positions")
+
+# Group outline colours, cycled when a cover has more groups
+GROUP_COLORS = ["#e6194b", "#3cb44b", "#4363d8", "#f58231", "#911eb4", "#42d4f4",
+                "#f032e6", "#9a6324", "#808000", "#000075", "#469990", "#e6beff"]
+
+
+def gray_codes(bits):
+    """Reflected Gray code sequence of ``bits`` bits: 0, 1, 3, 2, 6, 7, 5, 4, ..."""
+    return [i ^ (i >> 1) for i in range(1 << bits)]
+
+
+@cache
+def layout(num_vars):
+    """Row/column Gray codes and the cell ↔ minterm maps for ``num_vars`` variables."""
+    if not 1 <= num_vars <= MAX_KMAP_VARS:
+        raise ValueError(f"K-maps are drawn for 1 to {MAX_KMAP_VARS} variables, got {num_vars}")
+    row_vars = num_vars // 2
+    col_vars = num_vars - row_vars
+    row_codes = gray_codes(row_vars)
+    col_codes = gray_codes(col_vars)
+    cells = (np.array(row_codes)[:, None] << col_vars) | np.array(col_codes)[None, :]
+    positions = np.empty((1 << num_vars, 2), dtype=np.int64)
+    positions[cells.ravel()] = np.argwhere(np.ones_like(cells, dtype=bool))
+    cells.setflags(write=False)
+    positions.setflags(write=False)
+    return KMapLayout(num_vars, row_vars, col_vars, tuple(row_codes), tuple(col_codes), cells, positions)
+
+
+def cell_values(num_vars, minterms, dont_cares=()):
+    """Grid of ``"1"`` / ``"0"`` / ``"X"`` in K-map order."""
+    lay = layout(num_vars)
+    flat = np.full(1 << num_vars, "0", dtype="<U1")
+    flat[list(minterms)] = "1"
+    flat[list(dont_cares)] = "X"
+    return flat[lay.cells]
+
+
+def _labels(names, codes, bits):
+    title = "".join(names) if names else ""
+    return [f"{title}={code:0{bits}b}" if bits else "" for code in codes]
+
+
+def kmap_frame(num_vars, minterms, dont_cares, names):
+    """K-map as a DataFrame (rows/columns labelled with their Gray codes)."""
+    lay = layout(num_vars)
+    return pd.DataFrame(
+        cell_values(num_vars, minterms, dont_cares),
+        index=_labels(names[:lay.row_vars], lay.row_codes, lay.row_vars) if lay.row_vars else [""],
+        columns=_labels(names[lay.row_vars:], lay.col_codes, lay.col_vars),
+    )
+
+
+def _runs(hits):
+    """Contiguous runs ``(start, length)`` of True entries."""
+    runs, start = [], None
+    for i, hit in enumerate(list(hits) + [False]):
+        if hit and start is None:
+            start = i
+        elif not hit and start is not None:
+            runs.append((start, i - start))
+            start = None
+    return runs
+
+
+def group_rectangles(num_vars, implicant):
+    """
+    Rectangles ``(row, col, height, width)`` in cell units covering an implicant.
+    A cube is the product of a row set and a column set; each set splits into
+    contiguous runs (several when the group wraps around an edge or across
+    the mirror axis), and every pair of runs is one rectangle.
+    """
+    lay = layout(num_vars)
+    value, mask = implicant
+    full = (1 << num_vars) - 1
+    inside = (lay.cells & (full & ~mask)) == value
+    rows = _runs(inside.any(axis=1))
+    cols = _runs(inside.any(axis=0))
+    return [(r, c, h, w) for r, h in rows for c, w in cols]
+
+
+def kmap_svg(num_vars, minterms, dont_cares, names, implicants=(), cell=44):
+    """SVG drawing of the K-map with every implicant outlined in its own colour."""
+    lay = layout(num_vars)
+    values = cell_values(num_vars, minterms, dont_cares)
+    n_rows, n_cols = lay.cells.shape
+    left, top = 70, 50
+    width, height = left + n_cols * cell + 10, top + n_rows * cell + 10
+    row_title = escape("".join(names[:lay.row_vars]))
+    col_title = escape("".join(names[lay.row_vars:]))
+    out = [(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'font-family="monospace" font-size="13">'),
+           f'<text x="4" y="{top - 28}" fill="#888">{row_title} \\ {col_title}</text>']
+
+    for c, code in enumerate(lay.col_codes):
+        x = left + c * cell + cell / 2
+        out.append(f'<text x="{x}" y="{top - 8}" text-anchor="middle" fill="#888">{code:0{lay.col_vars}b}</text>')
+    for r, code in enumerate(lay.row_codes):
+        y = top + r * cell + cell / 2 + 5
+        label = f"{code:0{lay.row_vars}b}" if lay.row_vars else ""
+        out.append(f'<text x="{left - 8}" y="{y}" text-anchor="end" fill="#888">{label}</text>')
+
+    for r in range(n_rows):
+        for c in range(n_cols):
+            x, y = left + c * cell, top + r * cell
+            value = values[r, c]
+            fill = {"1": "#d4f7d4", "X": "#f5f0c8"}.get(value, "#ffffff")
+            out.append(f'<rect x="{x}" y="{y}" width="{cell}" height="{cell}" fill="{fill}" stroke="#999"/>')
+            out.append(f'<text x="{x + cell / 2}" y="{y + cell / 2 + 5}" text-anchor="middle">{value}</text>')
+            out.append(f'<text x="{x + 3}" y="{y + 11}" font-size="8" fill="#aaa">{lay.cells[r, c]}</text>')
+
+    # Mirror axes of the 5/6-variable maps
+    if lay.col_vars >= 3:
+        x = left + n_cols // 2 * cell
+        out.append(f'<line x1="{x}" y1="{top}" x2="{x}" y2="{top + n_rows * cell}" stroke="#333" stroke-width="3"/>')
+    if lay.row_vars >= 3:
+        y = top + n_rows // 2 * cell
+        out.append(f'<line x1="{left}" y1="{y}" x2="{left + n_cols * cell}" y2="{y}" stroke="#333" stroke-width="3"/>')
+
+    for k, implicant in enumerate(implicants):
+        color = GROUP_COLORS[k % len(GROUP_COLORS)]
+        inset = 3 + 2 * (k % 5)  # keep overlapping groups distinguishable
+        for r, c, h, w in group_rectangles(num_vars, implicant):
+            out.append(f'<rect x="{left + c * cell + inset}" y="{top + r * cell + inset}" '
+                       f'width="{w * cell - 2 * inset}" height="{h * cell - 2 * inset}" rx="10" '
+                       f'fill="{color}" fill-opacity="0.12" stroke="{color}" stroke-width="2"/>')
+    out.append("</svg>")
+    return "".join(out)
@@ -0,0 +1,148 @@
+"""
+Multi-output two-level minimization with shared product terms.
+
+A PLA implements several functions of the same inputs with one AND plane
+(the product terms) and one OR plane (which products feed which output), so
+a product used by two outputs is paid for once. Minimizing every output on
+its own misses those shared terms.
+
+Cubes carry a *tag*: a bitmask of the outputs whose ON ∪ DC set contains
+the whole cube. Merging two cubes ANDs their tags, and a cube stays a
+(multi-output) prime unless a merge kept its full tag. The covering problem
+is then solved over ``(output, minterm)`` pairs with ``qm.select_cover``,
+so a tagged prime covers its minterms in every output it is tagged with.
+Finally each output keeps only the chosen terms it actually needs.
+"""
+import time
+from collections import defaultdict, namedtuple
+
+from dld.qm import MAX_SEARCH_NODES, literal_count, popcount, select_cover
+
+MultiOutputResult = namedtuple("MultiOutputResult", "terms outputs exact stats")
+PlaneCost = namedtuple("PlaneCost", "products literals connections")
+
+
+def tagged_primes(num_vars, care_sets):
+    """Multi-output primes ``(value, mask, tag)`` of the ON ∪ DC sets ``care_sets``."""
+    tags = defaultdict(int)
+    for k, care in enumerate(care_sets):
+        for m in care:
+            tags[m] |= 1 << k
+    full = (1 << num_vars) - 1
+    groups = defaultdict(dict)
+    for m, tag in tags.items():
+        groups[popcount(m)][(m, 0)] = tag
+    primes = set()
+    while groups:
+        merged = defaultdict(dict)
+        used = set()
+        for ones in sorted(groups):
+            upper = groups.get(ones + 1)
+            if not upper:
+                continue
+            for (value, mask), tag in groups[ones].items():
+                free = ~(value | mask) & full
+                while free:
+                    bit = free & -free
+                    free ^= bit
+                    other = upper.get((value | bit, mask))
+                    if other is None or not tag & other:
+                        continue
+                    both = tag & other
+                    merged[ones][(value, mask | bit)] = both
+                    if both == tag:
+                        used.add((value, mask))
+                    if both == other:
+                        used.add((value | bit, mask))
+        for group in groups.values():
+            primes.update((v, m, t) for (v, m), t in group.items() if (v, m) not in used)
+        groups = merged
+    return primes
+
+
+def _points(value, mask):
+    sub = mask
+    while True:
+        yield value | sub
+        if sub == 0:
+            break
+        sub = (sub - 1) & mask
+
+
+def _coverage(primes, on_sets):
+    """Bitset over the ``(output, minterm)`` pairs each tagged prime covers."""
+    index = {}
+    for k, on in enumerate(on_sets):
+        for m in on:
+            index[(k, m)] = len(index)
+    cover = {}
+    for value, mask, tag in primes:
+        bits = 0
+        outputs = [k for k in range(len(on_sets)) if tag >> k & 1]
+        for m in _points(value, mask):
+            for k in outputs:
+                i = index.get((k, m))
+                if i is not None:
+                    bits |= 1 << i
+        if bits:
+            cover[(value, mask, tag)] = bits
+    return cover, len(index)
+
+
+def _connect(num_vars, terms, k, on):
+    """Terms (indices into ``terms``) output ``k`` needs: drop the redundant ones."""
+    used = [i for i, (value, mask, tag) in enumerate(terms)
+            if tag >> k & 1 and any(m & ~mask == value for m in on)]
+    counts = defaultdict(int)
+    for i in used:
+        for m in _points(*terms[i][:2]):
+            if m in on:
+                counts[m] += 1
+    # Try the costliest terms first; keep a term if it is the only one for some minterm
+    for i in sorted(used, key=lambda i: -literal_count(terms[i], num_vars)):
+        mine = [m for m in _points(*terms[i][:2]) if m in on]
+        if all(counts[m] > 1 for m in mine):
+            for m in mine:
+                counts[m] -= 1
+            used.remove(i)
+    return sorted(used)
+
+
+def plane_cost(num_vars, covers):
+    """
+    AND/OR-plane cost of per-output SOP covers (lists of ``(value, mask)``):
+    distinct products, their literals, and product → output connections.
+    """
+    products = {tuple(p) for cover in covers for p in cover}
+    return PlaneCost(len(products), sum(literal_count(p, num_vars) for p in products),
+                     sum(len(set(cover)) for cover in covers))
+
+
+def minimize(num_vars, outputs, max_nodes=MAX_SEARCH_NODES):
+    """
+    Shared-term minimal cover of several functions. ``outputs`` is a list of
+    ``(minterms, dont_cares)`` pairs. Returns ``MultiOutputResult`` where
+    ``terms`` are the chosen ``(value, mask)`` products and ``outputs[k]``
+    lists the indices of the terms OR-ed into output ``k``.
+    """
+    start = time.perf_counter()
+    on_sets = [set(on) for on, _ in outputs]
+    care_sets = [set(on) | set(dc) for on, dc in outputs]
+    primes = tagged_primes(num_vars, care_sets)
+    cover, pairs = _coverage(primes, on_sets)
+
+    essential, chosen, exact, nodes = select_cover(cover, (1 << pairs) - 1, num_vars, max_nodes)
+    terms = sorted(set(essential + chosen), key=lambda p: (p[1], p[0]))
+    connections = [_connect(num_vars, terms, k, on) for k, on in enumerate(on_sets)]
+    # A term that every output dropped is not worth building
+    needed = sorted({i for used in connections for i in used})
+    renumber = {old: new for new, old in enumerate(needed)}
+    terms = [terms[i][:2] for i in needed]
+    connections = [[renumber[i] for i in used] for used in connections]
+
+    cost = plane_cost(num_vars, [[terms[i] for i in used] for used in connections])
+    stats = {"variables": num_vars, "outputs": len(outputs), "primes": len(primes),
+             "essential": len(essential), "search_nodes": nodes,
+             "products": cost.products, "literals": cost.literals, "connections": cost.connections,
+             "time": time.perf_counter() - start}
+    return MultiOutputResult(terms, connections, exact, stats)
@@ -0,0 +1,297 @@
+"""
+Gate-level netlists: named nets driven by gates, flip-flops or primary inputs.
+
+The text format is the ISCAS ``.bench`` format with an optional per-gate
+delay (an integer number of time units, default 1) after ``@``::
+
+    # full adder
+    INPUT(a)
+    INPUT(b)
+    INPUT(cin)
+    OUTPUT(sum)
+    OUTPUT(cout)
+    t   = XOR(a, b)
+    sum = XOR(t, cin) @2
+    c1  = AND(a, b)
+    c2  = AND(t, cin)
+    cout = OR(c1, c2)
+    q   = DFF(d)            # clocked by the implicit ``clk`` input
+    q2  = DFF(d, clk2) @3   # or by a named clock net
+
+Gates: AND, OR, NAND, NOR, XOR, XNOR (two or more inputs), NOT, BUF and the
+constants CONST0() / CONST1(). Nets are small integers; ``Netlist.names``
+maps them back to the text names.
+"""
+from collections import namedtuple
+
+from dld.compiler import as_ast
+from dld.gate_dag import build_dag
+
+CLOCK = "clk"  # clock net of a DFF written without one
+
+Gate = namedtuple("Gate", "op inputs output delay")
+FlipFlop = namedtuple("FlipFlop", "d q clock init delay")
+
+GATE_OPS = {"and", "or", "nand", "nor", "xor", "xnor", "not", "buf", "const0", "const1"}
+_ARITY = {"not": 1, "buf": 1, "const0": 0, "const1": 0}  # others take 2+
+
+
+class NetlistError(ValueError):
+    """Malformed netlist, with the 1-based line number when parsing text."""
+
+    def __init__(self, message, line=None):
+        super().__init__(message if line is None else f"Line {line}: {message}")
+        self.line = line
+
+
+def evaluate_gate(op, values):
+    """Output (0/1) of gate ``op`` for its input ``values``."""
+    if op == "and":
+        return int(all(values))
+    if op == "or":
+        return int(any(values))
+    if op == "nand":
+        return int(not all(values))
+    if op == "nor":
+        return int(not any(values))
+    if op == "xor":
+        return sum(values) & 1
+    if op == "xnor":
+        return 1 - (sum(values) & 1)
+    if op == "not":
+        return 1 - values[0]
+    if op == "buf":
+        return values[0]
+    return int(op == "const1")
+
+
+class Netlist:
+    """Gates, flip-flops, primary inputs and outputs over integer nets."""
+
+    def __init__(self):
+        self.names = []
+        self.index = {}
+        self.inputs = []
+        self.outputs = []
+        self.gates = []
+        self.flip_flops = []
+        self.driver = {}  # net -> "input" / ("gate", i) / ("ff", i)
+
+    def net(self, name):
+        """Net id for ``name`` (created on first use)."""
+        name = str(name)
+        net = self.index.get(name)
+        if net is None:
+            net = len(self.names)
+            self.names.append(name)
+            self.index[name] = net
+        return net
+
+    def _drive(self, net, driver):
+        if net in self.driver:
+            raise NetlistError(f"Net '{self.names[net]}' has more than one driver")
+        self.driver[net] = driver
+
+    def add_input(self, name):
+        net = self.net(name)
+        self._drive(net, "input")
+        self.inputs.append(net)
+        return net
+
+    def add_output(self, name):
+        net = self.net(name)
+        self.outputs.append(net)
+        return net
+
+    def add_gate(self, op, inputs, output, delay=1):
+        op = op.lower()
+        if op not in GATE_OPS:
+            raise NetlistError(f"Unknown gate '{op.upper()}'")
+        arity = _ARITY.get(op)
+        if (arity is not None and len(inputs) != arity) or (arity is None and len(inputs) < 2):
+            expected = arity if arity is not None else "2 or more"
+            raise NetlistError(f"{op.upper()} takes {expected} inputs, got {len(inputs)}")
+        if delay < 1:
+            raise NetlistError("Gate delays must be at least 1")
+        out = self.net(output)
+        self._drive(out, ("gate", len(self.gates)))
+        self.gates.append(Gate(op, tuple(self.net(i) for i in inputs), out, int(delay)))
+        return out
+
+    def add_flip_flop(self, d, q, clock=CLOCK, init=0, delay=1):
+        if delay < 1:
+            raise NetlistError("Flip-flop delays must be at least 1")
+        out = self.net(q)
+        self._drive(out, ("ff", len(self.flip_flops)))
+        self.flip_flops.append(FlipFlop(self.net(d), out, self.net(clock), int(init), int(delay)))
+        return out
+
+    # ---- structure --------------------------------------------------------
+
+    @property
+    def gate_count(self):
+        return len(self.gates)
+
+    def check(self):
+        """Raise ``NetlistError`` for nets that are read but never driven."""
+        # The implicit clock becomes an input when a flip-flop uses it
+        clock = self.index.get(CLOCK)
+        if clock is not None and clock not in self.driver and any(ff.clock == clock for ff in self.flip_flops):
+            self.add_input(CLOCK)
+        used = {i for g in self.gates for i in g.inputs} | set(self.outputs)
+        used |= {ff.d for ff in self.flip_flops} | {ff.clock for ff in self.flip_flops}
+        missing = sorted(self.names[n] for n in used if n not in self.driver)
+        if missing:
+            raise NetlistError(f"Undriven net(s): {', '.join(missing)}")
+        return self
+
+    def fanout(self):
+        """For every net, the gates that read it."""
+        readers = [[] for _ in self.names]
+        for i, gate in enumerate(self.gates):
+            for net in set(gate.inputs):
+                readers[net].append(i)
+        return readers
+
+    def levelize(self):
+        """
+        Gates in topological order (flip-flop outputs and inputs are sources).
+        Raises ``NetlistError`` on a combinational loop.
+        """
+        readers = self.fanout()
+        pending = [len(set(g.inputs)) for g in self.gates]
+        order = [i for i, count in enumerate(pending) if count == 0]  # constants
+        ready = [net for net in range(len(self.names))
+                 if self.driver.get(net, "input") == "input" or self.driver[net][0] == "ff"]
+        done = 0
+        while ready or done < len(order):
+            if not ready:
+                ready.append(self.gates[order[done]].output)
+                done += 1
+                continue
+            for i in readers[ready.pop()]:
+                pending[i] -= 1
+                if pending[i] == 0:
+                    order.append(i)
+        if len(order) != len(self.gates):
+            stuck = next(self.names[g.output] for i, g in enumerate(self.gates) if pending[i] > 0)
+            raise NetlistError(f"Combinational loop through net '{stuck}'")
+        return order
+
+    def critical_delay(self):
+        """Longest input/flip-flop → net delay through the gates."""
+        arrival = [0] * len(self.names)
+        for i in self.levelize():
+            gate = self.gates[i]
+            arrival[gate.output] = gate.delay + max((arrival[n] for n in gate.inputs), default=0)
+        return max(arrival, default=0)
+
+
+# ---- text format ---------------------------------------------------------
+
+def _arguments(text, line):
+    if not (text.endswith(")") and "(" in text):
+        raise NetlistError(f"Expected NAME(...), got '{text}'", line)
+    head, _, rest = text.partition("(")
+    args = [a.strip() for a in rest[:-1].split(",") if a.strip()]
+    return head.strip(), args
+
+
+def parse_netlist(text):
+    """Parse ``.bench`` text (see the module docstring) into a checked ``Netlist``."""
+    netlist = Netlist()
+    for number, raw in enumerate(text.splitlines(), start=1):
+        line = raw.split("#", 1)[0].strip()
+        if not line:
+            continue
+        try:
+            if "=" not in line:
+                keyword, args = _arguments(line, number)
+                if keyword.upper() not in ("INPUT", "OUTPUT") or len(args) != 1:
+                    raise NetlistError(f"Expected INPUT(name) or OUTPUT(name), got '{line}'")
+                (netlist.add_input if keyword.upper() == "INPUT" else netlist.add_output)(args[0])
+                continue
+            target, _, rhs = line.partition("=")
+            target = target.strip()
+            delay = 1
+            if "@" in rhs:
+                rhs, _, delay_text = rhs.partition("@")
+                if not delay_text.strip().isdigit():
+                    raise NetlistError(f"Delay must be a whole number, got '{delay_text.strip()}'")
+                delay = int(delay_text)
+            op, args = _arguments(rhs.strip(), number)
+            if not target:
+                raise NetlistError("Missing output net name")
+            if op.upper() == "DFF":
+                if len(args) not in (1, 2):
+                    raise NetlistError(f"DFF takes D and an optional clock, got {len(args)} arguments")
+                netlist.add_flip_flop(args[0], target, args[1] if len(args) == 2 else CLOCK, delay=delay)
+            else:
+                netlist.add_gate(op, args, target, delay)
+        except NetlistError as e:
+            if e.line is not None:
+                raise
+            raise NetlistError(str(e), number) from None
+    return netlist.check()
+
+
+def to_bench(netlist):
+    """``.bench`` text of ``netlist`` (delays other than 1 are written with ``@``)."""
+    names = netlist.names
+    lines = [f"INPUT({names[n]})" for n in netlist.inputs]
+    lines += [f"OUTPUT({names[n]})" for n in netlist.outputs]
+    for gate in netlist.gates:
+        delay = f" @{gate.delay}" if gate.delay != 1 else ""
+        args = ", ".join(names[n] for n in gate.inputs)
+        lines.append(f"{names[gate.output]} = {gate.op.upper()}({args}){delay}")
+    for ff in netlist.flip_flops:
+        clock = "" if names[ff.clock] == CLOCK else f", {names[ff.clock]}"
+        delay = f" @{ff.delay}" if ff.delay != 1 else ""
+        lines.append(f"{names[ff.q]} = DFF({names[ff.d]}{clock}){delay}")
+    return "\n".join(lines) + "\n"
+
+
+# ---- from expressions ----------------------------------------------------
+
+def from_dag(dag, delays=None):
+    """
+    Netlist of a ``GateDAG``. Gate nets are named ``n<node>`` (with ``_``
+    appended while that clashes with an input or output name), except a gate
+    that drives an output, which takes the output's name. ``delays`` maps a
+    gate op to its delay (default 1).
+    """
+    delays = delays or {}
+    netlist = Netlist()
+    named = {}
+    for name, node in dag.outputs:
+        named.setdefault(node, name)
+    taken = {node.label for node in dag.nodes if node.op == "input"} | {name for name, _ in dag.outputs}
+
+    def fresh(i):
+        name = f"n{i}"
+        while name in taken:
+            name += "_"
+        taken.add(name)
+        return name
+
+    net_of = {}
+    for i, node in enumerate(dag.nodes):
+        if node.op == "input":
+            netlist.add_input(node.label)
+            net_of[i] = node.label
+        elif node.op == "const":
+            net_of[i] = named[i] if i in named else fresh(i)
+            netlist.add_gate("const1" if node.label == "1" else "const0", [], net_of[i])
+        else:
+            net_of[i] = named[i] if i in named else fresh(i)
+            netlist.add_gate(node.op, [net_of[f] for f in node.fanins], net_of[i], delays.get(node.op, 1))
+    for name, node in dag.outputs:
+        if net_of[node] != name:  # output is an input or shares a gate with another output
+            netlist.add_gate("buf", [net_of[node]], name, delays.get("buf", 1))
+        netlist.add_output(name)
+    return netlist.check()
+
+
+def from_expression(expr, output="F", delays=None):
+    """Netlist of an expression (AST or SymPy), shared subexpressions built once."""
+    return from_dag(build_dag(as_ast(expr), output), delays)
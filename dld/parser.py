@@ -0,0 +1,280 @@
+"""
+Hand-written Pratt parser for the Boolean expressions typed into the pages.
+
+Supports ``~`` (NOT), ``&`` (AND), ``^`` (XOR), ``|`` (OR), parentheses and the
+constants ``0``/``1``/``True``/``False``, with Python's precedence
+(``~`` > ``&`` > ``^`` > ``|``). Two operands written next to each other are
+joined with AND, which replaces the old ``B(`` -> ``B & (`` regex fix.
+
+The result is a compact AST made of tuples:
+
+    ("var", "A")    ("const", True)    ("not", x)
+    ("and", x, y, ...)    ("or", x, y, ...)    ("xor", x, y, ...)
+
+SymPy objects are only created by ``to_sympy`` when simplification needs them.
+"""
+import re
+from collections import namedtuple
+
+_TOKEN_RE = re.compile(r"\s*(?:([A-Za-z_][A-Za-z0-9_]*)|(\d+)|([&|^~!()]))")
+
+_CONSTANTS = {"0": False, "1": True, "True": True, "False": False}
+_BINARY = {"|": ("or", 10), "^": ("xor", 20), "&": ("and", 30)}
+_NOT_BP = 40
+
+Token = namedtuple("Token", "kind text pos")
+Parsed = namedtuple("Parsed", "ast implicit_and")
+
+
+class ParseError(ValueError):
+    """Syntax error with the position (0-based column) where it was found."""
+
+    def __init__(self, message, text, position):
+        super().__init__(f"{message} (at position {position + 1})")
+        self.text = text
+        self.position = position
+
+    def pointer(self):
+        """The expression with a caret under the offending character."""
+        return f"{self.text}\n{' ' * self.position}^"
+
+
+def tokenize(text):
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        if text[pos].isspace():
+            pos += 1
+            continue
+        match = _TOKEN_RE.match(text, pos)
+        if not match:
+            raise ParseError(f"Unexpected character '{text[pos]}'", text, pos)
+        name, const, op = match.groups()
+        start = match.end() - len(name or const or op)
+        if name in _CONSTANTS:
+            tokens.append(Token("const", name, start))
+        elif name:
+            tokens.append(Token("name", name, start))
+        elif const:
+            if const not in _CONSTANTS:
+                raise ParseError(f"Only 0 and 1 are allowed as constants, got '{const}'", text, start)
+            tokens.append(Token("const", const, start))
+        else:
+            tokens.append(Token("~" if op == "!" else op, op, start))
+        pos = match.end()
+    tokens.append(Token("end", "", len(text)))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text, variables):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.index = 0
+        self.variables = None if variables is None else set(variables)
+        self.implicit_and = []
+
+    def peek(self):
+        return self.tokens[self.index]
+
+    def advance(self):
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def error(self, message, token):
+        raise ParseError(message, self.text, token.pos)
+
+    def parse(self):
+        if self.peek().kind == "end":
+            self.error("Empty expression", self.peek())
+        ast = self.expression(0)
+        token = self.peek()
+        if token.kind == ")":
+            self.error("Unmatched ')'", token)
+        if token.kind != "end":
+            self.error(f"Unexpected '{token.text}'", token)
+        return ast
+
+    def expression(self, min_bp):
+        left = self.operand()
+        while True:
+            token = self.peek()
+            if token.kind in _BINARY:
+                op, bp = _BINARY[token.kind]
+                if bp <= min_bp:
+                    break
+                self.advance()
+                left = combine(op, left, self.expression(bp))
+            elif token.kind in ("name", "const", "(", "~"):
+                # Juxtaposition such as ``B(C | D)`` or ``A ~B`` means AND
+                if _BINARY["&"][1] <= min_bp:
+                    break
+                self.implicit_and.append(token.pos)
+                left = combine("and", left, self.expression(_BINARY["&"][1]))
+            else:
+                break
+        return left
+
+    def operand(self):
+        token = self.advance()
+        if token.kind == "name":
+            if self.variables is not None and token.text not in self.variables:
+                self.error(f"Unknown variable '{token.text}'", token)
+            return ("var", token.text)
+        if token.kind == "const":
+            return ("const", _CONSTANTS[token.text])
+        if token.kind == "~":
+            return negate(self.expression(_NOT_BP))
+        if token.kind == "(":
+            inner = self.expression(0)
+            closing = self.peek()
+            if closing.kind != ")":
+                if closing.kind == "end":
+                    raise ParseError("Missing ')'", self.text, token.pos)
+                self.error(f"Expected ')' but found '{closing.text}'", closing)
+            self.advance()
+            return inner
+        if token.kind == "end":
+            self.error("Expression ends after an operator", token)
+        self.error(f"Expected a variable or '(' but found '{token.text}'", token)
+
+
+def combine(op, left, right):
+    """N-ary node for ``left op right`` with nested nodes of the same op flattened."""
+    args = []
+    for side in (left, right):
+        if side[0] == op:
+            args.extend(side[1:])
+        else:
+            args.append(side)
+    return (op, *args)
+
+
+def negate(node):
+    if node[0] == "not":
+        return node[1]
+    return ("not", node)
+
+
+def parse(text, variables=None):
+    """
+    Parse ``text`` into an AST.
+    If ``variables`` is given, any other name is reported as an error.
+    Returns ``Parsed(ast, implicit_and)`` where ``implicit_and`` lists the
+    positions at which a missing ``&`` was inserted.
+    """
+    parser = _Parser(text, variables)
+    return Parsed(parser.parse(), parser.implicit_and)
+
+
+def canonicalize(ast):
+    """Same expression with AND/OR/XOR operands sorted, so ``B & A`` == ``A & B``."""
+    op = ast[0]
+    if op in ("var", "const"):
+        return ast
+    if op == "not":
+        return ("not", canonicalize(ast[1]))
+    args = sorted((canonicalize(arg) for arg in ast[1:]), key=to_infix)
+    return (op, *args)
+
+
+def variables_of(ast):
+    """Variable names used in ``ast``, in order of first appearance."""
+    seen = {}
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        if node[0] == "var":
+            seen.setdefault(node[1], None)
+        elif node[0] != "const":
+            stack.extend(reversed(node[1:]))
+    return list(seen)
+
+
+_INFIX = {"and": " & ", "or": " | ", "xor": " ^ "}
+_PRECEDENCE = {"or": 1, "xor": 2, "and": 3}
+
+
+def to_infix(ast, parent=0):
+    """Canonical text form, e.g. ``A & (B | ~C)``."""
+    op = ast[0]
+    if op == "var":
+        return ast[1]
+    if op == "const":
+        return "1" if ast[1] else "0"
+    if op == "not":
+        inner = to_infix(ast[1], 4)
+        return f"~{inner}"
+    text = _INFIX[op].join(to_infix(arg, _PRECEDENCE[op]) for arg in ast[1:])
+    return f"({text})" if _PRECEDENCE[op] <= parent else text
+
+
+def to_sympy(ast, symbols_map=None):
+    """Build the SymPy expression for ``ast`` (symbols are created on demand)."""
+    from sympy import Symbol, false, true
+    from sympy.logic.boolalg import And, Not, Or, Xor
+
+    symbols_map = {} if symbols_map is None else symbols_map
+    funcs = {"and": And, "or": Or, "xor": Xor}
+
+    def build(node):
+        op = node[0]
+        if op == "var":
+            if node[1] not in symbols_map:
+                symbols_map[node[1]] = Symbol(node[1])
+            return symbols_map[node[1]]
+        if op == "const":
+            return true if node[1] else false
+        if op == "not":
+            return Not(build(node[1]))
+        return funcs[op](*[build(arg) for arg in node[1:]])
+
+    return build(ast)
+
+
+def from_sympy(expr):
+    """Convert a SymPy Boolean expression into the parser's AST."""
+    from sympy.logic.boolalg import (
+        And,
+        BooleanFalse,
+        BooleanTrue,
+        Equivalent,
+        Implies,
+        Nand,
+        Nor,
+        Not,
+        Or,
+        Xnor,
+        Xor,
+    )
+
+    def conv(node):
+        if isinstance(node, BooleanTrue):
+            return ("const", True)
+        if isinstance(node, BooleanFalse):
+            return ("const", False)
+        if node.is_Symbol:
+            return ("var", node.name)
+        args = [conv(arg) for arg in node.args]
+        if isinstance(node, Not):
+            return negate(args[0])
+        if isinstance(node, And):
+            return ("and", *args)
+        if isinstance(node, Or):
+            return ("or", *args)
+        if isinstance(node, Xor):
+            return ("xor", *args)
+        if isinstance(node, Nand):
+            return negate(("and", *args))
+        if isinstance(node, Nor):
+            return negate(("or", *args))
+        if isinstance(node, Xnor):
+            return negate(("xor", *args))
+        if isinstance(node, Implies):
+            return ("or", negate(args[0]), args[1])
+        if isinstance(node, Equivalent):
+            return ("and", *[negate(("xor", args[0], a)) for a in args[1:]])
+        raise ValueError(f"Unsupported operation: {node.func.__name__}")
+
+    return conv(expr)
@@ -0,0 +1,304 @@
+"""
+Bitmask Quine–McCluskey minimizer.
+
+An implicant is a ``(value, mask)`` pair of integers: bits set in ``mask`` are
+eliminated variables, the other bits of ``value`` give the literals. Variable
+``i`` of ``n`` (first variable = MSB) is bit ``n - 1 - i``, the same numbering
+the minterm lists on the K-Map page use.
+
+Prime implicants are generated by merging implicants whose values differ in a
+single bit, grouped by popcount. The cover is then chosen exactly: essential
+primes first, then Petrick's problem is solved by branch-and-bound over
+bitsets of the remaining minterms.
+"""
+import heapq
+import time
+from collections import defaultdict, namedtuple
+
+QMResult = namedtuple("QMResult", "implicants primes essential exact stats")
+
+# Stop the exact search after this many branch-and-bound nodes and keep the
+# best cover found so far (``exact`` is then False).
+MAX_SEARCH_NODES = 50_000
+
+
+def popcount(x):
+    return x.bit_count()
+
+
+def literal_count(implicant, num_vars):
+    return num_vars - popcount(implicant[1])
+
+
+def covers(implicant, minterm):
+    value, mask = implicant
+    return minterm & ~mask == value
+
+
+def prime_implicants(num_vars, terms):
+    """All prime implicants of the ON ∪ DC set ``terms``."""
+    groups = defaultdict(set)
+    for t in terms:
+        groups[popcount(t)].add((t, 0))
+    primes = set()
+    while groups:
+        merged = defaultdict(set)
+        used = set()
+        for ones in sorted(groups):
+            upper = groups.get(ones + 1)
+            if not upper:
+                continue
+            for value, mask in groups[ones]:
+                free = ~(value | mask) & ((1 << num_vars) - 1)
+                while free:
+                    bit = free & -free
+                    free ^= bit
+                    if (value | bit, mask) in upper:
+                        merged[ones].add((value, mask | bit))
+                        used.add((value, mask))
+                        used.add((value | bit, mask))
+        for group in groups.values():
+            primes.update(group - used)
+        groups = merged
+    return primes
+
+
+def _coverage(primes, minterms):
+    """Bitset (over the positions in ``minterms``) of the minterms each prime covers."""
+    index = {m: i for i, m in enumerate(minterms)}
+    cover = {}
+    for value, mask in primes:
+        bits = 0
+        if 1 << popcount(mask) <= len(minterms):
+            # Walk the points of the cube: cheaper than scanning every minterm
+            sub = mask
+            while True:
+                i = index.get(value | sub)
+                if i is not None:
+                    bits |= 1 << i
+                if sub == 0:
+                    break
+                sub = (sub - 1) & mask
+        else:
+            for m, i in index.items():
+                if m & ~mask == value:
+                    bits |= 1 << i
+        if bits:
+            cover[(value, mask)] = bits
+    return cover
+
+
+def _cost(chosen, num_vars):
+    return (len(chosen), sum(literal_count(p, num_vars) for p in chosen))
+
+
+def _split_bits(bits):
+    while bits:
+        low = bits & -bits
+        yield low
+        bits ^= low
+
+
+def _reduce(cover, universe, num_vars):
+    """
+    Take essential primes and drop dominated primes until nothing changes.
+    Returns the forced primes, the minterms still uncovered and the reduced table.
+    """
+    forced = []
+    changed = True
+    while changed and universe:
+        changed = False
+        cover = {p: bits & universe for p, bits in cover.items() if bits & universe}
+        owners = defaultdict(list)
+        for p, bits in cover.items():
+            for low in _split_bits(bits):
+                owners[low].append(p)
+        for low, ps in owners.items():
+            if len(ps) == 1 and low & universe:
+                forced.append(ps[0])
+                universe &= ~cover[ps[0]]
+                changed = True
+        if changed:
+            continue
+        # Row dominance: a prime covering a subset of a no-more-expensive prime is
+        # useless. Only primes sharing its first minterm can dominate it.
+        ranked = sorted(cover, key=lambda p: (-popcount(cover[p]), literal_count(p, num_vars)))
+        rank = {p: i for i, p in enumerate(ranked)}
+        kept = []
+        for p in ranked:
+            bits, lits = cover[p], literal_count(p, num_vars)
+            rivals = owners[bits & -bits]
+            if any(rank[q] < rank[p] and q in cover and bits & ~cover[q] == 0
+                   and literal_count(q, num_vars) <= lits for q in rivals):
+                changed = True
+                del cover[p]
+            else:
+                kept.append(p)
+        cover = {p: cover[p] for p in kept}
+    cover = {p: bits & universe for p, bits in cover.items() if bits & universe}
+    return forced, universe, cover
+
+
+def _components(cover, universe):
+    """Split the prime chart into groups of minterms that share no prime."""
+    groups = []
+    pending = dict(cover)
+    while universe:
+        seed = universe & -universe
+        members, bits = {}, seed
+        grown = True
+        while grown:
+            grown = False
+            for p in list(pending):
+                if pending[p] & bits:
+                    members[p] = pending.pop(p)
+                    bits |= members[p]
+                    grown = True
+        groups.append((members, bits & universe))
+        universe &= ~bits
+    return groups
+
+
+def _greedy_cover(cover, universe):
+    """Repeatedly take the prime covering most uncovered minterms (lazy heap)."""
+    chosen = []
+    heap = [(-popcount(bits), i, p) for i, (p, bits) in enumerate(cover.items())]
+    heapq.heapify(heap)
+    while universe and heap:
+        gain, i, p = heapq.heappop(heap)
+        fresh = popcount(cover[p] & universe)
+        if fresh == 0:
+            continue
+        if fresh < -gain:
+            heapq.heappush(heap, (-fresh, i, p))  # stale score: re-rank and retry
+            continue
+        chosen.append(p)
+        universe &= ~cover[p]
+    return chosen
+
+
+def _exact_cover(cover, universe, num_vars, max_nodes):
+    """Branch-and-bound for the cheapest set of primes covering ``universe``."""
+    by_minterm = defaultdict(list)
+    for p, bits in cover.items():
+        for low in _split_bits(bits):
+            by_minterm[low].append(p)
+
+    greedy = _greedy_cover(cover, universe)  # upper bound for the search
+    best = [greedy, _cost(greedy, num_vars)]
+    nodes = [0]
+    if len(greedy) > 400:
+        return greedy, False, 0  # too deep to search exactly
+
+    def lower_bound(remaining):
+        # Minterms that no single prime covers together each need their own term
+        count = 0
+        while remaining:
+            low = remaining & -remaining
+            count += 1
+            for p in by_minterm[low]:
+                remaining &= ~cover[p]
+        return count
+
+    def search(remaining, chosen):
+        nodes[0] += 1
+        if not remaining:
+            cost = _cost(chosen, num_vars)
+            if cost < best[1]:
+                best[0], best[1] = list(chosen), cost
+            return
+        if nodes[0] > max_nodes or len(chosen) + lower_bound(remaining) > best[1][0]:
+            return
+        # Branch on the minterm with the fewest candidate primes
+        options = None
+        for low in _split_bits(remaining):
+            cand = by_minterm[low]
+            if options is None or len(cand) < len(options):
+                options = cand
+                if len(cand) == 1:
+                    break
+        for p in sorted(options, key=lambda p: -popcount(cover[p] & remaining)):
+            chosen.append(p)
+            search(remaining & ~cover[p], chosen)
+            chosen.pop()
+
+    search(universe, [])
+    return best[0], nodes[0] <= max_nodes, nodes[0]
+
+
+def select_cover(cover, universe, num_vars, max_nodes=MAX_SEARCH_NODES):
+    """
+    Cheapest set of primes covering ``universe`` given each prime's coverage
+    bitset. Returns ``(essential, chosen, exact, search_nodes)``; primes only
+    need a ``[1]`` mask entry, so tagged multi-output cubes work as well.
+    """
+    forced, universe, cover = _reduce(cover, universe, num_vars)
+    essential = sorted(set(forced))
+    chosen, exact, nodes = [], True, 0
+    for members, bits in _components(cover, universe):
+        part, part_exact, part_nodes = _exact_cover(members, bits, num_vars, max_nodes)
+        chosen += part
+        exact = exact and part_exact
+        nodes += part_nodes
+    return essential, chosen, exact, nodes
+
+
+def minimize(num_vars, minterms, dont_cares=(), max_nodes=MAX_SEARCH_NODES):
+    """
+    Minimal sum-of-products cover of ``minterms`` with optional don't-cares.
+    Returns a ``QMResult``; ``stats`` holds timings and implicant counts.
+    """
+    minterms = sorted(set(minterms))
+    dont_cares = set(dont_cares) - set(minterms)
+    stats = {"variables": num_vars, "minterms": len(minterms), "dont_cares": len(dont_cares)}
+
+    start = time.perf_counter()
+    primes = prime_implicants(num_vars, set(minterms) | dont_cares)
+    stats["primes"] = len(primes)
+    stats["prime_time"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cover = _coverage(primes, minterms)
+    essential, chosen, exact, nodes = select_cover(cover, (1 << len(minterms)) - 1, num_vars, max_nodes)
+    stats["essential"] = len(essential)
+    stats["search_nodes"] = nodes
+    stats["cover_time"] = time.perf_counter() - start
+
+    implicants = sorted(set(essential + chosen), key=lambda p: (p[1], p[0]))
+    stats["terms"] = len(implicants)
+    stats["literals"] = sum(literal_count(p, num_vars) for p in implicants)
+    return QMResult(implicants, sorted(primes), essential, exact, stats)
+
+
+def implicant_ast(implicant, names, negate=False):
+    """Product term (or, with ``negate``, the sum term of the complement) as an AST."""
+    value, mask = implicant
+    n = len(names)
+    literals = []
+    for i, name in enumerate(names):
+        bit = 1 << (n - 1 - i)
+        if mask & bit:
+            continue
+        positive = bool(value & bit) != negate
+        literals.append(("var", name) if positive else ("not", ("var", name)))
+    if not literals:
+        return ("const", not negate)
+    if len(literals) == 1:
+        return literals[0]
+    return ("or" if negate else "and", *literals)
+
+
+def sop_ast(implicants, names):
+    """Sum of products for a QM cover (``0`` if the cover is empty)."""
+    terms = [implicant_ast(p, names) for p in implicants]
+    if not terms:
+        return ("const", False)
+    return terms[0] if len(terms) == 1 else ("or", *terms)
+
+
+def pos_ast(implicants_of_complement, names):
+    """Product of sums from a cover of the complement (the maxterms)."""
+    terms = [implicant_ast(p, names, negate=True) for p in implicants_of_complement]
+    if not terms:
+        return ("const", True)
+    return terms[0] if len(terms) == 1 else ("and", *terms)
@@ -0,0 +1,93 @@
+"""
+Server-side, cached rendering of gate diagrams.
+
+``st.graphviz_chart`` ships DOT source to the browser, which lays the graph
+out again on every rerun. Here the layout runs once on the server (the
+Graphviz ``dot`` executable) and the SVG is kept in an LRU keyed by a hash
+of the DOT source, so reruns and identical diagrams in other sessions reuse
+it. Without the ``dot`` executable the DOT source is handed back and the page
+falls back to ``st.graphviz_chart``.
+
+Circuits with more than ``MAX_DIAGRAM_NODES`` nodes are not drawn gate by
+gate: they are replaced by a summary graph with one box per (logic level,
+gate type) showing how many gates it stands for.
+"""
+import hashlib
+import shutil
+from collections import Counter, namedtuple
+
+from dld.lru import LRUCache
+
+MAX_DIAGRAM_NODES = 300
+SVG_CACHE = LRUCache(maxsize=128)
+
+Diagram = namedtuple("Diagram", "svg dot summarized")
+
+_dot_available = None
+
+
+def have_dot():
+    """True if the Graphviz ``dot`` executable is installed."""
+    global _dot_available
+    if _dot_available is None:
+        _dot_available = shutil.which("dot") is not None
+    return _dot_available
+
+
+def render_svg(dot_source, engine="dot"):
+    """SVG for ``dot_source`` (cached by content hash); ``None`` without Graphviz."""
+    if not have_dot():
+        return None
+    key = hashlib.sha1(f"{engine}\n{dot_source}".encode()).hexdigest()
+    svg = SVG_CACHE.get(key)
+    if svg is None:
+        import graphviz
+        try:
+            raw = graphviz.Source(dot_source, engine=engine).pipe(format="svg").decode("utf-8")
+        except (graphviz.ExecutableNotFound, graphviz.CalledProcessError):
+            return None
+        svg = raw[raw.find("<svg"):]  # drop the XML prolog / DOCTYPE for inline HTML
+        SVG_CACHE.put(key, svg)
+    return svg
+
+
+def summary_dot(dag, title="Circuit summary"):
+    """DOT of a level-by-level summary of a large ``GateDAG``."""
+    levels = dag.levels()
+    groups = Counter((levels[i], n.op) for i, n in enumerate(dag.nodes))
+    wires = Counter()
+    for i, node in enumerate(dag.nodes):
+        for f in node.fanins:
+            wires[(levels[f], dag.nodes[f].op), (levels[i], node.op)] += 1
+
+    def gid(group):
+        return f"L{group[0]}_{group[1]}"
+
+    lines = [f'digraph "{title}" {{', "  rankdir=LR;", "  node [fontname=Helvetica, shape=box];"]
+    for (level, op), count in sorted(groups.items()):
+        label = "inputs" if op == "input" else "constants" if op == "const" else op.upper()
+        lines.append(f'  {gid((level, op))} [label="{count} × {label}\\nlevel {level}"];')
+    for (src, dst), count in sorted(wires.items()):
+        lines.append(f'  {gid(src)} -> {gid(dst)} [label="{count}"];')
+    for k, (name, node) in enumerate(dag.outputs):
+        lines.append(f'  out{k} [label="{name}", shape=plaintext];')
+        lines.append(f"  {gid((levels[node], dag.nodes[node].op))} -> out{k};")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def render_diagram(graph, max_nodes=MAX_DIAGRAM_NODES):
+    """
+    Diagram for a ``GateDAG`` or DOT source (anything with ``.source`` works too).
+    Returns ``Diagram(svg, dot, summarized)``; ``svg`` is ``None`` when Graphviz
+    is not installed and the page should draw ``dot`` itself.
+    """
+    summarized = False
+    if hasattr(graph, "to_dot"):
+        if len(graph.nodes) > max_nodes:
+            dot, summarized = summary_dot(graph), True
+        else:
+            dot = graph.to_dot()
+    else:
+        dot = getattr(graph, "source", graph)
+    return Diagram(render_svg(dot), dot, summarized)
@@ -0,0 +1,350 @@
+"""
+CDCL SAT solver and miter-based equivalence checking.
+
+For expressions with too many variables for a truth table or a BDD, two
+expressions are compared with a *miter*: both are Tseitin-encoded into CNF
+(one fresh variable per gate, a few clauses tying it to its inputs) and the
+XOR of their outputs is asserted. The CNF is satisfiable exactly when some
+input makes the expressions differ, and the model is that counterexample.
+
+The solver is a compact conflict-driven clause-learning loop:
+
+- two watched literals per clause for unit propagation,
+- first-UIP conflict analysis with non-chronological backjumping,
+- VSIDS-style variable activities (bumped on conflicts, decayed), with
+  saved phases for decisions,
+- Luby restarts,
+
+and gives up (status ``"unknown"``) when its time budget runs out.
+Literals are non-zero ints: ``v`` / ``-v`` for variable ``v`` true / false.
+"""
+import heapq
+import time
+from collections import defaultdict, namedtuple
+
+from dld.compiler import as_ast
+
+DEFAULT_TIME_BUDGET = 10.0  # seconds
+RESTART_BASE = 100  # conflicts, scaled by the Luby sequence
+
+MiterResult = namedtuple("MiterResult", "status counterexample stats")
+
+
+def luby(i):
+    """i-th element (1-based) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, ..."""
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while i != (1 << k) - 1:
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+    return 1 << (k - 1)
+
+
+class Solver:
+    """CDCL solver over clauses added with ``add_clause``."""
+
+    def __init__(self):
+        self.num_vars = 0
+        self.value = [0]         # per variable: 1 true, -1 false, 0 unassigned
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.phase = [False]
+        self.watches = defaultdict(list)
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.var_inc = 1.0
+        self.ok = True
+        self.stats = {"conflicts": 0, "decisions": 0, "propagations": 0, "learnt": 0, "restarts": 0}
+
+    def new_var(self):
+        self.num_vars += 1
+        self.value.append(0)
+        self.level.append(0)
+        self.reason.append(None)
+        self.activity.append(0.0)
+        self.phase.append(False)
+        return self.num_vars
+
+    def _lit_value(self, lit):
+        v = self.value[abs(lit)]
+        return v if lit > 0 else -v
+
+    def _enqueue(self, lit, reason):
+        var = abs(lit)
+        self.value[var] = 1 if lit > 0 else -1
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(lit)
+
+    def add_clause(self, lits):
+        """Add a clause (at decision level 0). Returns False once the formula is UNSAT."""
+        if not self.ok:
+            return False
+        clause = []
+        for lit in set(lits):
+            if -lit in lits:
+                return True  # tautology
+            value = self._lit_value(lit)
+            if value == 1:
+                return True
+            if value == 0:
+                clause.append(lit)
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self._enqueue(clause[0], None)
+            self.ok = self._propagate() is None
+        else:
+            self.watches[clause[0]].append(clause)
+            self.watches[clause[1]].append(clause)
+        return self.ok
+
+    def _propagate(self):
+        """Unit propagation; returns a conflicting clause or ``None``."""
+        trail, watches, value = self.trail, self.watches, self.value
+        while self.qhead < len(trail):
+            false_lit = -trail[self.qhead]
+            self.qhead += 1
+            self.stats["propagations"] += 1
+            pending = watches[false_lit]
+            kept = []
+            watches[false_lit] = kept
+            i = 0
+            while i < len(pending):
+                clause = pending[i]
+                i += 1
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                v = value[abs(first)]
+                if (v if first > 0 else -v) == 1:
+                    kept.append(clause)
+                    continue
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    v = value[abs(lit)]
+                    if (v if lit > 0 else -v) != -1:
+                        clause[1], clause[k] = lit, false_lit
+                        watches[lit].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    v = value[abs(first)]
+                    if (v if first > 0 else -v) == -1:
+                        kept.extend(pending[i:])
+                        self.qhead = len(trail)
+                        return clause
+                    self._enqueue(first, clause)
+        return None
+
+    def _bump(self, var):
+        self.activity[var] += self.var_inc
+        if self.activity[var] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.var_inc *= 1e-100
+        heapq.heappush(self._heap, (-self.activity[var], var))
+
+    def _analyze(self, conflict):
+        """First-UIP learnt clause and the level to jump back to."""
+        current = len(self.trail_lim)
+        seen = set()
+        learnt = [0]
+        counter = 0
+        lit = None
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for q in clause:
+                if q == lit:
+                    continue
+                var = abs(q)
+                if var not in seen and self.level[var] > 0:
+                    seen.add(var)
+                    self._bump(var)
+                    if self.level[var] == current:
+                        counter += 1
+                    else:
+                        learnt.append(q)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            lit = self.trail[index]
+            index -= 1
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.reason[abs(lit)]
+        learnt[0] = -lit
+        if len(learnt) == 1:
+            return learnt, 0
+        # Watch the literal from the highest remaining level second
+        best = max(range(1, len(learnt)), key=lambda k: self.level[abs(learnt[k])])
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, self.level[abs(learnt[1])]
+
+    def _backtrack(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for lit in self.trail[start:]:
+            var = abs(lit)
+            self.phase[var] = lit > 0
+            self.value[var] = 0
+            self.reason[var] = None
+            heapq.heappush(self._heap, (-self.activity[var], var))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def _decide(self):
+        while self._heap:
+            _, var = heapq.heappop(self._heap)
+            if self.value[var] == 0:
+                return var if self.phase[var] else -var
+        return None
+
+    def solve(self, time_budget=DEFAULT_TIME_BUDGET):
+        """``True`` (SAT, see ``model``), ``False`` (UNSAT) or ``None`` (out of time)."""
+        if not self.ok:
+            return False
+        deadline = time.monotonic() + time_budget
+        self._heap = [(-self.activity[v], v) for v in range(1, self.num_vars + 1)]
+        heapq.heapify(self._heap)
+        restart, conflicts_left = 1, RESTART_BASE * luby(1)
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.stats["conflicts"] += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learnt, level = self._analyze(conflict)
+                self._backtrack(level)
+                if len(learnt) == 1:
+                    self._enqueue(learnt[0], None)
+                else:
+                    self.watches[learnt[0]].append(learnt)
+                    self.watches[learnt[1]].append(learnt)
+                    self._enqueue(learnt[0], learnt)
+                    self.stats["learnt"] += 1
+                self.var_inc /= 0.95
+                conflicts_left -= 1
+                if self.stats["conflicts"] % 256 == 0 and time.monotonic() > deadline:
+                    self._backtrack(0)
+                    return None
+                continue
+            if conflicts_left <= 0:
+                restart += 1
+                conflicts_left = RESTART_BASE * luby(restart)
+                self.stats["restarts"] += 1
+                self._backtrack(0)
+                continue
+            lit = self._decide()
+            if lit is None:
+                return True
+            self.stats["decisions"] += 1
+            if self.stats["decisions"] % 1024 == 0 and time.monotonic() > deadline:
+                self._backtrack(0)
+                return None
+            self.trail_lim.append(len(self.trail))
+            self._enqueue(lit, None)
+
+    def model(self, var):
+        return self.value[var] == 1
+
+
+class Tseitin:
+    """Encode expressions into a ``Solver``: one variable per input and per gate."""
+
+    def __init__(self, solver):
+        self.solver = solver
+        self.inputs = {}
+        self._gates = {}
+        self._true = None
+
+    def input(self, name):
+        if name not in self.inputs:
+            self.inputs[name] = self.solver.new_var()
+        return self.inputs[name]
+
+    def gate(self, op, lits):
+        """Variable for ``op`` (and / or / 2-input xor) over ``lits``, shared if already built."""
+        key = (op, tuple(sorted(lits)))
+        if key in self._gates:
+            return self._gates[key]
+        s = self.solver
+        x = s.new_var()
+        if op == "and":
+            for lit in lits:
+                s.add_clause([-x, lit])
+            s.add_clause([x] + [-lit for lit in lits])
+        elif op == "or":
+            for lit in lits:
+                s.add_clause([x, -lit])
+            s.add_clause([-x] + list(lits))
+        else:  # 2-input xor
+            a, b = lits
+            s.add_clause([-x, a, b])
+            s.add_clause([-x, -a, -b])
+            s.add_clause([x, -a, b])
+            s.add_clause([x, a, -b])
+        self._gates[key] = x
+        return x
+
+    def encode(self, expr):
+        """Literal that is true exactly when ``expr`` (AST or SymPy) is true."""
+        memo = {}
+
+        def walk(node):
+            key = id(node)  # identity: hashing nested tuples is O(subtree)
+            if key in memo:
+                return memo[key]
+            op = node[0]
+            if op == "var":
+                lit = self.input(node[1])
+            elif op == "const":
+                if self._true is None:
+                    self._true = self.solver.new_var()
+                    self.solver.add_clause([self._true])
+                lit = self._true if node[1] else -self._true
+            elif op == "not":
+                lit = -walk(node[1])
+            elif op == "xor":
+                lit = walk(node[1])
+                for arg in node[2:]:
+                    lit = self.gate("xor", [lit, walk(arg)])
+            else:
+                lit = self.gate(op, [walk(arg) for arg in node[1:]])
+            memo[key] = lit
+            return lit
+
+        return walk(as_ast(expr))
+
+
+def prove_equivalence(a, b, variables=None, time_budget=DEFAULT_TIME_BUDGET):
+    """
+    Check two expressions (ASTs or SymPy) with a SAT miter. Returns
+    ``MiterResult(status, counterexample, stats)`` where ``status`` is
+    ``"equivalent"``, ``"different"`` (with a full input assignment) or
+    ``"unknown"`` if the time budget ran out.
+    """
+    start = time.perf_counter()
+    solver = Solver()
+    encoder = Tseitin(solver)
+    for name in variables or ():
+        encoder.input(str(name))
+    miter = encoder.gate("xor", [encoder.encode(a), encoder.encode(b)])
+    solver.add_clause([miter])
+    outcome = solver.solve(time_budget)
+
+    stats = dict(solver.stats, variables=solver.num_vars, time=time.perf_counter() - start)
+    if outcome is None:
+        return MiterResult("unknown", None, stats)
+    if not outcome:
+        return MiterResult("equivalent", None, stats)
+    counterexample = {name: int(solver.model(var)) for name, var in encoder.inputs.items()}
+    return MiterResult("different", counterexample, stats)
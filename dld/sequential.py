@@ -0,0 +1,263 @@
+"""
+Cycle-accurate simulation of latches and flip-flops over many stimulus
+streams at once.
+
+A stimulus is a dict of input name → 0/1 array shaped ``(streams, steps)``.
+Each row is one independent stream, e.g. one student's exercise sheet. The
+state (Q and Q̅) is one array per stream, and every step updates all streams
+with a few NumPy operations. A class of a few hundred sheets therefore costs
+about as much as one sheet.
+
+Primitives (``KINDS`` lists their data inputs):
+
+* ``sr_latch``, ``d_latch``: level-triggered. They are transparent while
+  ``EN`` is 1 (an SR latch without ``EN`` is always transparent).
+* ``sr_ff``, ``jk_ff``, ``d_ff``, ``t_ff``: edge-triggered on ``CLK``, on
+  the rising or the falling edge. The data inputs are sampled *before* the
+  edge, as in ``event_sim``. A change at the same step as the edge is too
+  late for that edge.
+* Optional ``PRE`` / ``CLR`` inputs (active high, asynchronous) override
+  the clock and data inputs while they are 1.
+
+Q and Q̅ are kept separately, the way a NOR latch behaves: ``S = R = 1``
+drives both to 0, and ``PRE = CLR = 1`` drives both to 1. Those steps are
+flagged in ``Trace.invalid``.
+
+D and T flip-flops without ``PRE`` / ``CLR`` need no step-by-step loop. A T
+flip-flop's Q is the running XOR of ``T`` at the active edges, and a D
+flip-flop's Q is ``D`` at the latest edge. Both are computed over the whole time axis at once
+(``np.bitwise_xor.accumulate`` / ``np.maximum.accumulate``), so million-step
+runs such as ``ripple_counter`` take milliseconds.
+
+``clocked_stimulus`` is the clocked scheduler. It turns one row of inputs per
+clock cycle into half-cycle steps with a generated ``CLK``, and
+``run_cycles`` reports Q after each cycle's active edge.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+KINDS = {
+    "sr_latch": ("S", "R"),
+    "d_latch": ("D",),
+    "sr_ff": ("S", "R"),
+    "jk_ff": ("J", "K"),
+    "d_ff": ("D",),
+    "t_ff": ("T",),
+}
+LATCHES = {"sr_latch", "d_latch"}
+EDGES = ("rising", "falling")
+CLOCK = "CLK"
+ENABLE = "EN"
+ASYNC = ("PRE", "CLR")
+
+Primitive = namedtuple("Primitive", "kind edge init")
+Trace = namedtuple("Trace", "q qn invalid")
+Grade = namedtuple("Grade", "correct total first_error")
+
+
+def primitive(kind, edge="rising", init=0):
+    """Checked ``Primitive``; ``edge`` only matters for flip-flops."""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown primitive '{kind}' (expected one of {', '.join(KINDS)})")
+    if edge not in EDGES:
+        raise ValueError(f"Edge must be 'rising' or 'falling', got '{edge}'")
+    return Primitive(kind, edge, int(bool(init)))
+
+
+def input_names(prim, asynchronous=False):
+    """Inputs ``prim`` reads, in display order (``EN`` / ``CLK`` included)."""
+    names = list(KINDS[prim.kind])
+    if prim.kind == "d_latch":
+        names.append(ENABLE)
+    elif prim.kind not in LATCHES:
+        names.append(CLOCK)
+    return names + list(ASYNC) if asynchronous else names
+
+
+def _stimulus_arrays(prim, stimulus):
+    """Validate ``stimulus`` and return ``(arrays, streams, steps)``; 1-D arrays are one stream."""
+    arrays = {name: np.atleast_2d(np.asarray(values, dtype=np.uint8) & 1) for name, values in stimulus.items()}
+    required = set(input_names(prim))
+    optional = set(ASYNC) | ({ENABLE} if prim.kind == "sr_latch" else set())
+    missing = sorted(required - set(arrays))
+    if missing:
+        raise ValueError(f"Missing stimulus for {', '.join(missing)}")
+    unknown = sorted(set(arrays) - required - optional)
+    if unknown:
+        raise ValueError(f"{prim.kind} has no input(s) {', '.join(unknown)}")
+    shapes = {a.shape for a in arrays.values()}
+    if len(shapes) != 1:
+        raise ValueError(f"Stimulus arrays differ in shape: {sorted(shapes)}")
+    streams, steps = shapes.pop()
+    return arrays, streams, steps
+
+
+def _next_q(kind, q, qn, inputs):
+    """Synchronous next ``(q, qn)`` when the element is enabled / clocked."""
+    if kind in ("sr_latch", "sr_ff"):
+        s, r = inputs["S"], inputs["R"]
+        return (1 ^ r) & (s | q), (1 ^ s) & (r | qn)
+    if kind == "jk_ff":
+        j, k = inputs["J"], inputs["K"]
+        nq = (j & (1 ^ q)) | ((1 ^ k) & q)
+    elif kind == "t_ff":
+        nq = inputs["T"] ^ q
+    else:
+        nq = inputs["D"]
+    return nq, 1 ^ nq
+
+
+def _shift(a):
+    """Values one step earlier (the first step repeats itself)."""
+    return np.concatenate([a[:, :1], a[:, :-1]], axis=1)
+
+
+def _simulate_over_time(prim, arrays):
+    """D / T flip-flop without async inputs, vectorized along time as well."""
+    clock, prev = arrays[CLOCK], _shift(arrays[CLOCK])
+    edge = (clock & (1 ^ prev)) if prim.edge == "rising" else (prev & (1 ^ clock))
+    if prim.kind == "t_ff":
+        q = prim.init ^ np.bitwise_xor.accumulate(edge & _shift(arrays["T"]), axis=1)
+    else:
+        steps = clock.shape[1]
+        last = np.maximum.accumulate(np.where(edge.astype(bool), np.arange(steps), -1), axis=1)
+        sampled = np.take_along_axis(_shift(arrays["D"]), np.maximum(last, 0), axis=1)
+        q = np.where(last >= 0, sampled, prim.init)
+    q = q.astype(np.uint8)
+    return Trace(q, 1 ^ q, np.zeros(q.shape, dtype=bool))
+
+
+def simulate(prim, stimulus):
+    """
+    Run ``prim`` over every stream of ``stimulus`` (see the module docstring).
+    Returns ``Trace(q, qn, invalid)``: arrays shaped ``(streams, steps)``
+    with the state *after* each step.
+    """
+    arrays, streams, steps = _stimulus_arrays(prim, stimulus)
+    if prim.kind in ("d_ff", "t_ff") and not set(ASYNC) & set(arrays) and steps:
+        return _simulate_over_time(prim, arrays)
+    q = np.full(streams, prim.init, dtype=np.uint8)
+    qn = 1 ^ q
+    trace_q = np.empty((streams, steps), dtype=np.uint8)
+    trace_qn = np.empty((streams, steps), dtype=np.uint8)
+    invalid = np.zeros((streams, steps), dtype=bool)
+    names = KINDS[prim.kind]
+    latch = prim.kind in LATCHES
+    preset, clear = arrays.get("PRE"), arrays.get("CLR")
+
+    for t in range(steps):
+        if latch:
+            inputs = {name: arrays[name][:, t] for name in names}
+            active = arrays[ENABLE][:, t] if ENABLE in arrays else None
+        else:
+            # Data sampled before the edge; no edge at the first step
+            before = max(t - 1, 0)
+            inputs = {name: arrays[name][:, before] for name in names}
+            clock, prev = arrays[CLOCK][:, t], arrays[CLOCK][:, before]
+            active = (clock & (1 ^ prev)) if prim.edge == "rising" else (prev & (1 ^ clock))
+        nq, nqn = _next_q(prim.kind, q, qn, inputs)
+        if active is None:
+            q, qn = nq, nqn
+        else:
+            on = active.astype(bool)
+            q, qn = np.where(on, nq, q), np.where(on, nqn, qn)
+        if preset is not None:
+            p = preset[:, t].astype(bool)
+            q, qn = np.where(p, 1, q), np.where(p, 0, qn)
+        if clear is not None:
+            c = clear[:, t].astype(bool)
+            q, qn = np.where(c, 0, q), np.where(c, 1, qn)
+            if preset is not None:
+                both = c & preset[:, t].astype(bool)
+                q, qn = np.where(both, 1, q), np.where(both, 1, qn)
+        q, qn = q.astype(np.uint8), qn.astype(np.uint8)
+        trace_q[:, t], trace_qn[:, t] = q, qn
+        invalid[:, t] = q == qn
+    return Trace(trace_q, trace_qn, invalid)
+
+
+# ---- clocked scheduler ---------------------------------------------------
+
+def clocked_stimulus(prim, cycles):
+    """
+    Expand one row of inputs per clock cycle (``name → (streams, cycles)``)
+    into two steps per cycle. Inputs change at the start of a cycle while the
+    clock is inactive, and the active edge comes half-way. Latches have no
+    clock and keep one step per cycle.
+    """
+    if prim.kind in LATCHES:
+        return dict(cycles)
+    expanded = {name: np.repeat(np.atleast_2d(np.asarray(v, dtype=np.uint8)), 2, axis=1) for name, v in cycles.items()}
+    if not expanded:
+        raise ValueError("No stimulus given")
+    streams, steps = next(iter(expanded.values())).shape
+    phase = np.array([0, 1] if prim.edge == "rising" else [1, 0], dtype=np.uint8)
+    expanded[CLOCK] = np.tile(phase, (streams, steps // 2))
+    return expanded
+
+
+def run_cycles(prim, cycles):
+    """``simulate`` on ``clocked_stimulus``; returns a ``Trace`` with one column per cycle."""
+    trace = simulate(prim, clocked_stimulus(prim, cycles))
+    if prim.kind in LATCHES:
+        return trace
+    return Trace(*(a[:, 1::2] for a in trace))
+
+
+def ripple_counter(bits, cycles, init=0):
+    """
+    ``bits``-bit ripple up-counter from falling-edge T flip-flops (T = 1):
+    stage 0 is clocked by ``CLK`` and stage k by ``Q(k-1)``. Returns
+    ``{"CLK": ..., "Q0": ..., ...}`` as 1-D arrays of two steps per cycle.
+    """
+    stage = primitive("t_ff", edge="falling")
+    ones = np.ones((1, cycles), dtype=np.uint8)
+    clock = clocked_stimulus(stage, {"T": ones})[CLOCK]
+    traces = {CLOCK: clock[0]}
+    for k in range(bits):
+        stage = primitive("t_ff", edge="falling", init=(init >> k) & 1)
+        clock = simulate(stage, {"T": np.ones_like(clock), CLOCK: clock}).q
+        traces[f"Q{k}"] = clock[0]
+    return traces
+
+
+# ---- exercise sheets -----------------------------------------------------
+
+def stack_streams(frame, columns, by):
+    """
+    Long table (one row per cycle, ``by`` naming the stream) → ``(keys,
+    arrays, lengths)``. ``arrays`` maps each column to ``(streams, cycles)``.
+    Shorter streams are padded by repeating their last row.
+    """
+    groups = list(frame.groupby(by, sort=False))
+    if not groups:
+        raise ValueError("The sheet has no rows")
+    lengths = np.array([len(g) for _, g in groups])
+    width = int(lengths.max())
+    arrays = {}
+    for column in columns:
+        if column not in frame.columns:
+            raise ValueError(f"Missing column '{column}'")
+        data = np.empty((len(groups), width), dtype=np.uint8)
+        for i, (_, group) in enumerate(groups):
+            values = group[column].to_numpy(dtype=np.uint8) & 1
+            data[i, :len(values)] = values
+            data[i, len(values):] = values[-1]
+        arrays[column] = data
+    return [key for key, _ in groups], arrays, lengths
+
+
+def grade(expected, answers, lengths=None):
+    """
+    Compare ``answers`` with ``expected`` (both ``(streams, cycles)``) over
+    the first ``lengths[i]`` cycles of each stream. Returns ``Grade(correct,
+    total, first_error)``, where ``first_error`` is the first wrong cycle or -1.
+    """
+    expected, answers = np.asarray(expected), np.asarray(answers)
+    cycles = expected.shape[1]
+    lengths = np.full(len(expected), cycles) if lengths is None else np.asarray(lengths)
+    counted = np.arange(cycles)[None, :] < lengths[:, None]
+    wrong = (expected != answers) & counted
+    first = np.where(wrong.any(axis=1), wrong.argmax(axis=1), -1)
+    return Grade(counted.sum(axis=1) - wrong.sum(axis=1), lengths, first)
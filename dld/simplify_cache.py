@@ -0,0 +1,136 @@
+"""
+Memoized ``simplify_logic`` shared by every session of the app.
+
+Results are keyed by the normalized expression text plus the requested form
+(``"dnf"``, ``"cnf"`` or ``None`` for auto). They are kept in an in-memory LRU
+and written through to a small SQLite file, so warm results survive restarts.
+The file defaults to ``.cache/simplify.sqlite3`` next to ``Home.py`` and can be
+moved with the ``DLD_SIMPLIFY_DB`` environment variable (set it to an empty
+string to keep the cache in memory only).
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from sympy import simplify_logic
+
+from dld.lru import LRUCache
+from dld.parser import ParseError, canonicalize, from_sympy, parse, to_infix, to_sympy
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          ".cache", "simplify.sqlite3")
+MEMORY_ENTRIES = 1024
+DISK_ENTRIES = 50_000
+MAX_RESULT_CHARS = 20_000  # huge results are cheap to recompute relative to their size
+
+
+class SimplifyCache:
+    """Two-level (memory LRU + SQLite) store of simplified expressions."""
+
+    def __init__(self, path=None, memory_entries=MEMORY_ENTRIES, disk_entries=DISK_ENTRIES):
+        self.memory = LRUCache(memory_entries)
+        self.disk_entries = disk_entries
+        self.disk_hits = 0
+        self._lock = threading.Lock()
+        self._db = None
+        if path is None:
+            path = os.environ.get("DLD_SIMPLIFY_DB", DEFAULT_DB)
+        if path:
+            try:
+                if path != ":memory:":
+                    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS simplify ("
+                    " key TEXT PRIMARY KEY, result TEXT NOT NULL, used REAL NOT NULL)"
+                )
+                self._db.commit()
+            except (OSError, sqlite3.Error):
+                self._db = None  # read-only checkout etc.: memory cache only
+
+    def get(self, key):
+        result = self.memory.get(key)
+        if result is not None or self._db is None:
+            return result
+        with self._lock:
+            try:
+                row = self._db.execute("SELECT result FROM simplify WHERE key = ?", (key,)).fetchone()
+                if row:
+                    self._db.execute("UPDATE simplify SET used = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+            except sqlite3.Error:
+                row = None
+        if row:
+            self.disk_hits += 1
+            self.memory.put(key, row[0])
+            return row[0]
+        return None
+
+    def put(self, key, result):
+        if len(result) > MAX_RESULT_CHARS:
+            return
+        self.memory.put(key, result)
+        if self._db is None:
+            return
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO simplify (key, result, used) VALUES (?, ?, ?)",
+                    (key, result, time.time()),
+                )
+                # Trim the least recently used rows once the file grows past the limit
+                count = self._db.execute("SELECT COUNT(*) FROM simplify").fetchone()[0]
+                if count > self.disk_entries:
+                    self._db.execute(
+                        "DELETE FROM simplify WHERE key IN ("
+                        " SELECT key FROM simplify ORDER BY used LIMIT ?)",
+                        (count - self.disk_entries,),
+                    )
+                self._db.commit()
+            except sqlite3.Error:
+                pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Process-wide cache instance (shared by all Streamlit sessions)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SimplifyCache()
+        return _cache
+
+
+def cache_key(expr, form=None):
+    ast = expr if isinstance(expr, tuple) else from_sympy(expr)
+    return f"{form or 'auto'}:{to_infix(canonicalize(ast))}"
+
+
+def lookup(expr, form=None):
+    """Cached result for ``expr`` (SymPy or AST), or ``None`` if not computed yet."""
+    stored = get_cache().get(cache_key(expr, form))
+    if stored is not None:
+        try:
+            return to_sympy(parse(stored).ast)
+        except ParseError:
+            pass  # symbol names the parser cannot read back: recompute
+    return None
+
+
+def cached_simplify_logic(expr, form=None):
+    """
+    Drop-in replacement for ``simplify_logic(expr, form)`` backed by the cache.
+    ``expr`` may be a SymPy expression or a parser AST.
+    """
+    result = lookup(expr, form)
+    if result is not None:
+        return result
+    sym_expr = to_sympy(expr) if isinstance(expr, tuple) else expr
+    result = simplify_logic(sym_expr, form=form)
+    get_cache().put(cache_key(expr, form), to_infix(from_sympy(result)))
+    return result
@@ -0,0 +1,198 @@
+"""
+NAND-only / NOR-only technology mapping by dynamic-programming tree covering.
+
+The expression is first decomposed into a *subject graph* that only uses the
+library's base gate (2-input NAND or NOR) and inverters; double inverters
+cancel and identical nodes are shared. With NAND as the base:
+
+    a & b  →  INV(NAND(a, b))          a | b  →  NAND(INV a, INV b)
+
+(mirrored for NOR). Wider AND/OR/XOR become balanced trees, and each 2-input
+XOR is expanded into AND/OR/NOT over the two operands' nodes, so a wide XOR
+costs a linear number of subject nodes. Every library gate is a small
+pattern over the subject graph:
+
+    INV    = INV(x)                      (a NAND/NOR with tied inputs)
+    NAND2  = NAND(a, b)
+    NAND3  = NAND(INV(NAND(a, b)), c)
+    NAND4  = NAND(INV(NAND(a, b)), INV(NAND(c, d)))
+
+The graph is cut into trees at nodes with more than one fanout, and each
+node gets the cheapest match rooted there (gate count or arrival depth) in
+one topological pass, so the mapper is linear in the subject graph size.
+"""
+from collections import Counter, namedtuple
+
+from dld.compiler import as_ast
+from dld.gate_dag import GateDAG
+
+Mapping = namedtuple("Mapping", "dag gates depth stats")
+
+LIBRARIES = {"nand": ("and", "or"), "nor": ("or", "and")}  # base → (inner, outer) operator
+
+
+class _Subject:
+    """Hash-consed graph of ``input`` / ``const`` / base-gate / ``inv`` nodes."""
+
+    def __init__(self, base):
+        self.base = base
+        self.inner, self.outer = LIBRARIES[base]
+        self.nodes = []
+        self._unique = {}
+
+    def _intern(self, op, fanins, label=None):
+        key = (op, fanins, label)
+        node = self._unique.get(key)
+        if node is None:
+            node = len(self.nodes)
+            self.nodes.append((op, fanins, label))
+            self._unique[key] = node
+        return node
+
+    def inv(self, x):
+        op, fanins, _ = self.nodes[x]
+        if op == "inv":
+            return fanins[0]  # INV(INV(x)) = x
+        return self._intern("inv", (x,))
+
+    def gate(self, a, b):
+        return self._intern(self.base, tuple(sorted((a, b))))
+
+    def combine(self, op, items):
+        """Balanced tree of 2-input ``op`` (the library's inner or outer operator)."""
+        if len(items) == 1:
+            return items[0]
+        mid = len(items) // 2
+        a, b = self.combine(op, items[:mid]), self.combine(op, items[mid:])
+        if op == self.inner:
+            return self.inv(self.gate(a, b))
+        return self.gate(self.inv(a), self.inv(b))
+
+    def xor(self, items):
+        """Balanced tree of 2-input XOR, each as ``(a & ~b) | (~a & b)`` over built nodes."""
+        if len(items) == 1:
+            return items[0]
+        mid = len(items) // 2
+        a, b = self.xor(items[:mid]), self.xor(items[mid:])
+        return self.combine("or", [self.combine("and", [a, self.inv(b)]), self.combine("and", [self.inv(a), b])])
+
+    def add(self, ast):
+        """Subject node of a parser AST; shared subtrees are added once."""
+        built = {}
+
+        def build(node):
+            key = id(node)  # identity, as in GateDAG.add_ast
+            if key in built:
+                return built[key]
+            op = node[0]
+            if op == "var":
+                result = self._intern("input", (), node[1])
+            elif op == "const":
+                result = self._intern("const", (), bool(node[1]))
+            elif op == "not":
+                result = self.inv(build(node[1]))
+            elif op == "xor":
+                result = self.xor([build(arg) for arg in node[1:]])
+            else:
+                result = self.combine(op, [build(arg) for arg in node[1:]])
+            built[key] = result
+            return result
+
+        return build(ast)
+
+
+def _matches(subject, v, fanout):
+    """``(gate_name, leaves)`` for every library gate that can be rooted at ``v``."""
+    op, fanins, _ = subject.nodes[v]
+    base = subject.base.upper()
+    if op == "inv":
+        return [("INV", fanins)]
+    result = [(f"{base}2", fanins)]
+
+    def inner_pair(x):
+        # INV(BASE(a, b)) whose nodes are used only here
+        xop, xin, _ = subject.nodes[x]
+        if xop != "inv" or fanout[x] != 1:
+            return None
+        y = xin[0]
+        yop, yin, _ = subject.nodes[y]
+        if yop != subject.base or fanout[y] != 1:
+            return None
+        return yin
+
+    p, q = fanins
+    left, right = inner_pair(p), inner_pair(q)
+    if left:
+        result.append((f"{base}3", left + (q,)))
+    if right and q != p:
+        result.append((f"{base}3", right + (p,)))
+    if left and right and q != p:
+        result.append((f"{base}4", left + right))
+    return result
+
+
+def tech_map(expr, library="nand", objective="gates", output="F"):
+    """
+    Map ``expr`` (AST or SymPy) onto NAND-only or NOR-only gates.
+    ``objective`` is ``"gates"`` (fewest gates) or ``"depth"`` (fewest levels).
+    Returns ``Mapping(dag, gates, depth, stats)``; ``dag`` is a ``GateDAG``
+    of ``nand``/``nor`` gates where an inverter is a gate with tied inputs.
+    """
+    subject = _Subject(library)
+    root = subject.add(as_ast(expr))
+
+    # Cancelled double inverters leave nodes nothing reads: keep them out of the fanout
+    live = [False] * len(subject.nodes)
+    live[root] = True
+    for v in range(root, -1, -1):
+        if live[v]:
+            for f in subject.nodes[v][1]:
+                live[f] = True
+    fanout = Counter(f for v, (_, fanins, _) in enumerate(subject.nodes) if live[v] for f in fanins)
+    fanout[root] += 1
+
+    # best[v] = (gates in v's tree, arrival level, gate name, leaves)
+    best = {}
+    for v, (op, _, _) in enumerate(subject.nodes):
+        if not live[v]:
+            continue
+        if op in ("input", "const"):
+            best[v] = (0, 0, None, ())
+            continue
+        candidates = []
+        for name, leaves in _matches(subject, v, fanout):
+            # Multi-fanout leaves are roots of their own trees: counted once there
+            gates = 1 + sum(best[l][0] for l in leaves if fanout[l] == 1)
+            arrival = 1 + max(best[l][1] for l in leaves)
+            candidates.append((gates, arrival, name, leaves))
+        if objective == "depth":
+            best[v] = min(candidates, key=lambda c: (c[1], c[0]))
+        else:
+            best[v] = min(candidates, key=lambda c: (c[0], c[1]))
+
+    dag = GateDAG()
+    built = {}
+    used = Counter()
+
+    def implement(v):
+        if v in built:
+            return built[v]
+        op, _, label = subject.nodes[v]
+        if op == "input":
+            node = dag.add_input(label)
+        elif op == "const":
+            node = dag.add_const(label)
+        else:
+            _, _, name, leaves = best[v]
+            inputs = [implement(l) for l in leaves]
+            if name == "INV":
+                inputs = inputs * 2  # tie both inputs together
+            node = dag.add_gate(library, inputs)
+            used[name] += 1
+        built[v] = node
+        return node
+
+    dag.add_output(output, implement(root))
+    stats = {"subject_nodes": sum(live), "library": library, "objective": objective,
+             "cells": dict(sorted(used.items()))}
+    return Mapping(dag, dag.gate_count, dag.depth, stats)
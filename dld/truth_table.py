@@ -0,0 +1,197 @@
+"""
+Bit-parallel truth-table engine.
+
+Every variable is stored as one 2**n-bit integer whose bit ``r`` is the value of
+that variable in truth-table row ``r``. Rows follow the same order as
+``itertools.product([0, 1], repeat=n)`` (the first variable is the MSB), so the
+tables match the ones the pages used to build with ``expr.subs``.
+AND/OR/NOT/XOR then become a single word-wide bitwise operation over all rows.
+"""
+import io
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from dld.compiler import compile_expr
+
+try:  # optional: Parquet export
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+CHUNK_ROWS = 1 << 16  # rows per generated chunk (page, CSV block, Parquet row group)
+# Exports are built in memory (download_button needs bytes)
+MAX_EXPORT_ROWS = 1 << 20
+MAX_TABLE_VARS = 24  # largest table the pages build (16M rows, 2 MB packed)
+
+
+def full_mask(num_vars):
+    """All-ones vector covering the 2**num_vars rows."""
+    return (1 << (1 << num_vars)) - 1
+
+
+@lru_cache(maxsize=32)
+def variable_masks(num_vars):
+    """
+    Bit vectors of every input column for a table of ``num_vars`` variables.
+    E.g. for 2 variables: A = 0b1100, B = 0b1010 (row 0 is the lowest bit).
+    """
+    ones = full_mask(num_vars)
+    nbytes = max(1, (1 << num_vars) // 8)
+    masks = []
+    for i in range(num_vars):
+        half = 1 << (num_vars - 1 - i)  # run length of 0s and then 1s
+        if half < 8:
+            # The period fits in a byte: 0xAA, 0xCC or 0xF0
+            pattern = bytes([sum(1 << j for j in range(8) if (j // half) & 1)])
+        else:
+            pattern = bytes(half // 8) + b"\xff" * (half // 8)
+        # Repeating bytes is linear in the table size (a big-int division is not)
+        masks.append(int.from_bytes(pattern * (nbytes // len(pattern)), "little") & ones)
+    return tuple(masks)
+
+
+def evaluate(expr, variables):
+    """
+    Evaluate a parsed (or SymPy) Boolean expression over all rows at once.
+    Returns the Output column packed into one integer.
+    """
+    n = len(variables)
+    return compile_expr(expr, variables)(*variable_masks(n), full_mask(n))
+
+
+def unpack_bits(vector, num_vars):
+    """Expand a packed row vector into a uint8 array of 0/1 values."""
+    rows = 1 << num_vars
+    raw = vector.to_bytes((rows + 7) // 8, "little")
+    return np.unpackbits(np.frombuffer(raw, dtype=np.uint8), bitorder="little")[:rows]
+
+
+def input_columns(num_vars):
+    """Input columns of the truth table as uint8 arrays (first variable = MSB)."""
+    rows = np.arange(1 << num_vars, dtype=np.uint32)
+    return [((rows >> (num_vars - 1 - i)) & 1).astype(np.uint8) for i in range(num_vars)]
+
+
+def truth_table(expr, variables):
+    """Full truth table of ``expr`` (AST or SymPy) as a DataFrame with an ``Output`` column."""
+    return table_frame(variables, evaluate(expr, variables))
+
+
+def table_frame(variables, output):
+    """DataFrame of the input columns plus the packed ``output`` vector."""
+    n = len(variables)
+    data = dict(zip([str(v) for v in variables], input_columns(n)))
+    data["Output"] = unpack_bits(output, n)
+    return pd.DataFrame(data)
+
+
+class PackedTable:
+    """
+    A truth table kept as its packed Output vector (2**n bits) and expanded
+    lazily: ``chunk`` builds the DataFrame of one row range, and the CSV /
+    Parquet writers go chunk by chunk, so the full table is never held as a
+    DataFrame.
+    """
+
+    def __init__(self, variables, output):
+        self.variables = [str(v) for v in variables]
+        self.num_vars = len(self.variables)
+        self.rows = 1 << self.num_vars
+        self._bytes = np.frombuffer(output.to_bytes((self.rows + 7) // 8, "little"), dtype=np.uint8)
+
+    def chunk(self, start, stop):
+        """DataFrame of rows ``start`` .. ``stop - 1`` (same columns as ``table_frame``)."""
+        stop = min(stop, self.rows)
+        index = np.arange(start, stop, dtype=np.uint32)
+        n = self.num_vars
+        data = {name: ((index >> (n - 1 - i)) & 1).astype(np.uint8)
+                for i, name in enumerate(self.variables)}
+        first = start % 8
+        raw = self._bytes[start // 8:(stop + 7) // 8]
+        data["Output"] = np.unpackbits(raw, bitorder="little")[first:first + stop - start]
+        return pd.DataFrame(data, index=pd.RangeIndex(start, stop))
+
+    def chunks(self, size=CHUNK_ROWS):
+        for start in range(0, self.rows, size):
+            yield self.chunk(start, start + size)
+
+    def iter_csv(self, size=CHUNK_ROWS):
+        """CSV of the whole table as a stream of byte blocks."""
+        yield (",".join(self.variables + ["Output"]) + "\n").encode()
+        for frame in self.chunks(size):
+            yield frame.to_csv(index=False, header=False).encode()
+
+    def write_csv(self, sink, size=CHUNK_ROWS):
+        for block in self.iter_csv(size):
+            sink.write(block)
+
+    def write_parquet(self, sink, size=CHUNK_ROWS):
+        """Parquet file with one row group per chunk (needs pyarrow)."""
+        if pq is None:
+            raise RuntimeError("Parquet export needs pyarrow")
+        writer = None
+        for frame in self.chunks(size):
+            batch = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(sink, batch.schema)
+            writer.write_table(batch)
+        writer.close()
+
+    def export(self, fmt):
+        """
+        The table as ``"csv"`` or ``"parquet"`` bytes, ready for
+        ``st.download_button``. The writers go chunk by chunk, so no DataFrame
+        of the whole table is built, but the encoded file is held in memory;
+        tables past ``MAX_EXPORT_ROWS`` are refused.
+        """
+        if self.rows > MAX_EXPORT_ROWS:
+            raise ValueError(f"Exports are limited to {MAX_EXPORT_ROWS:,} rows ({self.rows:,} requested)")
+        sink = io.BytesIO()
+        if fmt == "parquet":
+            self.write_parquet(sink)
+        else:
+            self.write_csv(sink)
+        return sink.getvalue()
+
+
+def have_parquet():
+    return pq is not None
+
+
+MAX_GATE_VARS = 16
+
+
+def _gate_label(op, names):
+    if len(names) <= 2:
+        return f"{names[0]} {op} {names[-1]}"  # one input: the gate with both pins tied
+    if len(names) <= 4:
+        return f"{op}({', '.join(names)})"
+    return f"{op}({names[0]}…{names[-1]})"
+
+
+@lru_cache(maxsize=MAX_GATE_VARS)
+def gate_table(num_vars):
+    """
+    Truth table of the basic gates as n-input reductions over all
+    ``num_vars`` inputs (NOT takes the first one). Depends only on
+    ``num_vars``, so it is built once with numpy and cached; treat the
+    returned DataFrame as read-only.
+    """
+    names = [chr(65 + i) for i in range(num_vars)]
+    columns = np.vstack(input_columns(num_vars))
+    pins = columns if num_vars > 1 else np.vstack([columns, columns])  # tie a lone input twice
+    conj = np.bitwise_and.reduce(pins, axis=0)
+    disj = np.bitwise_or.reduce(pins, axis=0)
+    parity = np.bitwise_xor.reduce(pins, axis=0)
+    data = dict(zip(names, columns))
+    data[_gate_label("AND", names)] = conj
+    data[_gate_label("OR", names)] = disj
+    data[f"NOT {names[0]}"] = columns[0] ^ 1
+    data[_gate_label("NAND", names)] = conj ^ 1
+    data[_gate_label("NOR", names)] = disj ^ 1
+    data[_gate_label("XOR", names)] = parity
+    data[_gate_label("XNOR", names)] = parity ^ 1
+    return pd.DataFrame(data)
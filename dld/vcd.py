@@ -0,0 +1,435 @@
+"""
+Value Change Dump (IEEE 1364 VCD) export and import.
+
+Writing is incremental. ``VCDWriter.change`` is called while a simulation
+runs (``event_sim`` calls it through its ``on_change`` hook). It only writes
+a line when a value actually changes, and only ``FLUSH_LINES`` lines are
+held before they go to the sink, so the full trace is never in memory.
+``write_traces`` does the same for ``waveform.RLETrace`` traces. It merges
+the signals' changes one time chunk at a time and writes each chunk with
+``change_block``. ``export_traces`` and ``export_simulation`` write into
+memory and return bytes, because ``st.download_button`` needs the whole file
+anyway; the simulator still keeps no trace of its own.
+
+Reading is streaming. ``VCDReader`` parses the header once into a signal
+index (full name → identifier code and width). ``read`` then goes through
+the value changes in ``CHUNK_BYTES`` blocks. For each requested signal it
+keeps one NumPy ``(times, values)`` pair per block and skips everything
+else. The token fallback collects a block's changes in Python lists first.
+At the end the pairs are concatenated into an ``RLETrace`` for the waveform
+viewer. A dump of hundreds of MB therefore costs memory in proportion to the
+signals being looked at. x/z values read as 0.
+"""
+import io
+import re
+from collections import namedtuple
+
+import numpy as np
+
+from dld.event_sim import simulate
+from dld.lru import LRUCache
+from dld.waveform import RLETrace
+
+CHUNK_BYTES = 1 << 22  # bytes read per block
+FLUSH_LINES = 1 << 12  # lines buffered by the writer
+WRITE_CHUNK_STEPS = 1 << 16  # time steps merged per block by write_traces
+TIMESCALE = "1 ns"
+
+Signal = namedtuple("Signal", "name code width")
+
+LOADED = LRUCache(maxsize=4)  # (source key, names) -> (traces, end time)
+
+
+class VCDError(ValueError):
+    """Malformed VCD file."""
+
+
+def identifier(k):
+    """k-th short identifier code (printable ASCII ``!``..``~``, base 94)."""
+    code = ""
+    while True:
+        code += chr(33 + k % 94)
+        k //= 94
+        if not k:
+            return code
+
+
+def _vcd_name(name):
+    return re.sub(r"[^\x21-\x7e]", "_", str(name)) or "_"
+
+
+class VCDWriter:
+    """Streaming VCD writer on a binary sink; declare signals, then report changes."""
+
+    def __init__(self, sink, timescale=TIMESCALE, scope="top"):
+        self.sink = sink
+        self.timescale = timescale
+        self.scope = _vcd_name(scope)
+        self.signals = {}  # name -> Signal
+        self._last = {}  # code -> last written value
+        self._time = None
+        self._lines = []
+        self._started = False
+
+    def add_signal(self, name, width=1):
+        if self._started:
+            raise ValueError("Signals must be declared before the first change")
+        if name in self.signals:
+            raise ValueError(f"Signal '{name}' declared twice")
+        self.signals[name] = Signal(_vcd_name(name), identifier(len(self.signals)), int(width))
+        return self.signals[name]
+
+    def _start(self):
+        self._started = True
+        lines = ["$version dld $end", f"$timescale {self.timescale} $end", f"$scope module {self.scope} $end"]
+        lines += [f"$var wire {s.width} {s.code} {s.name} $end" for s in self.signals.values()]
+        lines += ["$upscope $end", "$enddefinitions $end"]
+        self._lines.extend(lines)
+
+    def change(self, time, name, value):
+        """Record ``name = value`` at ``time`` (times must not go backwards); no-op if unchanged."""
+        if not self._started:
+            self._start()
+        signal = self.signals[name]
+        value = int(value)
+        if self._last.get(signal.code) == value:
+            return
+        if time != self._time:
+            if self._time is not None and time < self._time:
+                raise ValueError(f"Time went backwards: {time} after {self._time}")
+            self._lines.append(f"#{time}")
+            self._time = time
+        self._lines.append(f"{value}{signal.code}" if signal.width == 1 else f"b{value:b} {signal.code}")
+        self._last[signal.code] = value
+        if len(self._lines) >= FLUSH_LINES:
+            self.flush()
+
+    def change_block(self, times, signals, values):
+        """
+        Bulk ``change`` for parallel arrays sorted by time, holding only real
+        changes (as in run-length encoded traces); ``signals`` are indices in
+        declaration order.
+        """
+        if not self._started:
+            self._start()
+        if not len(times):
+            return
+        if self._time is not None and times[0] < self._time:
+            raise ValueError(f"Time went backwards: {times[0]} after {self._time}")
+        declared = list(self.signals.values())
+        scalar = [(f"0{s.code}", f"1{s.code}") if s.width == 1 else None for s in declared]
+        lines, current = self._lines, self._time
+        for t, k, v in zip(times.tolist(), signals.tolist(), values.tolist()):
+            if t != current:
+                lines.append(f"#{t}")
+                current = t
+            pair = scalar[k]
+            lines.append(pair[v] if pair is not None else f"b{v:b} {declared[k].code}")
+        self._time = current
+        for k, v in zip(signals.tolist(), values.tolist()):
+            self._last[declared[k].code] = v
+        self.flush()
+
+    def flush(self):
+        if self._lines:
+            self.sink.write(("\n".join(self._lines) + "\n").encode())
+            self._lines.clear()
+
+    def close(self, end_time=None):
+        """Write the end time (so the last values have a duration) and flush."""
+        if not self._started:
+            self._start()
+        if end_time is not None and (self._time is None or end_time > self._time):
+            self._lines.append(f"#{end_time}")
+            self._time = end_time
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_traces(sink, traces, timescale=TIMESCALE, chunk=WRITE_CHUNK_STEPS):
+    """Write ``{name: RLETrace}`` as VCD, merging the signals one time chunk at a time."""
+    writer = VCDWriter(sink, timescale)
+    names = list(traces)
+    for name in names:
+        values = traces[name].values
+        writer.add_signal(name, max(1, int(values.max()).bit_length()) if len(values) else 1)
+    length = max((t.length for t in traces.values()), default=0)
+    for start in range(0, length, chunk):
+        times, which, values = [], [], []
+        for k, name in enumerate(names):
+            trace = traces[name]
+            a, b = np.searchsorted(trace.starts, [start, start + chunk])
+            times.append(trace.starts[a:b])
+            which.append(np.full(b - a, k))
+            values.append(trace.values[a:b])
+        times, which, values = np.concatenate(times), np.concatenate(which), np.concatenate(values)
+        order = np.lexsort((which, times))
+        writer.change_block(times[order], which[order], values[order].astype(np.int64))
+    writer.close(length)
+
+
+def export_traces(traces, timescale=TIMESCALE):
+    """``traces`` as VCD bytes, ready for ``st.download_button``."""
+    sink = io.BytesIO()
+    write_traces(sink, traces, timescale)
+    return sink.getvalue()
+
+
+def export_simulation(netlist, vectors, period=None, watch=None, timescale=TIMESCALE):
+    """
+    Run ``event_sim.simulate`` with the changes of the ``watch`` nets streamed
+    straight into a VCD (nothing kept in the simulator's trace). Returns the
+    VCD as bytes.
+    """
+    sink = io.BytesIO()
+    writer = VCDWriter(sink, timescale)
+    names = netlist.names
+    watch = [str(n) for n in (names if watch is None else watch)]
+    for name in watch:
+        writer.add_signal(name)
+    index = netlist.index
+    initial = {ff.q: ff.init for ff in netlist.flip_flops}
+    for name in watch:
+        writer.change(0, name, initial.get(index[name], 0))
+    result = simulate(netlist, vectors, period=period, watch=watch, max_trace=0,
+                      on_change=lambda t, net, value: writer.change(t, names[net], value))
+    writer.close(len(vectors) * result.period)
+    return sink.getvalue()
+
+
+class VCDReader:
+    """Signal index of a VCD (parsed from its header) plus chunked reading of its changes."""
+
+    def __init__(self, source, chunk_bytes=CHUNK_BYTES):
+        self.source = source
+        self.chunk_bytes = chunk_bytes
+        self.signals = {}  # full name -> Signal
+        self.timescale = None
+        self._body = self._read_header()
+
+    def _read_header(self):
+        """Parse declarations up to ``$enddefinitions``; returns the byte offset of the body."""
+        self.source.seek(0)
+        text, end = b"", -1
+        while end < 0:
+            block = self.source.read(self.chunk_bytes)
+            if not block:
+                raise VCDError("No $enddefinitions ... $end: not a VCD file")
+            text += block
+            marker = text.find(b"$enddefinitions")
+            if marker >= 0:
+                end = text.find(b"$end", marker + len(b"$enddefinitions"))
+        end += len(b"$end")
+        tokens = text[:end].decode("ascii", "replace").split()
+        scopes = []
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token.startswith("$") and token != "$end":
+                try:
+                    j = tokens.index("$end", i + 1)
+                except ValueError:
+                    raise VCDError(f"{token} without $end") from None
+                args = tokens[i + 1:j]
+                if token == "$scope" and len(args) >= 2:
+                    scopes.append(args[1])
+                elif token == "$upscope" and scopes:
+                    scopes.pop()
+                elif token == "$timescale":
+                    self.timescale = " ".join(args)
+                elif token == "$var":
+                    if len(args) < 4:
+                        raise VCDError(f"Bad $var declaration: {' '.join(args)}")
+                    name = ".".join(scopes + ["".join(args[3:])])
+                    self.signals[name] = Signal(name, args[2], int(args[1]))
+                i = j + 1
+            else:
+                i += 1
+        return end
+
+    def _blocks(self):
+        """Body of the dump as blocks of whole lines."""
+        self.source.seek(self._body)
+        pending = b""
+        while True:
+            block = self.source.read(self.chunk_bytes)
+            if not block:
+                break
+            block = pending + block
+            cut = block.rfind(b"\n")
+            if cut < 0:
+                pending = block
+                continue
+            pending = block[cut + 1:]
+            yield block[:cut]
+        if pending:
+            yield pending
+
+    def read(self, names=None):
+        """
+        ``({name: RLETrace}, end_time)`` for ``names`` (default: every signal),
+        read in ``chunk_bytes`` blocks. Traces start at value 0 at time 0.
+        """
+        names = list(self.signals) if names is None else list(names)
+        unknown = [n for n in names if n not in self.signals]
+        if unknown:
+            raise VCDError(f"No signal(s) {', '.join(unknown)} in the dump")
+        wanted = {self.signals[name].code.encode(): [] for name in names}  # code -> [(times, values)] per block
+
+        time, in_comment = 0, False
+        for block in self._blocks():
+            found = None if in_comment else _parse_lines(block, wanted, time)
+            if found is None:
+                time, in_comment = _parse_tokens(block, wanted, time, in_comment)
+            else:
+                time = found
+
+        traces = {}
+        for name in names:
+            parts = wanted[self.signals[name].code.encode()]
+            times = np.concatenate([t for t, _ in parts]) if parts else np.zeros(0, dtype=np.int64)
+            values = np.concatenate([v for _, v in parts]) if parts else np.zeros(0, dtype=np.int64)
+            traces[name] = _trace(times, values, time + 1)
+        return traces, time
+
+
+_XZ = bytes.maketrans(b"xXzZ", b"0000")
+_SCALAR = np.zeros(256, dtype=bool)
+_SCALAR[list(b"01xXzZ")] = True
+_VECTOR = np.zeros(256, dtype=bool)
+_VECTOR[list(b"bBrR")] = True
+
+
+def _vector_value(kind, digits):
+    digits = digits.translate(_XZ)
+    return int(digits, 2) if kind in b"bB" else int(float(digits))
+
+
+def _parse_tokens(block, wanted, time, in_comment):
+    """Token-by-token parse of one block (any VCD layout); returns ``(time, in_comment)``."""
+    columns = {code: ([], []) for code in wanted}
+    tokens = block.split()
+    i, count = 0, len(tokens)
+    while i < count:
+        token = tokens[i]
+        i += 1
+        if in_comment:
+            in_comment = token != b"$end"
+            continue
+        c = token[0]
+        if c == 35:  # '#'
+            time = int(token[1:])
+        elif _SCALAR[c]:
+            column = columns.get(token[1:])
+            if column is not None:
+                column[0].append(time)
+                column[1].append(1 if c == 49 else 0)
+        elif _VECTOR[c]:
+            column = columns.get(tokens[i]) if i < count else None
+            i += 1
+            if column is not None:
+                column[0].append(time)
+                column[1].append(_vector_value(c, token[1:]))
+        elif token == b"$comment":
+            in_comment = True
+    for code, (times, values) in columns.items():
+        if times:
+            wanted[code].append((np.array(times, dtype=np.int64), np.array(values, dtype=np.int64)))
+    return time, in_comment
+
+
+def _parse_lines(block, wanted, time):
+    """
+    Vectorized parse of one block with one change (or ``#time``) per line.
+    Lines are located with one scan for newlines. Time stamps and the wanted
+    codes are then found by comparing bytes at fixed offsets from the line
+    starts, so Python only loops over the wanted codes (and over vector
+    changes). Returns the new time, or ``None`` when the block needs
+    ``_parse_tokens`` (comments, indentation, several changes per line...).
+    """
+    if not block:
+        return time
+    if b"$comment" in block:
+        return None
+    raw = np.frombuffer(block, dtype=np.uint8)
+    breaks = np.flatnonzero(raw == 10)
+    starts = np.concatenate([[0], breaks + 1])
+    ends = np.concatenate([breaks, [len(raw)]])
+    ends -= (ends > starts) & (raw[np.maximum(ends - 1, 0)] == 13)  # CRLF
+    lengths = ends - starts
+    nonempty = lengths > 0
+    starts, lengths = starts[nonempty], lengths[nonempty]
+    if not len(starts):
+        return time
+    first = raw[starts]
+    scalar, vector, stamp = _SCALAR[first], _VECTOR[first], first == 35
+    if not (scalar | vector | stamp | (first == 36)).all():
+        return None  # indented or unknown lines
+    spaces = np.flatnonzero(raw == 32)
+    if len(spaces) and not vector[np.searchsorted(starts, spaces, side="right") - 1].all():
+        return None  # several tokens on a line
+
+    # Time of every line: the latest #stamp at or above it (or the carried time)
+    stamp_rows = np.flatnonzero(stamp)
+    stamps = np.full(len(starts), time, dtype=np.int64)
+    if len(stamp_rows):
+        digits = lengths[stamp_rows] - 1
+        width = int(digits.max())
+        if width < 1 or width > 18:
+            return None
+        # Right-align the digits of every stamp, then weight the columns by powers of ten
+        columns = np.arange(width)
+        offsets = starts[stamp_rows, None] + 1 + digits[:, None] - width + columns
+        matrix = raw[np.maximum(offsets, 0)].astype(np.int64) - 48
+        matrix[columns < (width - digits)[:, None]] = 0
+        if ((matrix < 0) | (matrix > 9)).any():
+            return None
+        stamps[stamp_rows] = matrix @ (10 ** np.arange(width - 1, -1, -1, dtype=np.int64))
+    latest = np.maximum.accumulate(np.where(stamp, np.arange(len(starts)), -1))
+    line_time = np.where(latest >= 0, stamps[np.maximum(latest, 0)], time)
+
+    by_code = {}  # vector changes (rarer): split in Python, once per line
+    for row in np.flatnonzero(vector):
+        text = block[starts[row]:starts[row] + lengths[row]].split()
+        if len(text) == 2 and text[1] in wanted:
+            by_code.setdefault(text[1], []).append((row, _vector_value(text[0][:1], text[0][1:])))
+    for code, parts in wanted.items():
+        match = scalar & (lengths == len(code) + 1)
+        for k, byte in enumerate(code):
+            match[match] = raw[starts[match] + 1 + k] == byte
+        rows = np.flatnonzero(match)
+        values = (first[rows] == 49).astype(np.int64)
+        if code in by_code:
+            extra = np.array(by_code[code], dtype=np.int64)
+            rows, values = np.concatenate([rows, extra[:, 0]]), np.concatenate([values, extra[:, 1]])
+            order = np.argsort(rows, kind="stable")
+            rows, values = rows[order], values[order]
+        if len(rows):
+            parts.append((line_time[rows], values))
+    return int(line_time[-1])
+
+
+def _trace(times, values, length):
+    """RLETrace from change lists (later changes at the same time win, repeats dropped)."""
+    if len(times):
+        last = np.append(times[1:] != times[:-1], True)
+        times, values = times[last], values[last]
+    if not len(times) or times[0] > 0:
+        times, values = np.append(0, times), np.append(0, values)
+    keep = np.append(True, values[1:] != values[:-1])
+    return RLETrace(times[keep].astype(np.int64), values[keep], int(max(length, times[-1] + 1)))
+
+
+def load(source, key, names):
+    """``VCDReader(source).read(names)``, cached by ``key`` (e.g. the upload's id) and ``names``."""
+    cache_key = (key, tuple(names))
+    found = LOADED.get(cache_key)
+    if found is None:
+        found = VCDReader(source).read(names)
+        LOADED.put(cache_key, found)
+    return found
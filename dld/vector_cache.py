@@ -0,0 +1,125 @@
+"""
+Incremental truth-table evaluation with a per-subexpression vector cache.
+
+Students edit an expression a character at a time, and each rerun parses a
+brand-new AST. ``compile_expr`` is keyed by the whole expression text, so any
+edit misses its cache and every row is evaluated again from scratch.
+
+Here each AST node is hash-consed bottom-up to a small integer id through the
+key ``(op, child ids)``; wide AND/OR/XOR gates are split into a pairwise tree
+of 2-input nodes (in operand order, each pair sorted). The cache maps that key
+to ``(id, packed vector)``. An unchanged subexpression of the edited text
+produces the same key, so its vector is reused. Only the nodes on the path
+from the edit to the root are evaluated again, and each costs a single
+bitwise operation. Looking up a key is a dict probe on a short tuple of ints,
+so nested tuples are never hashed.
+
+Ids are never reused. If an entry is evicted, its parents (whose keys hold the
+old id) simply stop being reachable and age out. There is one LRU per
+variable list, sized so it holds about ``VECTOR_BUDGET_BITS`` bits of vectors.
+Past ``INCREMENTAL_MAX_VARS`` variables that is too few nodes to help, and
+evaluation falls back to the compiled one-pass ``truth_table.evaluate``.
+"""
+import itertools
+
+from dld.compiler import as_ast
+from dld.lru import LRUCache
+from dld.truth_table import evaluate, full_mask, variable_masks
+
+VECTOR_BUDGET_BITS = 1 << 28  # ~32 MB of vectors per variable list
+MIN_ENTRIES = 64
+# Above this a vector is too big to keep one per node: evaluate in one pass
+INCREMENTAL_MAX_VARS = 18
+
+_CACHES = LRUCache(maxsize=8)  # tuple(variables) -> SubexpressionCache
+_ids = itertools.count()
+
+
+class SubexpressionCache:
+    """Vectors of every subexpression evaluated over one variable list."""
+
+    def __init__(self, variables):
+        self.variables = [str(v) for v in variables]
+        n = len(self.variables)
+        self.ones = full_mask(n)
+        # Leaves are fixed for the variable list: plain dict, never evicted
+        self.leaves = {("var", name): (next(_ids), mask) for name, mask in zip(self.variables, variable_masks(n))}
+        self.leaves[("const", False)] = (next(_ids), 0)
+        self.leaves[("const", True)] = (next(_ids), self.ones)
+        self.entries = LRUCache(maxsize=max(MIN_ENTRIES, VECTOR_BUDGET_BITS >> n))
+
+    def evaluate(self, expr):
+        """Packed Output vector of ``expr`` (AST or SymPy); returns ``(vector, computed)``."""
+        entries, leaves, ones = self.entries, self.leaves, self.ones
+        seen = {}  # id(node) -> (node id, vector), for this walk only
+        computed = 0
+
+        def combine(op, a, b):
+            nonlocal computed
+            key = (op, a[0], b[0]) if a[0] < b[0] else (op, b[0], a[0])
+            found = entries.get(key)
+            if found is None:
+                computed += 1
+                if op == "and":
+                    vector = a[1] & b[1]
+                elif op == "or":
+                    vector = a[1] | b[1]
+                else:
+                    vector = a[1] ^ b[1]
+                found = (next(_ids), vector)
+                entries.put(key, found)
+            return found
+
+        def negate(a):
+            nonlocal computed
+            key = ("not", a[0])
+            found = entries.get(key)
+            if found is None:
+                computed += 1
+                found = (next(_ids), ones ^ a[1])
+                entries.put(key, found)
+            return found
+
+        def walk(node):
+            op = node[0]
+            if op == "var" or op == "const":
+                found = leaves.get((op, bool(node[1]) if op == "const" else node[1]))
+                if found is None:
+                    raise ValueError(f"Variable '{node[1]}' is not in the variable list")
+                return found
+            found = seen.get(id(node))
+            if found is not None:
+                return found
+            children = [walk(arg) for arg in node[1:]]
+            if op == "not":
+                found = negate(children[0])
+            else:
+                # Pairwise tree in operand order: editing (or appending) one
+                # operand of a wide gate only redoes the log2(k) nodes above it
+                while len(children) > 1:
+                    paired = [combine(op, children[i], children[i + 1]) for i in range(0, len(children) - 1, 2)]
+                    if len(children) % 2:
+                        paired.append(children[-1])
+                    children = paired
+                found = children[0]
+            seen[id(node)] = found
+            return found
+
+        return walk(as_ast(expr))[1], computed
+
+
+def cache_for(variables):
+    """Shared ``SubexpressionCache`` for this variable list."""
+    key = tuple(str(v) for v in variables)
+    cache = _CACHES.get(key)
+    if cache is None:
+        cache = SubexpressionCache(key)
+        _CACHES.put(key, cache)
+    return cache
+
+
+def evaluate_incremental(expr, variables):
+    """Same result as ``truth_table.evaluate``, reusing cached subexpression vectors."""
+    if len(variables) > INCREMENTAL_MAX_VARS:
+        return evaluate(expr, variables)
+    return cache_for(variables).evaluate(expr)[0]
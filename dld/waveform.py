@@ -0,0 +1,118 @@
+"""
+Run-length encoded signal traces and min/max downsampling for timing diagrams.
+
+A trace of a digital signal is mostly long runs of one value, so it is stored
+as ``RLETrace(starts, values, length)``: run ``k`` holds ``values[k]`` from
+step ``starts[k]`` up to the next start. A clock still has one run per
+half-cycle, but a counter's high bits only have a few runs.
+
+Plotting a million samples would send a million points to the browser for
+an ~800 pixel-wide chart. ``envelope`` cuts the window into ``width``
+buckets instead. For each bucket it finds the first and last run with two
+``searchsorted`` calls, and gets the min and max over the runs in between
+with one ``reduceat``. The cost depends on the number of runs and buckets,
+not on the samples. ``waveform_frame`` turns the envelopes into a few points
+per bucket: a square edge where the signal is steady, and a full-height bar
+where it toggles within one pixel. That is what an oscilloscope shows.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from dld.lru import LRUCache
+from dld.sequential import ripple_counter
+
+WIDTH = 800  # buckets (≈ pixels) per chart
+
+COUNTER_TRACES = LRUCache(maxsize=4)
+
+RLETrace = namedtuple("RLETrace", "starts values length")
+Envelope = namedtuple("Envelope", "edges first lo hi last")
+
+
+def encode(samples):
+    """``RLETrace`` of a 1-D array of samples."""
+    samples = np.asarray(samples)
+    if not len(samples):
+        return RLETrace(np.zeros(0, dtype=np.int64), samples[:0], 0)
+    starts = np.concatenate([[0], np.flatnonzero(samples[1:] != samples[:-1]) + 1]).astype(np.int64)
+    return RLETrace(starts, samples[starts], len(samples))
+
+
+def from_events(events, length, initial=0):
+    """``RLETrace`` from ``(time, value)`` changes in time order (e.g. ``event_sim`` traces)."""
+    starts, values = [0], [initial]
+    for t, value in events:
+        if t >= length:
+            break
+        if t == starts[-1]:
+            values[-1] = value  # the last change at a time wins
+        elif value != values[-1]:
+            starts.append(t)
+            values.append(value)
+        if len(values) > 1 and values[-1] == values[-2]:
+            starts.pop()
+            values.pop()
+    return RLETrace(np.array(starts, dtype=np.int64), np.array(values), length)
+
+
+def decode(trace, start=0, stop=None):
+    """Samples ``start:stop`` of ``trace`` as a dense array."""
+    stop = trace.length if stop is None else stop
+    ends = np.append(trace.starts[1:], trace.length)
+    dense = np.repeat(trace.values, ends - trace.starts)
+    return dense[start:stop]
+
+
+def envelope(trace, start=0, stop=None, width=WIDTH):
+    """
+    Min/max of ``trace`` over ``width`` equal buckets of ``start:stop`` (one
+    per sample when the window is shorter). Returns ``Envelope(edges, first,
+    lo, hi, last)``; ``edges`` has one more entry than the buckets.
+    """
+    stop = trace.length if stop is None else min(stop, trace.length)
+    buckets = max(1, min(width, stop - start))
+    edges = start + (np.arange(buckets + 1) * (stop - start)) // buckets
+    first_run = np.searchsorted(trace.starts, edges[:-1], side="right") - 1
+    last_run = np.searchsorted(trace.starts, edges[1:] - 1, side="right") - 1
+    values = np.append(trace.values, trace.values[-1])  # lets last_run + 1 index past the end
+    bounds = np.empty(2 * buckets, dtype=np.int64)
+    bounds[0::2], bounds[1::2] = first_run, last_run + 1
+    lo = np.minimum.reduceat(values, bounds)[0::2]
+    hi = np.maximum.reduceat(values, bounds)[0::2]
+    return Envelope(edges, trace.values[first_run], lo, hi, trace.values[last_run])
+
+
+def waveform_frame(traces, start=0, stop=None, width=WIDTH, unit=1.0):
+    """
+    Chart data for ``{name: RLETrace}``: one column per signal, each on its
+    own lane (top to bottom in order), indexed by time (steps × ``unit``).
+    Three points per bucket: the first value, the other extreme if the signal
+    changes inside the bucket, and the last value just before the next bucket.
+    """
+    if not traces:
+        return pd.DataFrame()
+    stop = min(t.length for t in traces.values()) if stop is None else stop
+    top = max(1, max((int(t.values.max()) for t in traces.values() if len(t.values)), default=1))
+    columns, index = {}, None
+    for k, (name, trace) in enumerate(traces.items()):
+        env = envelope(trace, start, stop, width)
+        other = np.where(env.first == env.lo, env.hi, env.lo)
+        y = np.column_stack([env.first, other, env.last]).ravel().astype(float)
+        columns[name] = y / top * 0.8 + 1.2 * (len(traces) - 1 - k)
+        if index is None:
+            left, right = env.edges[:-1].astype(float), env.edges[1:].astype(float)
+            eps = (right - left) * 1e-3
+            index = np.column_stack([left, left + eps, right - eps]).ravel() * unit
+    return pd.DataFrame(columns, index=pd.Index(index, name="time"))
+
+
+def counter_traces(bits, cycles):
+    """Cached ``{name: RLETrace}`` of ``sequential.ripple_counter(bits, cycles)``."""
+    key = (bits, cycles)
+    traces = COUNTER_TRACES.get(key)
+    if traces is None:
+        traces = {name: encode(values) for name, values in ripple_counter(bits, cycles).items()}
+        COUNTER_TRACES.put(key, traces)
+    return traces
@@ -0,0 +1,66 @@
+"""
+Streamlit widgets shared by the pages.
+
+This is the only ``dld`` module that imports Streamlit; everything else here
+is plain Python so it can run in the job pool and the benchmarks. Pages 1 and
+6 both draw gate diagrams and browse packed truth tables, so those widgets
+live here instead of being copied onto each page.
+"""
+import streamlit as st
+
+from dld.jobs import JobTimeout, truth_table_in_pool
+from dld.render import render_diagram
+from dld.truth_table import MAX_EXPORT_ROWS, MAX_TABLE_VARS, have_parquet
+
+PAGE_ROWS = 1000  # truth-table rows shown at a time
+
+
+def show_diagram(graph):
+    """Draw a GateDAG: cached server-side SVG, or DOT in the browser without Graphviz."""
+    diagram = render_diagram(graph)
+    if diagram.summarized:
+        st.info("🗜️ Too many gates to draw one by one — showing one box per logic level and gate type.")
+    if diagram.svg:
+        st.markdown(diagram.svg, unsafe_allow_html=True)
+    else:
+        st.graphviz_chart(diagram.dot)
+
+
+def show_truth_table(table, key):
+    """One page of a PackedTable, plus CSV / Parquet downloads (generated on click) for tables that fit in memory."""
+    pages = -(-table.rows // PAGE_ROWS)
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages}, {PAGE_ROWS} rows each)", min_value=1, max_value=pages,
+                               value=1, key=f"{key}_page")
+    start = (page - 1) * PAGE_ROWS
+    st.dataframe(table.chunk(start, start + PAGE_ROWS))
+    if table.rows > MAX_EXPORT_ROWS:
+        st.caption(f"Downloads are offered up to {MAX_EXPORT_ROWS:,} rows; browse the pages above instead.")
+        return
+    formats = ["csv"] + (["parquet"] if have_parquet() else [])
+    for column, fmt in zip(st.columns(len(formats)), formats):
+        column.download_button(f"⬇️ Download {fmt.upper()} ({table.rows} rows)",
+                               data=lambda fmt=fmt: table.export(fmt),
+                               file_name=f"truth_table.{fmt}",
+                               mime="text/csv" if fmt == "csv" else "application/octet-stream",
+                               key=f"{key}_{fmt}")
+
+
+def truth_table_section(ast, variables, key, on_wait=None):
+    """
+    "Truth Table" section: the table of ``ast`` computed in the job pool, or a
+    note when it has too many variables or runs out of time. Either way the
+    page goes on with its other sections.
+    """
+    st.subheader("Truth Table")
+    if len(variables) > MAX_TABLE_VARS:
+        st.info(f"ℹ️ The truth table is built for up to {MAX_TABLE_VARS} variables "
+                f"({len(variables)} given, {2 ** len(variables):,} rows).")
+        return
+    try:
+        table = truth_table_in_pool(st.session_state, key, ast, variables, on_wait=on_wait)
+    except JobTimeout:
+        st.warning("⏱️ The truth table took too long to compute and was skipped.")
+        return
+    show_truth_table(table, key)
@@ -1,13 +1,14 @@
 import streamlit as st
 import pandas as pd
-from sympy import symbols, simplify_logic
-from sympy.logic.boolalg import And, Or, Not
-from sympy.parsing.sympy_parser import (
-    parse_expr, standard_transformations, implicit_multiplication_application
-)
-from itertools import product
-from graphviz import Digraph
-import re
+from sympy import symbols
+
+from dld.factor import factor_ast
+from dld.gate_dag import build_dag
+from dld.techmap import tech_map
+from dld.parser import parse, to_infix, to_sympy, ParseError
+from dld.jobs import simplify_in_pool, JobTimeout, JobCancelled
+from dld.widgets import show_diagram, truth_table_section
+
 st.markdown(
     """
     <style>
@@ -48,91 +49,71 @@ st.markdown("""
 expr_input = st.text_input("Expression (infix, e.g., A & (B | C))")
 vars_input = st.text_input("Variables (comma-separated, e.g., A,B,C)")
 
-def auto_fix_missing_and(expression):
-    """
-    Inserts '&' if a variable is directly followed by '('.
-    E.g., turns 'A&B(~B&C)' → 'A & B & (~B & C)'
-    """
-    expression = expression.replace(" ", "")
-    # Add '&' if a letter/number/underscore is immediately followed by '('
-    fixed = re.sub(r'([A-Za-z0-9_])\(', r'\1 & (', expression)
-    return fixed
-
 if expr_input and vars_input:
-    if expr_input.count("(") != expr_input.count(")"):
-        st.error("❌ Error: Unmatched parentheses! Please check your expression.")
+    st.session_state["last_expression"] = (expr_input, vars_input)  # offered on the simulator page
+    vars_list = [v.strip() for v in vars_input.split(",")]
+    try:
+        # Missing '&' (e.g. 'B(' → 'B & (') is inserted by the parser itself
+        parsed = parse(expr_input, vars_list)
+    except ParseError as e:
+        st.error(f"❌ Error: {e}")
+        st.code(e.pointer(), language=None)
     else:
         try:
-            vars_list = [v.strip() for v in vars_input.split(",")]
             vars_sym = symbols(vars_list)
 
-            local_dict = {name: sym for name, sym in zip(vars_list, vars_sym)}
+            if parsed.implicit_and:
+                st.info(f"🔧 Auto-fixed expression: `{to_infix(parsed.ast)}`")
 
-            transformations = standard_transformations + (implicit_multiplication_application,)
+            expr = to_sympy(parsed.ast, dict(zip(vars_list, vars_sym)))
+            # Heavy work runs in the shared process pool (cancelled if the input changes)
+            status = st.empty()
 
-            # Auto-fix missing &
-            expr_input_fixed = auto_fix_missing_and(expr_input)
-            if expr_input != expr_input_fixed:
-                st.info(f"🔧 Auto-fixed expression: `{expr_input_fixed}`")
+            def still_computing(seconds):
+                status.info(f"⏳ Still computing… ({seconds:.0f}s)")
 
-            expr = parse_expr(expr_input_fixed, local_dict, transformations=transformations)
-            simplified = simplify_logic(expr)
+            simplified = simplify_in_pool(st.session_state, "p1_simplify", parsed.ast, vars_list,
+                                          on_wait=still_computing)
 
             st.write(f"**Original:** `{expr}`")
             st.write(f"**Simplified:** `{simplified}`")
 
-            # Truth Table
-            rows = []
-            for values in product([0, 1], repeat=len(vars_list)):
-                assignment = dict(zip(vars_sym, values))
-                result = int(bool(expr.subs(assignment)))
-                row = list(values) + [result]
-                rows.append(row)
-
-            df = pd.DataFrame(rows, columns=[str(v) for v in vars_sym] + ["Output"])
-            st.subheader("Truth Table")
-            st.dataframe(df)
+            # Truth Table (all rows evaluated at once as bit vectors)
+            truth_table_section(parsed.ast, vars_list, "p1_table", on_wait=still_computing)
+            status.empty()
 
             st.subheader("Logic Gate Diagram (Simplified Expression)")
 
-            dot = Digraph(comment='Logic Circuit')
-
-            counter = [0]
-
-            def add_gate(node):
-                node_str = str(node)
-                if isinstance(node, And):
-                    gate_id = f"And_{counter[0]}"
-                    dot.node(gate_id, "AND")
-                    counter[0] += 1
-                    for arg in node.args:
-                        child_id = add_gate(arg)
-                        dot.edge(child_id, gate_id)
-                    return gate_id
-                elif isinstance(node, Or):
-                    gate_id = f"Or_{counter[0]}"
-                    dot.node(gate_id, "OR")
-                    counter[0] += 1
-                    for arg in node.args:
-                        child_id = add_gate(arg)
-                        dot.edge(child_id, gate_id)
-                    return gate_id
-                elif isinstance(node, Not):
-                    gate_id = f"Not_{counter[0]}"
-                    dot.node(gate_id, "NOT")
-                    counter[0] += 1
-                    child_id = add_gate(node.args[0])
-                    dot.edge(child_id, gate_id)
-                    return gate_id
-                else:
-                    var_id = f"{node_str}_{counter[0]}"
-                    dot.node(var_id, node_str)
-                    counter[0] += 1
-                    return var_id
-
-            add_gate(simplified)
-
-            st.graphviz_chart(dot)
-
+            # Shared subexpressions and inputs are drawn once (structural hashing)
+            two_level = build_dag(simplified)
+            circuit = simplified
+            if st.checkbox("Factor into multi-level logic (kernels & common cubes)", value=True, key="p1_factor"):
+                circuit = factor_ast(simplified)
+                dag = build_dag(circuit)
+                st.table(pd.DataFrame(
+                    [[two_level.gate_count, two_level.edge_count, two_level.depth],
+                     [dag.gate_count, dag.edge_count, dag.depth]],
+                    index=["Two-level (simplified)", "Factored"], columns=["Gates", "Wires", "Depth"],
+                ))
+            else:
+                dag = two_level
+            st.caption(f"{len(dag.nodes)} nodes ({dag.gate_count} gates) · {dag.edge_count} edges")
+            show_diagram(dag)
+
+            st.subheader("NAND / NOR Implementation")
+            col_lib, col_goal = st.columns(2)
+            library = col_lib.radio("Gate library", ["NAND only", "NOR only"], horizontal=True, key="p1_library")
+            goal = col_goal.radio("Optimize for", ["Fewest gates", "Smallest depth"], horizontal=True, key="p1_goal")
+            mapping = tech_map(circuit, "nand" if library == "NAND only" else "nor",
+                               "gates" if goal == "Fewest gates" else "depth")
+            cells = ", ".join(f"{count} × {name}" for name, count in mapping.stats["cells"].items())
+            st.caption(f"{mapping.gates} gates ({cells}) · depth {mapping.depth} · "
+                       "an inverter is a gate with both inputs tied together")
+            show_diagram(mapping.dag)
+
+        except JobTimeout:
+            st.error("⏱️ This expression is too large to process here. Try fewer variables.")
+        except JobCancelled:
+            st.warning("Computation cancelled because the input changed.")
         except Exception as e:
             st.error(f"❌ Error: {e}")
@@ -1,7 +1,19 @@
 import streamlit as st
-from sympy import symbols, SOPform, POSform, simplify_logic
-from sympy.parsing.sympy_parser import parse_expr
+from sympy import symbols, SOPform, POSform
 import pandas as pd
+import numpy as np
+
+from dld.parser import parse, to_infix, to_sympy, variables_of, ParseError
+from dld import espresso, qm
+from dld.function_input import (
+    MAX_VARS, default_names, function_spec, parse_term_lists, parse_hex, parse_csv, parse_pla,
+    parse_multi_output, format_terms
+)
+from dld.jobs import JobCancelled, JobTimeout, minimize_in_pool, multi_output_in_pool
+from dld.kmap import MAX_KMAP_VARS, kmap_frame, kmap_svg
+from dld.qm import implicant_ast, sop_ast, pos_ast
+from dld.simplify_cache import cached_simplify_logic
+from dld.truth_table import evaluate, unpack_bits
 
 # 🎨 Sidebar style
 st.markdown(
@@ -21,59 +33,133 @@ st.markdown(
 
 st.title("🟩 K-Map Simplifier")
 
-st.write("**2-variable or 3-variable K-Map Simplifier with Don't Care & SOP, POS, Quine–McCluskey**")
-
-num_vars = st.selectbox("Select Number of Variables", [2, 3])
-
-if num_vars == 2:
-    st.write("**2-Variable K-Map: Enter outputs for minterms 0–3**")
-    labels = ["00", "01", "10", "11"]
-    variables = ['A', 'B']
-elif num_vars == 3:
-    st.write("**3-Variable K-Map: Enter outputs for minterms 0–7**")
-    labels = ["000", "001", "010", "011", "100", "101", "110", "111"]
-    variables = ['A', 'B', 'C']
-
-outputs = []
-dont_cares = []
-for label in labels:
-    val = st.selectbox(f"f({label})", ["0", "1", "X (Don't Care)"], key=f"kmap_{label}")
-    if val == "1":
-        outputs.append(1)
-        dont_cares.append(0)
-    elif val == "X (Don't Care)":
-        outputs.append(0)
-        dont_cares.append(1)
+st.write("**K-Map Simplifier with Don't Care & SOP, POS, Quine–McCluskey — enter cells, minterm lists, hex or CSV/PLA files**")
+
+# Native minimizers: name → (function, largest variable count it is offered)
+MINIMIZERS = {
+    "Bitmask Quine–McCluskey": (qm.minimize, 16),
+    "Espresso heuristic (large functions)": (espresso.minimize, 20),
+}
+minimizer = st.radio("Minimizer", list(MINIMIZERS) + ["SymPy SOPform / POSform"], horizontal=True)
+input_mode = st.radio(
+    "Input Mode", ["Cell by cell", "Minterm list", "Hex truth table", "Upload CSV / PLA"], horizontal=True
+)
+
+
+def show_minimizer_stats(title, result):
+    """One-line summary of how much work the minimizer did."""
+    s = result.stats
+    if "primes" in s:
+        work = (f"{s['primes']} prime implicants, {s['essential']} essential · "
+                f"primes {s['prime_time'] * 1000:.1f} ms, cover {s['cover_time'] * 1000:.1f} ms")
+        if not result.exact:
+            work += " — search limit reached, cover may be near-minimal"
     else:
-        outputs.append(0)
-        dont_cares.append(0)
-
-if st.button("Simplify & Convert"):
-    minterms = [i for i, v in enumerate(outputs) if v == 1]
-    dc_terms = [i for i, v in enumerate(dont_cares) if v == 1]
-    maxterms = [i for i, v in enumerate(outputs) if v == 0 and not dont_cares[i]]
-
-    # ✅ Check overlap
-    overlap = set(minterms).intersection(dc_terms)
-    if overlap:
-        st.error(f"❌ Error: These terms are in both minterms and don't cares: {list(overlap)}. Please fix your input.")
+        work = f"{s['iterations']} expand/irredundant/reduce passes · {s['time'] * 1000:.1f} ms"
+    st.caption(f"⏱️ {title}: {s['terms']} terms / {s['literals']} literals · {work}")
+
+
+spec = None
+if input_mode == "Cell by cell":
+    num_vars = st.selectbox("Select Number of Variables", [2, 3])
+    if num_vars == 2:
+        st.write("**2-Variable K-Map: Enter outputs for minterms 0–3**")
+        labels = ["00", "01", "10", "11"]
+    elif num_vars == 3:
+        st.write("**3-Variable K-Map: Enter outputs for minterms 0–7**")
+        labels = ["000", "001", "010", "011", "100", "101", "110", "111"]
+
+    cell_minterms, cell_dont_cares = set(), set()
+    for i, label in enumerate(labels):
+        val = st.selectbox(f"f({label})", ["0", "1", "X (Don't Care)"], key=f"kmap_{label}")
+        if val == "1":
+            cell_minterms.add(i)
+        elif val == "X (Don't Care)":
+            cell_dont_cares.add(i)
+    spec = function_spec(num_vars, cell_minterms, cell_dont_cares)
+else:
+    # Bulk input: the whole function is parsed in one pass, no widget per cell
+    try:
+        if input_mode == "Minterm list":
+            num_vars = st.number_input("Number of Variables", min_value=1, max_value=MAX_VARS, value=4)
+            terms_input = st.text_input("Minterms / don't cares (e.g. m(1,3,5) + d(7), ranges like m(0-3) work too)",
+                                        "m(1,3,5) + d(7)")
+            spec = parse_term_lists(terms_input, int(num_vars))
+        elif input_mode == "Hex truth table":
+            hex_input = st.text_input("Hex truth table (bit i = output for minterm i, e.g. 0xE8 = 3-input majority)",
+                                      "0xE8")
+            spec = parse_hex(hex_input)
+        else:
+            uploaded = st.file_uploader("CSV truth table or PLA file", type=["csv", "pla", "txt"])
+            if uploaded:
+                content = uploaded.getvalue().decode("utf-8", errors="replace")
+                if uploaded.name.lower().endswith(".csv"):
+                    spec = parse_csv(content)
+                else:
+                    outputs_pla = dict(parse_pla(content))
+                    chosen_output = st.selectbox("Output to simplify", list(outputs_pla))
+                    spec = outputs_pla[chosen_output]
+    except ValueError as e:
+        st.error(f"❌ Error: {e}")
+
+    if spec is not None:
+        st.caption(f"{spec.num_vars} variables ({', '.join(spec.names)}) · "
+                   f"{len(spec.minterms)} minterms · {len(spec.dont_cares)} don't cares")
+
+if spec is not None and st.button("Simplify & Convert"):
+    num_vars, minterms, dc_terms, variables = spec
+    maxterms = sorted(set(range(1 << num_vars)) - set(minterms) - set(dc_terms))
+
+    if minimizer not in MINIMIZERS and num_vars > 8:
+        st.warning("SymPy's SOPform/POSform is too slow past 8 variables — pick Quine–McCluskey or Espresso.")
+    elif minimizer in MINIMIZERS and num_vars > MINIMIZERS[minimizer][1]:
+        st.warning(f"{minimizer} is limited to {MINIMIZERS[minimizer][1]} variables — pick Espresso for "
+                   "larger functions.")
     else:
-        st.write(f"**Minterms:** {minterms}")
-        st.write(f"**Maxterms:** {maxterms}")
-        st.write(f"**Don't Cares:** {dc_terms}")
+        st.write(f"**Minterms:** {format_terms(minterms)}")
+        st.write(f"**Maxterms:** {format_terms(maxterms)}")
+        st.write(f"**Don't Cares:** {format_terms(dc_terms)}")
 
         vars_sym = symbols(variables)
 
-        if minterms:
-            sop = SOPform(vars_sym, minterms, dc_terms)
-            st.write(f"**SOP (Sum of Products):** `{sop}`")
+        if minimizer in MINIMIZERS:
+            minimize = MINIMIZERS[minimizer][0]
+            status = st.empty()
+            wait = lambda seconds: status.caption(f"⏳ Minimizing… {seconds:.0f} s")
+            try:
+                sop_result = pos_result = None
+                if minterms:
+                    sop_result = minimize_in_pool(st.session_state, "p2_sop", minimize, num_vars, minterms, dc_terms,
+                                                  on_wait=wait)
+                if maxterms:
+                    # POS = complement of the minimal SOP of the maxterms
+                    pos_result = minimize_in_pool(st.session_state, "p2_pos", minimize, num_vars, maxterms, dc_terms,
+                                                  on_wait=wait)
+            except JobTimeout:
+                st.error("⏱️ This function is too large to minimize here. Try fewer variables.")
+                st.stop()
+            except JobCancelled:
+                st.warning("Minimization cancelled because the input changed.")
+                st.stop()
+            status.empty()
+            if sop_result is not None:
+                st.write(f"**SOP (Sum of Products):** `{to_infix(sop_ast(sop_result.implicants, variables))}`")
+                show_minimizer_stats("SOP", sop_result)
+
+            if pos_result is not None:
+                st.write(f"**POS (Product of Sums):** `{to_infix(pos_ast(pos_result.implicants, variables))}`")
+                show_minimizer_stats("POS", pos_result)
+        else:
+            if minterms:
+                sop = SOPform(vars_sym, minterms, dc_terms)
+                st.write(f"**SOP (Sum of Products):** `{sop}`")
 
-            qm = simplify_logic(sop, form='dnf')
-            st.write(f"**Quine–McCluskey Minimized SOP:** `{qm}`")
+                qm_sop = cached_simplify_logic(sop, form='dnf')
+                st.write(f"**Quine–McCluskey Minimized SOP:** `{qm_sop}`")
 
-        if maxterms:
-            pos = POSform(vars_sym, maxterms, dc_terms)
-            st.write(f"**POS (Product of Sums):** `{pos}`")
+            if maxterms:
+                pos = POSform(vars_sym, maxterms, dc_terms)
+                st.write(f"**POS (Product of Sums):** `{pos}`")
 
         if not minterms and not dc_terms:
             st.info("Output is always 0.")
@@ -82,21 +168,20 @@ if st.button("Simplify & Convert"):
 
         # ✅ K-Map visualization
         st.subheader("🗺️ K-Map Table")
-        if num_vars == 2:
-            kmap_grid = pd.DataFrame(
-                [[outputs[0], outputs[1]],
-                 [outputs[2], outputs[3]]],
-                index=["A=0", "A=1"],
-                columns=["B=0", "B=1"]
-            )
+        if num_vars <= MAX_KMAP_VARS:
+            if not minterms:
+                groups = []
+            elif minimizer in MINIMIZERS:
+                groups = sop_result.implicants
+            else:
+                groups = qm.minimize(num_vars, minterms, dc_terms).implicants
+            st.markdown(kmap_svg(num_vars, minterms, dc_terms, variables, groups), unsafe_allow_html=True)
+            st.caption("Rows and columns follow Gray code; every coloured outline is one product term "
+                       "of the SOP cover. Past 4 variables, cells mirrored across the thick line are adjacent.")
+            with st.expander("K-Map as a table"):
+                st.table(kmap_frame(num_vars, minterms, dc_terms, variables))
         else:
-            kmap_grid = pd.DataFrame(
-                [[outputs[0], outputs[1], outputs[3], outputs[2]],
-                 [outputs[4], outputs[5], outputs[7], outputs[6]]],
-                index=["A=0", "A=1"],
-                columns=["BC=00", "BC=01", "BC=11", "BC=10"]
-            )
-        st.table(kmap_grid)
+            st.info(f"The K-Map is drawn for up to {MAX_KMAP_VARS} variables.")
 
 st.divider()
 
@@ -106,15 +191,99 @@ expr_input = st.text_input("Enter Boolean Expression (Example: A & B | ~C )")
 
 if expr_input:
     try:
-        vars_sym = symbols(variables)
-        expr = parse_expr(expr_input, evaluate=False)
-        minterms_expr = simplify_logic(expr, form='dnf')
-        maxterms_expr = simplify_logic(expr, form='cnf')
-        qm_expr = simplify_logic(expr)
+        ast = parse(expr_input).ast
+        expr_vars = sorted(variables_of(ast))
+
+        if minimizer in MINIMIZERS and len(expr_vars) <= MINIMIZERS[minimizer][1]:
+            minimize = MINIMIZERS[minimizer][0]
+            output = unpack_bits(evaluate(ast, expr_vars), len(expr_vars))
+            expr_minterms = np.flatnonzero(output).tolist()
+            expr_maxterms = np.flatnonzero(output == 0).tolist()
+            status = st.empty()
+            wait = lambda seconds: status.caption(f"⏳ Minimizing… {seconds:.0f} s")
+            sop_result = minimize_in_pool(st.session_state, "p2_expr_sop", minimize, len(expr_vars), expr_minterms,
+                                          on_wait=wait)
+            pos_result = minimize_in_pool(st.session_state, "p2_expr_pos", minimize, len(expr_vars), expr_maxterms,
+                                          on_wait=wait)
+            status.empty()
+
+            st.write(f"**Minterms:** Σm{tuple(expr_minterms)}" if len(expr_minterms) <= 64
+                     else f"**Minterms:** {len(expr_minterms)} of {len(output)}")
+            st.write(f"**Simplified SOP (DNF):** `{to_infix(sop_ast(sop_result.implicants, expr_vars))}`")
+            st.write(f"**Simplified POS (CNF):** `{to_infix(pos_ast(pos_result.implicants, expr_vars))}`")
+            show_minimizer_stats("SOP", sop_result)
+            show_minimizer_stats("POS", pos_result)
+        else:
+            expr = to_sympy(ast)
+            minterms_expr = cached_simplify_logic(expr, form='dnf')
+            maxterms_expr = cached_simplify_logic(expr, form='cnf')
+            qm_expr = cached_simplify_logic(expr)
 
-        st.write(f"**Simplified SOP (DNF):** `{minterms_expr}`")
-        st.write(f"**Simplified POS (CNF):** `{maxterms_expr}`")
-        st.write(f"**Quine–McCluskey Minimized:** `{qm_expr}`")
+            st.write(f"**Simplified SOP (DNF):** `{minterms_expr}`")
+            st.write(f"**Simplified POS (CNF):** `{maxterms_expr}`")
+            st.write(f"**Quine–McCluskey Minimized:** `{qm_expr}`")
 
+    except ParseError as e:
+        st.error(f"❌ Error parsing expression: {e}")
+        st.code(e.pointer(), language=None)
+    except JobTimeout:
+        st.error("⏱️ This expression is too large to minimize here. Try fewer variables.")
+    except JobCancelled:
+        st.warning("Minimization cancelled because the input changed.")
     except Exception as e:
         st.error(f"❌ Error parsing expression: {e}")
+
+st.divider()
+
+st.subheader("🔀 Multi-Output Minimization (shared product terms)")
+st.write("Enter several functions of the same inputs, one per line. Product terms are shared "
+         "between outputs, like in a PLA — try the BCD to 7-segment decoder below.")
+
+SEVEN_SEGMENT = "\n".join(f"{seg} = m({terms}) + d(10-15)" for seg, terms in [
+    ("a", "0,2,3,5,6,7,8,9"), ("b", "0,1,2,3,4,7,8,9"), ("c", "0,1,3,4,5,6,7,8,9"),
+    ("d", "0,2,3,5,6,8,9"), ("e", "0,2,6,8"), ("f", "0,4,5,6,8,9"), ("g", "2,3,4,5,6,8,9"),
+])
+mo_vars = int(st.number_input("Number of Input Variables", min_value=1, max_value=12, value=4, key="mo_vars"))
+mo_input = st.text_area("Outputs (name = m(...) + d(...))", SEVEN_SEGMENT, height=200)
+
+if st.button("Minimize Outputs Together"):
+    try:
+        functions = parse_multi_output(mo_input, mo_vars)
+    except ValueError as e:
+        st.error(f"❌ Error: {e}")
+    else:
+        mo_names = default_names(mo_vars)
+        pairs = [(spec.minterms, spec.dont_cares) for _, spec in functions]
+        status = st.empty()
+        try:
+            shared, separate = multi_output_in_pool(
+                st.session_state, "p2_multi", mo_vars, pairs,
+                on_wait=lambda seconds: status.caption(f"⏳ Minimizing… {seconds:.0f} s"))
+        except JobTimeout:
+            st.error("⏱️ These outputs are too large to minimize here. Try fewer variables.")
+            st.stop()
+        except JobCancelled:
+            st.warning("Minimization cancelled because the input changed.")
+            st.stop()
+        status.empty()
+
+        for (name, _), used in zip(functions, shared.outputs):
+            expr = to_infix(sop_ast([shared.terms[i] for i in used], mo_names))
+            st.write(f"**{name}** = `{expr}`")
+
+        st.dataframe(pd.DataFrame({
+            "Product term": [to_infix(implicant_ast(t, mo_names)) for t in shared.terms],
+            "Used by": [", ".join(name for (name, _), used in zip(functions, shared.outputs) if i in used)
+                        for i in range(len(shared.terms))],
+        }))
+
+        s = shared.stats
+        st.table(pd.DataFrame(
+            [[s["products"], s["literals"], s["connections"]],
+             [separate.products, separate.literals, separate.connections]],
+            index=["Shared (multi-output)", "Each output on its own"],
+            columns=["AND plane: products", "AND plane: literals", "OR plane: connections"],
+        ))
+        note = "" if shared.exact else " — search limit reached, cover may be near-minimal"
+        st.caption(f"⏱️ {s['primes']} multi-output primes, {s['essential']} essential · "
+                   f"{s['time'] * 1000:.1f} ms{note}")
@@ -1,4 +1,58 @@
+import random
+from itertools import product
+
 import streamlit as st
+import pandas as pd
+
+from dld.compiled_sim import EXHAUSTIVE_MAX_INPUTS, compare, compile_netlist, output_counts
+from dld.event_sim import default_period, simulate
+from dld.fault_sim import DEFAULT_VECTORS, fault_simulate
+from dld.gate_dag import GateDAG
+from dld.netlist import NetlistError, from_dag, from_expression, parse_netlist, to_bench, CLOCK
+from dld.parser import parse, ParseError
+from dld.vcd import VCDError, VCDReader, export_simulation, load
+from dld.waveform import waveform_frame
+
+MAX_EXHAUSTIVE_INPUTS = 6  # more inputs than this get random vectors
+RANDOM_VECTORS = 16
+MAX_WAVE_TIME = 4000  # time units drawn in the waveform chart
+
+EXAMPLES = {
+    "Full adder (XOR delay 2)": """# full adder
+INPUT(a)
+INPUT(b)
+INPUT(cin)
+OUTPUT(sum)
+OUTPUT(cout)
+t    = XOR(a, b) @2
+sum  = XOR(t, cin) @2
+c1   = AND(a, b)
+c2   = AND(t, cin)
+cout = OR(c1, c2)
+""",
+    "3-bit counter (DFFs)": """# counts up on every clk edge while en = 1
+INPUT(en)
+OUTPUT(q0)
+OUTPUT(q1)
+OUTPUT(q2)
+d0 = XOR(q0, en)
+c0 = AND(q0, en)
+d1 = XOR(q1, c0)
+c1 = AND(q1, c0)
+d2 = XOR(q2, c1)
+q0 = DFF(d0)
+q1 = DFF(d1)
+q2 = DFF(d2)
+""",
+    "SR latch (cross-coupled NOR)": """INPUT(s)
+INPUT(r)
+OUTPUT(q)
+OUTPUT(qn)
+q  = NOR(r, qn)
+qn = NOR(s, q)
+""",
+}
+
 st.markdown(
     """
     <style>
@@ -23,6 +77,192 @@ st.markdown(
 )
 st.title("⚡️ Circuit Simulator & Workspace")
 
+# --- Gate-level simulator -------------------------------------------------
+st.subheader("🔌 Gate-Level Simulator")
+st.write("""
+Describe a circuit as a **netlist** (ISCAS `.bench` style, optional delay after `@`)
+or build one from a Boolean expression, then drive it with input vectors.
+The event-driven simulator only re-evaluates gates whose inputs changed, so
+glitches from unequal gate delays show up in the waveform.
+""")
+
+source = st.radio("Circuit source", ["Netlist text", "Expression"], horizontal=True, key="p3_source")
+netlist = None
+try:
+    if source == "Netlist text":
+        example = st.selectbox("Start from an example", list(EXAMPLES), key="p3_example")
+        text = st.text_area("Netlist", value=EXAMPLES[example], height=260, key=f"p3_netlist_{example}")
+        netlist = parse_netlist(text)
+    else:
+        # Defaults to the expression last entered on the Boolean Expressions page
+        last_expr, last_vars = st.session_state.get("last_expression", ("A & B | ~C", "A,B,C"))
+        expr_text = st.text_input("Expression", value=last_expr, key="p3_expr")
+        vars_text = st.text_input("Variables (comma-separated)", value=last_vars, key="p3_vars")
+        if expr_text and vars_text:
+            variables = [v.strip() for v in vars_text.split(",") if v.strip()]
+            netlist = from_expression(parse(expr_text, variables).ast, delays={"xor": 2})
+            with st.expander("Generated netlist"):
+                st.code(to_bench(netlist), language=None)
+except (NetlistError, ParseError) as e:
+    st.error(f"❌ {e}")
+
+if netlist is not None:
+    input_names = [netlist.names[n] for n in netlist.inputs if netlist.names[n] != CLOCK]
+    clocked = bool(netlist.flip_flops)
+    st.caption(f"{netlist.gate_count} gates · {len(netlist.flip_flops)} flip-flops · "
+               f"{len(input_names)} inputs · {len(netlist.outputs)} outputs")
+
+    mode = st.radio("Simulation mode", ["Event-driven (gate delays)", "Bit-parallel (zero delay, many vectors)",
+                                        "Fault simulation (stuck-at)"],
+                    horizontal=True, key="p3_mode")
+    if mode.startswith("Bit-parallel"):
+        st.write("""
+Gates are sorted once and compiled to straight-line code over packed 64-bit words,
+so every pass evaluates tens of thousands of input vectors. Flip-flops are cut:
+each `Q` becomes an input and each `D` an output named `Q.next`.
+""")
+        reference_text = st.text_area("Expected outputs (optional), one `output = expression` per line",
+                                      key="p3_reference", placeholder="sum = a ^ b ^ cin\ncout = a & b | cin & (a ^ b)")
+        random_vectors = 1 << 20
+        if len(input_names) + len(netlist.flip_flops) > EXHAUSTIVE_MAX_INPUTS:
+            random_vectors = st.select_slider("Random vectors", options=[1 << k for k in range(14, 25, 2)],
+                                              value=1 << 20, key="p3_random_vectors")
+        try:
+            circuit = compile_netlist(netlist)
+            if reference_text.strip():
+                dag = GateDAG()
+                for line in reference_text.splitlines():
+                    if line.strip():
+                        name, sep, expr_text = line.partition("=")
+                        if not sep:
+                            raise ValueError(f"Expected `output = expression`, got `{line.strip()}`")
+                        dag.add_output(name.strip(), dag.add_ast(parse(expr_text.strip()).ast))
+                result = compare(circuit, compile_netlist(from_dag(dag)), vectors=random_vectors)
+                counts = None
+            else:
+                counts, result = output_counts(circuit, vectors=random_vectors)
+        except NetlistError as e:
+            st.error(f"❌ {e} — feedback loops need the event-driven mode.")
+        except (ParseError, ValueError) as e:
+            st.error(f"❌ {e}")
+        else:
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Vectors", f"{result.vectors:,}", "exhaustive" if result.exhaustive else "random",
+                      delta_color="off")
+            c2.metric("Time", f"{result.seconds * 1000:.1f} ms")
+            c3.metric("Vectors / s", f"{result.vectors / max(result.seconds, 1e-9):,.0f}")
+            if counts is not None:
+                st.dataframe(pd.DataFrame({"Output": list(counts), "1s": list(counts.values()),
+                                           "P(1)": [c / result.vectors for c in counts.values()]}))
+            elif result.mismatch is None:
+                st.success("✅ Every tested vector matches the expected outputs.")
+            else:
+                st.error("❌ Mismatch found:")
+                st.table(pd.DataFrame([{**result.mismatch.inputs,
+                                        **{f"{k} (got)": v for k, v in result.mismatch.outputs.items()},
+                                        **{f"{k} (expected)": v for k, v in result.mismatch.expected.items()}}]))
+    elif mode.startswith("Fault"):
+        st.write("""
+Every net gets a **stuck-at-0** and a **stuck-at-1** fault. Vectors are simulated
+thousands at a time in packed words, each fault is propagated only as far as it
+changes values, and detected faults are dropped. The vectors that first caught
+each fault are then reduced to a small test set that detects all of them.
+Flip-flops are cut as in the bit-parallel mode (full scan).
+""")
+        random_vectors = DEFAULT_VECTORS
+        if len(input_names) + len(netlist.flip_flops) > EXHAUSTIVE_MAX_INPUTS:
+            random_vectors = st.select_slider("Random vectors", options=[1 << k for k in range(10, 19, 2)],
+                                              value=DEFAULT_VECTORS, key="p3_fault_vectors")
+        try:
+            report = fault_simulate(netlist, vectors=random_vectors)
+        except NetlistError as e:
+            st.error(f"❌ {e} — feedback loops need the event-driven mode.")
+        else:
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Faults", f"{report.faults:,}")
+            c2.metric("Coverage", f"{report.coverage:.1%}", f"{report.detected:,} detected", delta_color="off")
+            c3.metric("Vectors simulated", f"{report.vectors:,}")
+            c4.metric("Time", f"{report.seconds * 1000:.1f} ms")
+            st.write(f"**Compacted test set** ({len(report.tests)} vectors):")
+            st.dataframe(pd.DataFrame(report.tests))
+            if report.undetected:
+                with st.expander(f"⚠️ {len(report.undetected)} undetected faults (redundant logic or too few vectors)"):
+                    st.write(", ".join(report.undetected))
+            else:
+                st.success("✅ Every stuck-at fault is detected.")
+    else:
+        if len(input_names) <= MAX_EXHAUSTIVE_INPUTS and not clocked:
+            rows = [list(bits) for bits in product([0, 1], repeat=len(input_names))]
+        else:
+            rng = random.Random(0)
+            rows = [[rng.randint(0, 1) for _ in input_names] for _ in range(RANDOM_VECTORS)]
+        st.write("**Input vectors** (one per period" + (", one clock edge each" if clocked else "") + "; edit freely):")
+        vectors_df = st.data_editor(pd.DataFrame(rows, columns=input_names), num_rows="dynamic",
+                                    key=f"p3_vectors_{'_'.join(input_names)}")
+        period = st.number_input("Period (time units per vector)", min_value=2,
+                                 value=default_period(netlist), key="p3_period")
+
+        vectors = [{name: int(bool(row[name])) for name in input_names} for _, row in vectors_df.fillna(0).iterrows()]
+        if vectors:
+            watch = [netlist.names[n] for n in netlist.inputs] + \
+                    [netlist.names[n] for n in netlist.outputs] + [netlist.names[ff.q] for ff in netlist.flip_flops]
+            watch = list(dict.fromkeys(watch))
+            result = simulate(netlist, vectors, period=int(period), watch=watch)
+
+            stats = result.stats
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric("Events", f"{stats['events']:,}")
+            c2.metric("Gate evaluations", f"{stats['evaluations']:,}")
+            c3.metric("Sim time", f"{stats['seconds'] * 1000:.1f} ms")
+            c4.metric("Events / s", f"{stats['events_per_second']:,.0f}")
+
+            st.write("**Outputs at the end of each period:**")
+            st.dataframe(pd.concat([pd.DataFrame(vectors), pd.DataFrame(result.samples)], axis=1))
+
+            # Waveform: each signal stacked on its own baseline
+            end = min(len(vectors) * result.period, MAX_WAVE_TIME)
+            if end < len(vectors) * result.period:
+                st.caption(f"Waveform shows the first {MAX_WAVE_TIME} time units.")
+            wave = pd.DataFrame(index=range(end + 1), columns=watch, dtype=float)
+            wave.iloc[0] = 0.0
+            for t, name, value in result.trace:
+                if t <= end:
+                    wave.at[t, name] = value
+            wave = wave.ffill()
+            for k, name in enumerate(watch):
+                wave[name] = wave[name] * 0.8 + 1.2 * (len(watch) - 1 - k)
+            wave.index.name = "time"
+            st.line_chart(wave)
+            st.download_button("⬇️ Download VCD", key="p3_vcd_export", file_name="simulation.vcd", mime="text/plain",
+                               data=lambda: export_simulation(netlist, vectors, period=int(period), watch=watch))
+
+
+st.subheader("📥 VCD Waveform Viewer")
+st.write("""
+Open a Value Change Dump from any simulator (Icarus, Verilator, GHDL or the VCD
+downloads on these pages). Only the header is parsed up front. The value changes
+of the selected signals are then read in blocks and drawn downsampled, so large
+dumps load without reading the whole file into memory.
+""")
+vcd_file = st.file_uploader("Value Change Dump", type=["vcd"], key="p3_vcd")
+if vcd_file:
+    try:
+        reader = VCDReader(vcd_file)
+        picks = st.multiselect("Signals", list(reader.signals), default=list(reader.signals)[:8], key="p3_vcd_signals")
+        if picks:
+            traces, end = load(vcd_file, vcd_file.file_id, picks)
+            window = st.slider(f"Window ({reader.timescale or 'time units'})", 0, end + 1, (0, end + 1),
+                               key=f"p3_vcd_window_{vcd_file.file_id}")
+            if window[1] > window[0]:
+                st.line_chart(waveform_frame(traces, window[0], window[1]))
+            st.caption(f"{len(reader.signals):,} signals in the dump · "
+                       f"{sum(len(t.starts) for t in traces.values()):,} value changes shown")
+    except VCDError as e:
+        st.error(f"❌ {e}")
+
+st.markdown("---")
+st.subheader("🗂️ Workspace")
+
 st.write("""
 **This page helps students work with circuit simulations, uploads, and external tools.**
 
@@ -1,5 +1,17 @@
+import numpy as np
 import streamlit as st
 import pandas as pd
+
+from dld.sequential import (CLOCK, EDGES, LATCHES, clocked_stimulus, grade, input_names, primitive, run_cycles,
+                            simulate, stack_streams)
+from dld.vcd import export_traces
+from dld.waveform import encode, waveform_frame
+
+KIND_OF = {
+    "SR Latch": "sr_latch", "D Latch": "d_latch",
+    "SR Flip-Flop": "sr_ff", "JK Flip-Flop": "jk_ff", "D Flip-Flop": "d_ff", "T Flip-Flop": "t_ff",
+}
+DEFAULT_CYCLES = 8
 st.markdown(
     """
     <style>
@@ -97,8 +109,84 @@ elif mode == "Flip-Flop":
         st.table(df)
         st.info("T Flip-Flop: Toggles output on each clock edge if T=1.")
 
-# Upload timing diagram
-st.subheader("Timing Diagram Example (Optional)")
-uploaded_timing = st.file_uploader("Upload Timing Diagram Image", type=["png", "jpg", "jpeg"])
-if uploaded_timing:
-    st.image(uploaded_timing, caption="Timing Diagram", use_column_width=True)
+st.markdown("---")
+selected = latch_type if mode == "Latch" else ff_type
+kind = KIND_OF[selected]
+st.header(f"▶️ Simulate the {selected}")
+st.write("One row per clock cycle" + (" (the element is transparent while EN = 1)." if kind in LATCHES else
+         "; the flip-flop samples its inputs just before the active clock edge.") +
+         " PRE / CLR are asynchronous and active high.")
+c1, c2, c3 = st.columns(3)
+edge = c1.radio("Active clock edge", EDGES, horizontal=True, key="p4_edge") if kind not in LATCHES else "rising"
+init = c2.selectbox("Initial Q", [0, 1], key="p4_init")
+asynchronous = c3.checkbox("Async PRE / CLR", key="p4_async")
+prim = primitive(kind, edge, init)
+columns = [name for name in input_names(prim, asynchronous) if name != CLOCK]
+
+rng = np.random.default_rng(4)
+rows = rng.integers(0, 2, size=(DEFAULT_CYCLES, len(columns)))
+if kind in ("sr_latch", "sr_ff"):
+    rows[:, columns.index("R")] &= 1 ^ rows[:, columns.index("S")]  # keep the example out of S = R = 1
+for name in ("PRE", "CLR"):
+    if name in columns:
+        rows[:, columns.index(name)] = 0
+stimulus_df = st.data_editor(pd.DataFrame(rows, columns=columns), num_rows="dynamic",
+                             key=f"p4_stimulus_{kind}_{asynchronous}")
+stimulus_df = stimulus_df.fillna(0).astype(int)
+
+if len(stimulus_df):
+    cycles = {name: stimulus_df[name].to_numpy()[None, :] for name in columns}
+    trace = run_cycles(prim, cycles)
+    result = stimulus_df.copy()
+    result.index = pd.RangeIndex(1, len(result) + 1, name="Cycle")
+    result["Q"], result["Q̅"] = trace.q[0], trace.qn[0]
+    st.dataframe(result)
+    if trace.invalid.any():
+        bad = ", ".join(str(c + 1) for c in np.flatnonzero(trace.invalid[0]))
+        st.warning(f"⚠️ Q = Q̅ (invalid state) in cycle(s) {bad}.")
+
+    # Timing diagram of the simulated trace: two steps per cycle for flip-flops (clock low / high)
+    st.subheader("⏱️ Timing Diagram")
+    steps = clocked_stimulus(prim, cycles)
+    full = simulate(prim, steps)
+    traces = {name: encode(steps[name][0]) for name in input_names(prim, asynchronous)}
+    traces.update({"Q": encode(full.q[0]), "Q̅": encode(full.qn[0])})
+    st.line_chart(waveform_frame(traces, unit=1.0 if kind in LATCHES else 0.5))
+    st.caption("Time axis in clock cycles; the VCD download uses one time step per half cycle.")
+    vcd_traces = {("Qn" if name == "Q̅" else name): trace for name, trace in traces.items()}
+    st.download_button("⬇️ Download VCD", key="p4_vcd", file_name=f"{kind}.vcd", mime="text/plain",
+                       data=lambda: export_traces(vcd_traces))
+
+    st.subheader("📋 Check a Class Exercise Sheet")
+    st.write(f"""
+Upload a CSV with one row per student per cycle: a `student` column, the inputs
+({", ".join(f"`{c}`" for c in columns)}) and the student's answer in `Q`. Every
+sheet is simulated at once and graded against the {selected}.
+""")
+    template = pd.concat([result.reset_index(drop=True).assign(student=name)[["student"] + columns + ["Q"]]
+                          for name in ("student_1", "student_2")])
+    st.download_button("⬇️ Template CSV", template.to_csv(index=False), file_name=f"{kind}_sheet.csv",
+                       mime="text/csv", key="p4_template")
+    sheet = st.file_uploader("Exercise sheet (CSV)", type=["csv"], key="p4_sheet")
+    if sheet:
+        try:
+            keys, arrays, lengths = stack_streams(pd.read_csv(sheet), columns + ["Q"], by="student")
+            expected = run_cycles(prim, {name: arrays[name] for name in columns})
+            marks = grade(expected.q, arrays["Q"], lengths)
+        except (ValueError, KeyError) as e:
+            st.error(f"❌ {e}")
+        else:
+            st.dataframe(pd.DataFrame({
+                "Student": keys,
+                "Correct": marks.correct,
+                "Cycles": marks.total,
+                "Score": [f"{c / t:.0%}" for c, t in zip(marks.correct, marks.total)],
+                "First wrong cycle": [str(f + 1) if f >= 0 else "—" for f in marks.first_error],
+            }))
+            st.success(f"✅ Checked {len(keys)} sheets ({int(lengths.sum())} cycles).")
+
+# Compare with a hand-drawn timing diagram
+with st.expander("🖼️ Compare with your own timing diagram"):
+    uploaded_timing = st.file_uploader("Upload Timing Diagram Image", type=["png", "jpg", "jpeg"])
+    if uploaded_timing:
+        st.image(uploaded_timing, caption="Timing Diagram", use_column_width=True)
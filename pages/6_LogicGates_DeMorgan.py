@@ -1,11 +1,19 @@
 import streamlit as st
 import pandas as pd
-from sympy import symbols, simplify_logic, Not, And, Or
-from sympy.parsing.sympy_parser import (
-    parse_expr, standard_transformations, implicit_multiplication_application
-)
-from itertools import product
-from graphviz import Digraph
+from sympy import symbols, Not, And, Or
+
+from dld.bdd import BDD, check_equivalence, dfs_order
+from dld.factor import factor_ast
+from dld.function_input import format_terms
+from dld.gate_dag import build_dag
+from dld.sat import prove_equivalence
+from dld.techmap import tech_map
+from dld.truth_table import MAX_GATE_VARS, gate_table
+from dld.parser import parse, to_sympy, ParseError
+from dld.simplify_cache import cached_simplify_logic
+from dld.jobs import simplify_in_pool, JobTimeout, JobCancelled
+from dld.widgets import show_diagram, truth_table_section
+
 st.markdown(
     """
     <style>
@@ -30,9 +38,12 @@ st.markdown(
 )
 st.title("🔄 DeMorgan’s Laws & Logic Gates")
 
+BDD_MAX_VARS = 24  # past this, equivalence is checked with the SAT solver
+SAT_TIME_BUDGET = 10.0
+
 # --- Pick how many variables
 st.sidebar.markdown("## ⚙️ Settings")
-num_vars = st.sidebar.slider("Number of Variables (for Gates Table)", min_value=1, max_value=4, value=2)
+num_vars = st.sidebar.slider("Number of Variables (for Gates Table)", min_value=1, max_value=MAX_GATE_VARS, value=2)
 
 # Create variable symbols dynamically
 vars_sym = symbols([chr(65 + i) for i in range(num_vars)])  # A, B, C, D...
@@ -46,36 +57,19 @@ st.markdown(f"""
 - **NOT ( ~ )**
 - **NAND = NOT(AND)**
 - **NOR = NOT(OR)**
-- **XOR = A ⊕ B**
+- **XOR = A ⊕ B ⊕ …** (true for an odd number of 1s)
 - **XNOR = NOT(XOR)**
 
+With more than two inputs, AND/OR/XOR (and their inversions) reduce over all of them.
+
 ✅ Using variables: {', '.join(vars_list)}
 """)
 
-# Define gates based on 1st two variables for binary gates
 A = vars_sym[0]
 B = vars_sym[1] if num_vars > 1 else A  # fallback for single var
 
-gates = {
-    f"{A} AND {B}": And(A, B),
-    f"{A} OR {B}": Or(A, B),
-    f"NOT {A}": Not(A),
-    f"{A} NAND {B}": Not(And(A, B)),
-    f"{A} NOR {B}": Not(Or(A, B)),
-    f"{A} XOR {B}": A ^ B,
-    f"{A} XNOR {B}": Not(A ^ B)
-}
-
-# Truth table for gates
-rows = []
-for combo in product([0, 1], repeat=num_vars):
-    row = list(combo)
-    subs = dict(zip(vars_sym, combo))
-    for g in gates.values():
-        row.append(int(bool(g.subs(subs))))
-    rows.append(row)
-
-df = pd.DataFrame(rows, columns=vars_list + list(gates.keys()))
+# Gate columns depend only on num_vars: built once per count with numpy
+df = gate_table(num_vars)
 st.subheader("Basic Gates Truth Table")
 st.dataframe(df)
 
@@ -90,11 +84,14 @@ st.markdown("""
 """)
 
 # Always show example with A,B
-demorgan_1 = simplify_logic(Not(And(A, B)))
-demorgan_2 = simplify_logic(Not(Or(A, B)))
+demorgan_1 = cached_simplify_logic(Not(And(A, B)))
+demorgan_2 = cached_simplify_logic(Not(Or(A, B)))
 
 st.info(f"**NOT({A} AND {B}):** `{demorgan_1}` → `~{A} | ~{B}`")
 st.info(f"**NOT({A} OR {B}):** `{demorgan_2}` → `~{A} & ~{B}`")
+if all(check_equivalence(law, rewrite).equal for law, rewrite in [
+        (Not(And(A, B)), Or(Not(A), Not(B))), (Not(Or(A, B)), And(Not(A), Not(B)))]):
+    st.success("✅ Both laws verified for every input with a BDD equivalence check.")
 
 # --- DeMorgan Evaluator ---
 st.markdown("""
@@ -125,60 +122,90 @@ if expr_input and vars_input:
         vars_list = [v.strip() for v in vars_input.split(",")]
         vars_sym = symbols(vars_list)
 
-        local_dict = {name: sym for name, sym in zip(vars_list, vars_sym)}
-        transformations = standard_transformations + (implicit_multiplication_application,)
+        parsed = parse(expr_fixed, vars_list)
+        expr = to_sympy(parsed.ast, dict(zip(vars_list, vars_sym)))
+        # Heavy work runs in the shared process pool (cancelled if the input changes)
+        status = st.empty()
+
+        def still_computing(seconds):
+            status.info(f"⏳ Still computing… ({seconds:.0f}s)")
 
-        expr = parse_expr(expr_fixed, local_dict, transformations=transformations)
-        simplified = simplify_logic(expr)
+        simplified = simplify_in_pool(st.session_state, "p6_simplify", parsed.ast, vars_list,
+                                      on_wait=still_computing)
 
         st.write(f"**Original:** `{expr}`")
         st.write(f"**Simplified:** `{simplified}`")
 
-        rows = []
-        for combo in product([0, 1], repeat=len(vars_list)):
-            subs = dict(zip(vars_sym, combo))
-            out = int(bool(expr.subs(subs)))
-            rows.append(list(combo) + [out])
-        df2 = pd.DataFrame(rows, columns=vars_list + ["Output"])
-        st.subheader("Truth Table")
-        st.dataframe(df2)
-
-        st.subheader("Gate Diagram (Simplified)")
-        dot = Digraph()
-        counter = [0]
-
-        def add_gate(node):
-            if isinstance(node, And):
-                gate_id = f"And_{counter[0]}"
-                dot.node(gate_id, "AND")
-                counter[0] += 1
-                for arg in node.args:
-                    child_id = add_gate(arg)
-                    dot.edge(child_id, gate_id)
-                return gate_id
-            elif isinstance(node, Or):
-                gate_id = f"Or_{counter[0]}"
-                dot.node(gate_id, "OR")
-                counter[0] += 1
-                for arg in node.args:
-                    child_id = add_gate(arg)
-                    dot.edge(child_id, gate_id)
-                return gate_id
-            elif isinstance(node, Not):
-                gate_id = f"Not_{counter[0]}"
-                dot.node(gate_id, "NOT")
-                counter[0] += 1
-                child_id = add_gate(node.args[0])
-                dot.edge(child_id, gate_id)
-                return gate_id
+        # Satisfiability and model count straight from the BDD (no 2^n table)
+        if len(vars_list) <= BDD_MAX_VARS:
+            bdd = BDD(dfs_order(parsed.ast, vars_list))
+            root = bdd.build(parsed.ast)
+            models = bdd.sat_count(root)
+            st.write(f"**True for:** {models} of {2 ** len(vars_list)} input combinations "
+                     f"(BDD with {bdd.size(root)} nodes)")
+            if models:
+                # Only the first few paths are walked; their order is the BDD's (fixed for a given input)
+                st.write(f"**Minterms:** {format_terms(bdd.minterms(root, vars_list), total=models)}")
+
+        answer_input = st.text_input("Your simplified answer (optional) — checked for equivalence",
+                                     key="p6_answer")
+        if answer_input:
+            answer = parse(answer_input, vars_list)
+            if len(vars_list) <= BDD_MAX_VARS:
+                check = check_equivalence(parsed.ast, answer.ast, vars_list)
+                verdict = "equivalent" if check.equal else "different"
+                counterexample = check.counterexample
+            else:
+                # Too many variables for a BDD: SAT miter with a time budget
+                check = prove_equivalence(parsed.ast, answer.ast, vars_list, time_budget=SAT_TIME_BUDGET)
+                verdict, counterexample = check.status, check.counterexample
+                st.caption(f"SAT miter: {check.stats['variables']} CNF variables, "
+                           f"{check.stats['conflicts']} conflicts · {check.stats['time'] * 1000:.0f} ms")
+            if verdict == "equivalent":
+                st.success("✅ Equivalent to the original expression for every input.")
+            elif verdict == "different":
+                st.error("❌ Not equivalent. Counterexample:")
+                st.table(pd.DataFrame([{v: counterexample.get(v, 0) for v in vars_list}]))
             else:
-                var_id = f"{str(node)}_{counter[0]}"
-                dot.node(var_id, str(node))
-                counter[0] += 1
-                return var_id
+                st.warning(f"⏱️ Could not decide within {SAT_TIME_BUDGET:.0f}s.")
 
-        add_gate(simplified)
-        st.graphviz_chart(dot)
+        truth_table_section(parsed.ast, vars_list, "p6_table", on_wait=still_computing)
+        status.empty()
 
+        st.subheader("Gate Diagram (Simplified)")
+        # Shared subexpressions and inputs are drawn once (structural hashing)
+        two_level = build_dag(simplified)
+        circuit = simplified
+        if st.checkbox("Factor into multi-level logic (kernels & common cubes)", value=True, key="p6_factor"):
+            circuit = factor_ast(simplified)
+            dag = build_dag(circuit)
+            st.table(pd.DataFrame(
+                [[two_level.gate_count, two_level.edge_count, two_level.depth],
+                 [dag.gate_count, dag.edge_count, dag.depth]],
+                index=["Two-level (simplified)", "Factored"], columns=["Gates", "Wires", "Depth"],
+            ))
+        else:
+            dag = two_level
+        st.caption(f"{len(dag.nodes)} nodes ({dag.gate_count} gates) · {dag.edge_count} edges")
+        show_diagram(dag)
+
+        st.subheader("NAND / NOR Implementation")
+        col_lib, col_goal = st.columns(2)
+        library = col_lib.radio("Gate library", ["NAND only", "NOR only"], horizontal=True, key="p6_library")
+        goal = col_goal.radio("Optimize for", ["Fewest gates", "Smallest depth"], horizontal=True, key="p6_goal")
+        mapping = tech_map(circuit, "nand" if library == "NAND only" else "nor",
+                           "gates" if goal == "Fewest gates" else "depth")
+        cells = ", ".join(f"{count} × {name}" for name, count in mapping.stats["cells"].items())
+        st.caption(f"{mapping.gates} gates ({cells}) · depth {mapping.depth} · "
+                   "an inverter is a gate with both inputs tied together")
+        show_diagram(mapping.dag)
+
+    except ParseError as e:
+        st.error(f"❌ Error: {e}")
+        st.code(e.pointer(), language=None)
+    except JobTimeout:
+        st.error("⏱️ This expression is too large to process here. Try fewer variables.")
+    except JobCancelled:
+        st.warning("Computation cancelled because the input changed.")
     except Exception as e:
         st.error(f"❌ Error: {e}")
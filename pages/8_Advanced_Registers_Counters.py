@@ -1,7 +1,13 @@
+import time
+
 import streamlit as st
 import pandas as pd
 from graphviz import Digraph
 
+from dld.render import render_diagram
+from dld.vcd import export_traces
+from dld.waveform import counter_traces, waveform_frame
+
 st.set_page_config(page_title="Advanced Registers & Counters")
 st.markdown(
     """
@@ -30,7 +36,7 @@ st.title("🧮 Advanced Registers & Counters")
 st.markdown("""
 This module expands on registers and counters with:
 - 4-bit counter truth tables
-- Example timing diagram
+- Simulated timing diagram
 - Flip-flop chain visual
 - Step-by-step simulation
 - Clock signal demo
@@ -59,18 +65,37 @@ st.table(df_down)
 
 st.markdown("---")
 
-st.header("⏱️ Example Timing Diagram")
-
-st.info("Below is a simple static example — upload your own for real circuits!")
-
-timing_diagram_url = "https://upload.wikimedia.org/wikipedia/commons/thumb/0/05/RippleCounterTimingDiagram.png/500px-RippleCounterTimingDiagram.png"
-
-# ✅ FIXED: use_container_width
-st.image(timing_diagram_url, caption="Sample Ripple Counter Timing Diagram", use_container_width=True)
-
-uploaded_timing = st.file_uploader("Or upload your own timing diagram:", type=["png", "jpg"])
-if uploaded_timing:
-    st.image(uploaded_timing, caption="Uploaded Timing Diagram", use_container_width=True)
+st.header("⏱️ Ripple Counter Timing Diagram")
+st.write("""
+Simulated, not drawn: a chain of falling-edge T flip-flops where each stage is
+clocked by the previous stage's Q. Traces are stored run-length encoded, and
+each chart column shows the min/max of its time slice, so even a million
+clock cycles render instantly.
+""")
+c1, c2 = st.columns(2)
+counter_bits = c1.slider("Counter bits", 2, 8, 4, key="p8_bits")
+counter_cycles = c2.select_slider("Clock cycles simulated", options=[16, 64, 256, 4096, 65536, 1_000_000],
+                                  value=16, key="p8_cycles")
+traces = counter_traces(counter_bits, counter_cycles)
+window = (0, counter_cycles)
+if counter_cycles > 64:
+    window = st.slider("Window (clock cycles)", 0, counter_cycles, (0, counter_cycles), key=f"p8_window_{counter_cycles}")
+if window[1] > window[0]:
+    started = time.perf_counter()
+    wave = waveform_frame(traces, 2 * window[0], 2 * window[1], unit=0.5)
+    render_ms = (time.perf_counter() - started) * 1000
+    st.line_chart(wave)
+    samples = sum(t.length for t in traces.values())
+    runs = sum(len(t.starts) for t in traces.values())
+    st.caption(f"{samples:,} samples stored as {runs:,} runs · {len(wave):,} points plotted · "
+               f"downsampled in {render_ms:.1f} ms")
+    st.download_button("⬇️ Download VCD", key="p8_vcd", file_name=f"ripple_counter_{counter_bits}bit.vcd",
+                       mime="text/plain", data=lambda: export_traces(traces))
+
+with st.expander("🖼️ Compare with your own timing diagram"):
+    uploaded_timing = st.file_uploader("Upload a timing diagram:", type=["png", "jpg"])
+    if uploaded_timing:
+        st.image(uploaded_timing, caption="Uploaded Timing Diagram", use_container_width=True)
 
 st.markdown("---")
 
@@ -84,7 +109,11 @@ for i in range(3):
     dot.edge(f"T{i}", f"T{i+1}", label="Clock")
 
 dot.attr(rankdir="LR")
-st.graphviz_chart(dot)
+diagram = render_diagram(dot)
+if diagram.svg:
+    st.markdown(diagram.svg, unsafe_allow_html=True)
+else:
+    st.graphviz_chart(diagram.dot)
 
 st.markdown("---")
 